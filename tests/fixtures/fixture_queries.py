@@ -0,0 +1,103 @@
+import difflib
+import json
+import os
+import re
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+BUDGET_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'query_budgets.json'
+)
+
+# Значения параметров меняются от запуска к запуску, в бюджете храним форму запроса.
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LISTS = re.compile(r'IN \((?:\?, )*\?\)')
+
+
+def normalize(sql):
+    return IN_LISTS.sub('IN (...)', LITERALS.sub('?', sql))
+
+
+def load_budgets():
+    if not os.path.exists(BUDGET_FILE):
+        return {}
+    with open(BUDGET_FILE, encoding='utf-8') as budget_file:
+        return json.load(budget_file)
+
+
+def save_budgets(budgets):
+    with open(BUDGET_FILE, 'w', encoding='utf-8') as budget_file:
+        json.dump(budgets, budget_file, ensure_ascii=False, indent=2, sort_keys=True)
+        budget_file.write('\n')
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--update-query-budgets',
+        action='store_true',
+        help='Перезаписать tests/query_budgets.json фактическими запросами.',
+    )
+
+
+class QueryBudget:
+    """Выполняет запрос к странице и сравнивает SQL-запросы с бюджетом её имени URL."""
+
+    def __init__(self, client, budgets, update, updated):
+        self.client = client
+        self.budgets = budgets
+        self.update = update
+        self.updated = updated
+
+    def __call__(self, url_name, *args, client=None, **kwargs):
+        url = reverse(url_name, args=args, kwargs=kwargs)
+        match = resolve(url)
+        name = f'{match.namespace}:{match.url_name}' if match.namespace else match.url_name
+        # Закешированные счётчики и версии иначе сэкономят запросы только на втором прогоне.
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = (client or self.client).get(url)
+            if response.streaming:
+                # Посты стримящихся страниц запрашиваются при чтении ответа.
+                response.streaming_content = [b''.join(response.streaming_content)]
+        queries = [normalize(query['sql']) for query in context.captured_queries]
+        if response.wsgi_request.user.is_authenticated:
+            name = f'{name} (auth)'
+        budget = self.budgets.get(name)
+        if self.update:
+            # Страницу проверяют несколько тестов: бюджетом остаётся самый дорогой прогон.
+            if name not in self.updated or len(queries) > len(budget):
+                self.budgets[name] = queries
+            self.updated.add(name)
+            return response
+        assert budget is not None, (
+            f'Для страницы `{name}` нет бюджета запросов в `{BUDGET_FILE}`. '
+            f'Запустите pytest с `--update-query-budgets`.'
+        )
+        if len(queries) > len(budget):
+            diff = '\n'.join(difflib.unified_diff(
+                budget, queries, 'бюджет', 'факт', lineterm='',
+            ))
+            assert False, (
+                f'Страница `{name}` выполнила {len(queries)} запросов '
+                f'при бюджете {len(budget)}:\n{diff}'
+            )
+        return response
+
+
+@pytest.fixture(scope='session')
+def query_budgets(request):
+    budgets = load_budgets()
+    update = request.config.getoption('--update-query-budgets')
+    yield budgets, update, set()
+    if update:
+        save_budgets(budgets)
+
+
+@pytest.fixture
+def query_budget(client, query_budgets):
+    budgets, update, updated = query_budgets
+    return QueryBudget(client, budgets, update, updated)
@@ -182,7 +182,7 @@ class TestGroupView:
         if response.status_code != 200:
             assert False, 'Страница `/group/<slug>/` работает неправильно.'
         group = post_with_group.group
-        html = response.content.decode()
+        html = b''.join(response.streaming_content).decode()
 
         templates_list = ['group_list.html', 'posts/group_list.html']
         html_template = select_template(templates_list).template.source
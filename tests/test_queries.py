@@ -0,0 +1,38 @@
+import pytest
+from posts.models import Comment, Follow, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+class TestQueryBudget:
+    """Число SQL-запросов на страницах не должно расти вместе с числом постов."""
+
+    def test_index_queries(self, query_budget, few_posts_with_group):
+        query_budget('posts:index')
+
+    def test_group_list_queries(self, query_budget, few_posts_with_group):
+        query_budget('posts:group_list', slug=few_posts_with_group.group.slug)
+
+    def test_profile_queries(self, query_budget, few_posts_with_group):
+        query_budget('posts:profile', username=few_posts_with_group.author.username)
+
+    def test_post_detail_queries(self, query_budget, few_posts_with_group):
+        query_budget('posts:post_detail', post_id=few_posts_with_group.pk)
+
+    def test_authorized_pages_queries(self, query_budget, user_client, few_posts_with_group):
+        query_budget('posts:index', client=user_client)
+        query_budget('posts:post_create', client=user_client)
+        query_budget('posts:post_edit', post_id=few_posts_with_group.pk, client=user_client)
+
+    def test_follow_index_queries(self, query_budget, user, user_client, mixer, django_user_model):
+        author = django_user_model.objects.create_user(username='Followed')
+        Follow.objects.create(user=user, author=author)
+        mixer.cycle(20).blend(Post, author=author)
+        query_budget('posts:follow_index', client=user_client)
+
+    def test_post_with_many_comments_queries(self, query_budget, post, user):
+        Comment.objects.bulk_create(
+            Comment(post=post, author=user, text=f'Комментарий {i}') for i in range(10000)
+        )
+        Post.objects.filter(pk=post.pk).update(comments_count=10000)
+        query_budget('posts:post_detail', post_id=post.pk)
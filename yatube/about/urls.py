@@ -1,10 +1,20 @@
 from django.urls import path
 
+from core.decorators import shared_page
+
 from . import views
 
 app_name = "about"
 
 urlpatterns = [
-    path("author/", views.AboutAuthorView.as_view(), name="author"),
-    path("tech/", views.AboutTechView.as_view(), name="tech"),
+    path(
+        "author/",
+        shared_page(views.AboutAuthorView.as_view()),
+        name="author",
+    ),
+    path(
+        "tech/",
+        shared_page(views.AboutTechView.as_view()),
+        name="tech",
+    ),
 ]
@@ -0,0 +1,31 @@
+from django.db.backends.sqlite3 import base
+
+# Значения по умолчанию для продакшена: WAL позволяет читать ленты,
+# пока идёт запись, synchronous=NORMAL безопасен в режиме WAL.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с настройкой PRAGMA при открытии каждого соединения.
+
+    Переопределить значения можно через ``OPTIONS["pragmas"]``
+    в ``settings.DATABASES``.
+    """
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop("pragmas", {})}
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
@@ -0,0 +1,65 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY_DB: str = "default"
+
+_state = threading.local()
+
+
+@contextmanager
+def use_primary():
+    """Направляет все чтения внутри блока на основную базу.
+
+    Работает и как декоратор: ``@use_primary()``.
+    """
+    _state.depth = getattr(_state, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _state.depth -= 1
+
+
+@contextmanager
+def use_replica():
+    """Разрешает читать внутри блока с реплик: для лент, которым не
+    страшно отставание реплики. ``use_primary()`` сильнее.
+
+    Работает и как декоратор: ``@use_replica()``.
+    """
+    _state.replica_depth = getattr(_state, "replica_depth", 0) + 1
+    try:
+        yield
+    finally:
+        _state.replica_depth -= 1
+
+
+def primary_pinned():
+    return getattr(_state, "depth", 0) > 0
+
+
+def replica_allowed():
+    return getattr(_state, "replica_depth", 0) > 0
+
+
+class ReplicaRouter:
+    """Чтения внутри ``use_replica()`` уходят на реплики, остальные
+    (сессии, пользователи, админка) и запись — на основную базу:
+    реплики обновляются копированием файла и могут сильно отставать."""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or primary_pinned() or not replica_allowed():
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
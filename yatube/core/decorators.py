@@ -0,0 +1,47 @@
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from core.middleware.replicas import PIN_COOKIE
+
+
+def unpinned(view):
+    """Запись, которую клиенту не нужно читать сразу (счётчики): после
+    неё не закрепляем клиента за основной базой, и общие страницы
+    по-прежнему кешируются в CDN."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.pin_primary = False
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def shared_page(view):
+    """Страница рендерится одинаково для всех посетителей.
+
+    Шаблоны видят ``request.shared_page`` и не обращаются к пользователю:
+    меню пользователя подгружается отдельным запросом. Ответ без сессии
+    может кешировать CDN; с сессией или после записи — только браузер,
+    чтобы автор сразу видел свои изменения.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.shared_page = True
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200 or response.cookies:
+            return response
+        patch_vary_headers(response, ("Cookie",))
+        cookies = request.COOKIES
+        if settings.SESSION_COOKIE_NAME in cookies or PIN_COOKIE in cookies:
+            patch_cache_control(response, private=True, max_age=0)
+        else:
+            patch_cache_control(
+                response, public=True, max_age=settings.SHARED_PAGE_MAX_AGE
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,17 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .delivery import get_queue
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь и сразу возвращает управление view.
+
+    Отправляет их фоновый поток через ``EMAIL_QUEUE_BACKEND``; письма,
+    не отправленные до падения процесса, теряются.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        get_queue().put(list(email_messages))
+        return len(email_messages)
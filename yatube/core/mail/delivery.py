@@ -0,0 +1,248 @@
+import atexit
+import bisect
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = "mail:stats:"
+COUNTERS = ("sent", "failed", "max_queue_depth")
+# Верхние границы корзин задержки, секунды.
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+
+
+class DeliveryStats:
+    """Счётчики доставки: отправлено, ошибки, наибольшая глубина очереди
+    и гистограмма задержки от постановки письма в очередь до отправки.
+
+    Копятся в кеше, поэтому с общим бэкендом суммируются по всем
+    процессам; их показывает команда mail_stats.
+    """
+
+    def __init__(self, prefix=STATS_PREFIX):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.max_queue_depth = 0
+
+    def keys(self):
+        return [self.prefix + name for name in COUNTERS] + [
+            self.prefix + f"latency:{index}"
+            for index in range(len(LATENCY_BUCKETS) + 1)
+        ]
+
+    def incr(self, name, delta):
+        if not delta:
+            return
+        key = self.prefix + name
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            if not cache.add(key, delta, None):
+                cache.incr(key, delta)
+
+    def queued(self, depth):
+        with self.lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def delivered(self, sent, failed, latencies):
+        """Пишет в кеш итоги пачки; вызывается из потока отправки."""
+        self.incr("sent", sent)
+        self.incr("failed", failed)
+        buckets = Counter(
+            bisect.bisect_left(LATENCY_BUCKETS, latency)
+            for latency in latencies
+        )
+        for index, count in buckets.items():
+            self.incr(f"latency:{index}", count)
+        key = self.prefix + "max_queue_depth"
+        # Наибольшее значение без блокировки: гонка процессов лишь
+        # ненадолго занизит его.
+        if cache.get(key, 0) < self.max_queue_depth:
+            cache.set(key, self.max_queue_depth, None)
+
+    def snapshot(self):
+        values = cache.get_many(self.keys())
+        histogram = [
+            values.get(self.prefix + f"latency:{index}", 0)
+            for index in range(len(LATENCY_BUCKETS) + 1)
+        ]
+        return {
+            **{
+                name: values.get(self.prefix + name, 0)
+                for name in COUNTERS
+            },
+            "latency_p50": percentile(histogram, 0.5),
+            "latency_p95": percentile(histogram, 0.95),
+        }
+
+    def reset(self):
+        cache.delete_many(self.keys())
+        with self.lock:
+            self.max_queue_depth = 0
+
+
+def percentile(histogram, share):
+    """Верхняя граница корзины с нужной долей писем, секунды; None без
+    писем, бесконечность — за последней границей."""
+    total = sum(histogram)
+    if not total:
+        return None
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= total * share:
+            break
+    if index == len(LATENCY_BUCKETS):
+        return float("inf")
+    return LATENCY_BUCKETS[index]
+
+
+class MailQueue:
+    """Очередь писем с фоновым потоком отправки.
+
+    Поток собирает письма пачками до ``batch_size`` (ждёт догоняющие не
+    дольше ``linger`` секунд) и отправляет каждую пачку через одно
+    соединение ``backend``. Соединение держится открытым между пачками и
+    закрывается, если писем нет ``idle_timeout`` секунд: SMTP не
+    переподключается на каждое письмо, файловый backend пишет пачку в
+    один файл.
+    """
+
+    def __init__(self, backend, batch_size=50, linger=0.05, idle_timeout=30,
+                 **connection_options):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.linger = linger
+        self.idle_timeout = idle_timeout
+        self.connection_options = connection_options
+        self.queue = queue.Queue()
+        self.stats = DeliveryStats()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+    def put(self, messages):
+        now = time.monotonic()
+        for message in messages:
+            self.queue.put((now, message))
+        self.stats.queued(self.depth)
+        self.start()
+
+    def start(self):
+        # Поток запускается лениво: после fork у процесса свой поток.
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="mail-queue", daemon=True
+                )
+                self.thread.start()
+
+    def next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=self.idle_timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                ))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        connection = get_connection(
+            self.backend, fail_silently=False, **self.connection_options
+        )
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                self.close(connection)
+                continue
+            try:
+                self.deliver(connection, batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    @staticmethod
+    def close(connection):
+        try:
+            connection.close()
+        except Exception:
+            logger.warning("Соединение с почтовым сервером закрыто с ошибкой")
+
+    def deliver(self, connection, batch):
+        sent = failed = position = 0
+        latencies = []
+        retried = False
+        while position < len(batch):
+            queued_at, message = batch[position]
+            try:
+                connection.open()
+                # По одному письму: после сбоя повторяются только
+                # неотправленные. Соединение и файл остаются общими.
+                delivered = connection.send_messages([message]) or 0
+            except Exception:
+                # Соединение могло устареть, пока очередь простаивала.
+                self.close(connection)
+                if not retried:
+                    retried = True
+                    continue
+                logger.exception(
+                    "Не удалось отправить %d писем", len(batch) - position
+                )
+                failed += len(batch) - position
+                break
+            position += 1
+            if delivered:
+                sent += 1
+                latencies.append(time.monotonic() - queued_at)
+            else:
+                failed += 1
+        self.stats.delivered(sent, failed, latencies)
+        logger.debug("Отправлено %d писем, в очереди %d", sent, self.depth)
+
+    def flush(self, timeout=None):
+        """Ждёт, пока очередь опустеет; False, если не дождались."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = MailQueue(
+                settings.EMAIL_QUEUE_BACKEND,
+                batch_size=settings.EMAIL_QUEUE_BATCH_SIZE,
+                linger=settings.EMAIL_QUEUE_LINGER,
+                idle_timeout=settings.EMAIL_QUEUE_IDLE_TIMEOUT,
+            )
+            # Дать потоку дописать очередь при штатной остановке процесса.
+            atexit.register(_queue.flush, settings.EMAIL_QUEUE_IDLE_TIMEOUT)
+        return _queue
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+ENCODINGS = ("identity", "gzip", "br")
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет время до первого байта, полное время ответа и размер "
+        "страницы для разных Accept-Encoding."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="/")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def measure(self, client, url, encoding):
+        started = time.perf_counter()
+        response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        if response.streaming:
+            chunks = iter(response.streaming_content)
+            first = next(chunks, b"")
+            first_byte = time.perf_counter() - started
+            size = len(first) + sum(len(chunk) for chunk in chunks)
+        else:
+            first_byte = time.perf_counter() - started
+            size = len(response.content)
+        total = time.perf_counter() - started
+        return first_byte, total, size, response.get("Content-Encoding", "-")
+
+    def handle(self, *args, **options):
+        client = Client()
+        repeat = options["repeat"]
+        for encoding in ENCODINGS:
+            # Первый запрос прогревает кеш и шаблоны.
+            self.measure(client, options["url"], encoding)
+            results = [
+                self.measure(client, options["url"], encoding)
+                for _ in range(repeat)
+            ]
+            first_byte = sum(result[0] for result in results) / repeat
+            total = sum(result[1] for result in results) / repeat
+            _, _, size, applied = results[-1]
+            self.stdout.write(
+                f"{encoding:>8}: TTFB {first_byte * 1000:.2f} мс, "
+                f"всего {total * 1000:.2f} мс, {size} байт "
+                f"(Content-Encoding: {applied})"
+            )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.mail.delivery import get_queue
+
+
+def seconds(value):
+    if value is None:
+        return "—"
+    return f"≤ {value:g} с"
+
+
+class Command(BaseCommand):
+    help = (
+        "Показывает доставку писем фоновой очередью во всех процессах с "
+        "общим кешем: отправлено, ошибки, наибольшая глубина очереди и "
+        "задержка от постановки в очередь до отправки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Обнулить счётчики."
+        )
+
+    def handle(self, *args, **options):
+        stats = get_queue().stats
+        snapshot = stats.snapshot()
+        self.stdout.write(f"Отправлено: {snapshot['sent']}")
+        self.stdout.write(f"Ошибок: {snapshot['failed']}")
+        self.stdout.write(
+            f"Наибольшая глубина очереди: {snapshot['max_queue_depth']}"
+        )
+        self.stdout.write(
+            f"Задержка p50: {seconds(snapshot['latency_p50'])}, "
+            f"p95: {seconds(snapshot['latency_p95'])}"
+        )
+        if options["reset"]:
+            stats.reset()
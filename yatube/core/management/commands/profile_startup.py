@@ -0,0 +1,120 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном процессе: старт должен быть холодным.
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+configured = time.perf_counter()
+django.setup()
+ready = time.perf_counter()
+from django.urls import resolve
+resolve(sys.argv[1])
+resolved = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+loaded = time.perf_counter()
+print(json.dumps({
+    "settings": configured - started,
+    "apps_ready": ready - configured,
+    "urlconf": resolved - ready,
+    "middleware": loaded - resolved,
+}))
+"""
+
+PHASES = {
+    "settings": "импорт настроек",
+    "apps_ready": "django.setup() (apps ready)",
+    "urlconf": "загрузка URLconf",
+    "middleware": "цепочка middleware",
+}
+
+
+def parse_importtime(stderr):
+    """Строки ``-X importtime`` → {модуль: (собственное, суммарное), мкс}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет холодный старт воркера: время импорта модулей, "
+        "готовности приложений, загрузки URLconf и middleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15)
+
+    def probe(self, path):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE, path],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        )
+        wall = time.perf_counter() - started
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return wall, json.loads(result.stdout), parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        runs = [self.probe(options["path"]) for _ in range(options["repeat"])]
+        self.stdout.write(
+            f"Профиль: {os.environ['DJANGO_SETTINGS_MODULE']}, "
+            f"запусков: {len(runs)} (медианы)"
+        )
+        self.stdout.write(
+            "Холодный старт процесса: "
+            f"{statistics.median(run[0] for run in runs) * 1000:.0f} мс"
+        )
+        for phase, title in PHASES.items():
+            value = statistics.median(run[1][phase] for run in runs)
+            self.stdout.write(f"  {title}: {value * 1000:.0f} мс")
+
+        modules = runs[len(runs) // 2][2]
+        imports = statistics.median(
+            sum(own for own, _ in run[2].values()) for run in runs
+        )
+        self.stdout.write(
+            f"  импорт модулей: {imports / 1000:.0f} мс, "
+            f"модулей: {len(modules)}"
+        )
+        packages = Counter()
+        for name, (own, _) in modules.items():
+            packages[name.split(".")[0]] += own
+        self.stdout.write("\nИмпорт по пакетам (собственное время):")
+        for package, own in packages.most_common(options["top"]):
+            self.stdout.write(f"  {own / 1000:8.1f} мс  {package}")
+        self.stdout.write("\nСамые дорогие модули (с зависимостями):")
+        heaviest = sorted(
+            modules.items(), key=lambda item: item[1][1], reverse=True
+        )
+        for name, (own, cumulative) in heaviest[:options["top"]]:
+            self.stdout.write(
+                f"  {cumulative / 1000:8.1f} мс  {name} "
+                f"(сам {own / 1000:.1f} мс)"
+            )
+        if "pkg_resources" in modules:
+            self.stdout.write(
+                "\ndistutils импортирован через setuptools (pkg_resources): "
+                "запускайте воркеры с SETUPTOOLS_USE_DISTUTILS=stdlib."
+            )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core import singleflight
+
+
+class Command(BaseCommand):
+    help = (
+        "Показывает, чем закончились промахи кеша: пересчёт, ожидание "
+        "чужого пересчёта, прежнее значение или пересчёт после ожидания."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Обнулить счётчики."
+        )
+
+    def handle(self, *args, **options):
+        stats = singleflight.stats()
+        total = sum(stats.values())
+        for outcome, count in stats.items():
+            share = count / total * 100 if total else 0
+            self.stdout.write(f"{outcome:>10}: {count:8} ({share:.0f}%)")
+        saved = stats[singleflight.COALESCED] + stats[singleflight.STALE]
+        self.stdout.write(f"Запросов без пересчёта: {saved}")
+        if options["reset"]:
+            singleflight.reset_stats()
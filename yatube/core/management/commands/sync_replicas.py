@@ -0,0 +1,28 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db.routers import PRIMARY_DB
+
+
+class Command(BaseCommand):
+    help = "Копирует основную SQLite-базу в файлы реплик."
+
+    def handle(self, *args, **options):
+        source = connections[PRIMARY_DB]
+        source.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            if replica.vendor != "sqlite":
+                raise CommandError(
+                    f"Реплика {alias} не SQLite, синхронизация не нужна."
+                )
+            replica.close()
+            target = sqlite3.connect(replica.settings_dict["NAME"])
+            try:
+                source.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f"Реплика {alias} обновлена.")
@@ -0,0 +1,115 @@
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/|application/(json|javascript|xml|rss\+xml|atom\+xml))"
+)
+GZIP_LEVEL: int = 6
+# Средняя степень: на динамических страницах важнее время, чем байты.
+BROTLI_QUALITY: int = 5
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding с ненулевым q."""
+    accepted = set()
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        if name and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def negotiate(request):
+    accepted = accepted_encodings(request)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compressor(encoding):
+    """Возвращает пару (сжать кусок со сбросом буфера, завершить поток)."""
+    if encoding == "br":
+        stream = brotli.Compressor(quality=BROTLI_QUALITY)
+        return (
+            lambda chunk: stream.process(chunk) + stream.flush(),
+            stream.finish,
+        )
+    stream = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (
+        lambda chunk: stream.compress(chunk) + stream.flush(zlib.Z_SYNC_FLUSH),
+        stream.flush,
+    )
+
+
+def compress(content, encoding):
+    process, finish = compressor(encoding)
+    return process(content) + finish()
+
+
+def compress_stream(chunks, encoding):
+    # Каждый кусок сбрасывается сразу, иначе шапка страницы
+    # застрянет в буфере компрессора до конца ленты.
+    process, finish = compressor(encoding)
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware:
+    """Сжимает ответы в brotli или gzip по заголовку Accept-Encoding.
+
+    Обычные ответы короче ``COMPRESSION_MIN_SIZE`` байт отдаются как есть,
+    потоковые сжимаются по кускам без буферизации всей страницы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header("Content-Encoding"):
+            return response
+        if not COMPRESSIBLE_TYPES.match(response.get("Content-Type", "")):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request)
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response["Content-Length"]
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # Сжатое тело отличается побайтно: ETag становится слабым.
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,67 @@
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+from core.ratelimit import client_key, parse_rate
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitMiddleware:
+    """Ограничивает частоту запросов к view по алгоритму token bucket.
+
+    Правила в ``RATELIMITS`` задаются по имени URL: методы, частота
+    (``"5/m"``) и ключ (``"user"`` или ``"ip"``). Запросы с методами,
+    которых нет ни в одном правиле, проходят без обращения к хранилищу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rules = {
+            view_name: {
+                "methods": set(rule.get("methods", ("POST",))),
+                "key": rule.get("key", "ip"),
+                "rate": parse_rate(rule["rate"]),
+            }
+            for view_name, rule in settings.RATELIMITS.items()
+        }
+        self.methods = set().union(
+            *(rule["methods"] for rule in self.rules.values())
+        )
+        self.store = import_string(settings.RATELIMIT_STORE)(
+            **settings.RATELIMIT_STORE_OPTIONS
+        )
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.methods:
+            return None
+        view_name = request.resolver_match.view_name
+        rule = self.rules.get(view_name)
+        if rule is None or request.method not in rule["methods"]:
+            return None
+        capacity, per_second = rule["rate"]
+        key = f"{view_name}:{client_key(request, rule['key'])}"
+        try:
+            allowed, tokens = self.store.take(
+                key, capacity, per_second, time.time()
+            )
+        except Exception:
+            # Недоступное хранилище не должно ронять сайт.
+            logger.exception("Хранилище ограничителя запросов недоступно")
+            return None
+        if allowed:
+            return None
+        response = HttpResponse(
+            "Слишком много запросов, попробуйте позже.",
+            status=429,
+            content_type="text/plain; charset=utf-8",
+        )
+        response["Retry-After"] = str(math.ceil((1 - tokens) / per_second))
+        return response
@@ -0,0 +1,33 @@
+from django.conf import settings
+
+from core.db.routers import use_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_COOKIE: str = "pin_primary"
+
+
+class PrimaryPinningMiddleware:
+    """Читает свои записи: после изменяющего запроса на время
+    ``REPLICA_PIN_SECONDS`` все запросы клиента идут в основную базу.
+
+    View с декоратором ``core.decorators.unpinned`` клиента не закрепляет.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in SAFE_METHODS
+        if writes or PIN_COOKIE in request.COOKIES:
+            with use_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        if writes and getattr(request, "pin_primary", True):
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
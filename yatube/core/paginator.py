@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_rows(model, using):
+    """Оценка числа строк таблицы по статистике СУБД, без COUNT(*)."""
+    table = model._meta.db_table
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [table],
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+        if connection.vendor != "sqlite":
+            return None
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )
+        if cursor.fetchone():
+            cursor.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table]
+            )
+            row = cursor.fetchone()
+            if row:
+                return int(row[0].split()[0])
+        cursor.execute(
+            "SELECT MAX(rowid) - MIN(rowid) + 1 FROM %s"
+            % connection.ops.quote_name(table)
+        )
+        return cursor.fetchone()[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Для больших таблиц без фильтров заменяет COUNT(*) оценкой."""
+
+    threshold: int = 10000
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if isinstance(object_list, QuerySet) and not object_list.query.where:
+            estimate = estimate_rows(object_list.model, object_list.db)
+            if estimate is not None and estimate > self.threshold:
+                return estimate
+        return super().count
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def make_cursor(pub_date, pk):
+    """Курсор на позицию в ленте: микросекунды с эпохи и pk."""
+    return f"{(pub_date - EPOCH) // timedelta(microseconds=1)}_{pk}"
+
+
+def parse_cursor(value):
+    """Курсор → (дата, pk); None для пустого или испорченного."""
+    try:
+        microseconds, pk = value.split("_")
+        return EPOCH + timedelta(microseconds=int(microseconds)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def after_cursor(queryset, position, date_field="pub_date", pk_field="pk"):
+    """Записи, которые идут в ленте (по убыванию даты и pk) после
+    ``position``. Условие — диапазон по индексу, без OFFSET."""
+    if position is None:
+        return queryset
+    pub_date, pk = position
+    return queryset.filter(**{f"{date_field}__lte": pub_date}).exclude(
+        **{date_field: pub_date, f"{pk_field}__gte": pk}
+    )
+
+
+class CursorPage:
+    """Страница ленты с курсором на следующую.
+
+    Время выборки не зависит от глубины: ни OFFSET, ни COUNT(*).
+    """
+
+    def __init__(self, object_list, next_cursor=None, is_first=True):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or not self.is_first
+
+
+def cursor_paginate(queryset, cursor, per_page, date_field="pub_date"):
+    position = parse_cursor(cursor)
+    objects = list(
+        after_cursor(queryset, position, date_field).order_by(
+            f"-{date_field}", "-pk"
+        )[:per_page + 1]
+    )
+    next_cursor = None
+    if len(objects) > per_page:
+        del objects[per_page:]
+        last = objects[-1]
+        next_cursor = make_cursor(getattr(last, date_field), last.pk)
+    return CursorPage(objects, next_cursor, position is None)
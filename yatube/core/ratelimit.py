@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"10/m"`` → (ёмкость ведра, токенов в секунду)."""
+    count, _, period = rate.partition("/")
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+class MemoryStore:
+    """Вёдра в памяти процесса, разбитые на шарды со своими блокировками,
+    чтобы потоки разных клиентов не ждали друг друга.
+
+    Шард — LRU на OrderedDict не больше ``max_keys`` вёдер: лишнее
+    вытесняется за O(1), начиная с давно не тронутого клиента. Его ведро,
+    скорее всего, уже снова полное, то есть ничем не отличается от
+    отсутствующего.
+    """
+
+    def __init__(self, shards=64, max_keys=10000):
+        self.shards = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+        self.max_keys = max_keys
+
+    def take(self, key, capacity, rate, now):
+        """Забирает токен; возвращает (разрешено, оставшиеся токены)."""
+        lock, buckets = self.shards[hash(key) % len(self.shards)]
+        with lock:
+            tokens, updated = buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+            if len(buckets) > self.max_keys:
+                buckets.popitem(last=False)
+        return allowed, tokens
+
+
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", ARGV[3])
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisStore:
+    """Вёдра в Redis (или совместимом сервере), общие для всех процессов.
+
+    Токен забирается одним Lua-скриптом, поэтому без гонок между
+    воркерами. ``client`` — клиент с API redis-py; если не передан,
+    создаётся по ``url``.
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", client=None,
+                 prefix="ratelimit:"):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.script = client.register_script(TAKE_SCRIPT)
+        self.prefix = prefix
+
+    def take(self, key, capacity, rate, now):
+        allowed, tokens = self.script(
+            keys=[self.prefix + key], args=[capacity, rate, repr(now)]
+        )
+        return bool(allowed), float(tokens)
+
+
+def client_key(request, scope):
+    """Ключ клиента: пользователь для ``"user"`` (аноним — по IP) или IP."""
+    if scope == "user" and request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
@@ -0,0 +1,154 @@
+"""Один пересчёт на промах кеша (защита от dogpile).
+
+Когда значение пропадает из кеша, пересчитывает его один воркер. Потоки
+процесса ждут его на threading.Lock, другие процессы — на блокировке в
+самом кеше (cache.add), поэтому между серверами она работает только с
+общим бэкендом: Redis или Memcached. Пока значение считается, остальные
+запросы получают прежнее значение из ``stale_key``, а если его нет —
+ждут готового до SINGLEFLIGHT_WAIT секунд и только потом считают сами.
+
+Исходы промахов копятся в кеше: их показывает команда singleflight_stats.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+COMPUTED = "computed"
+COALESCED = "coalesced"
+STALE = "stale"
+TIMEOUT = "timeout"
+OUTCOMES = (COMPUTED, COALESCED, STALE, TIMEOUT)
+
+LOCK_PREFIX = "singleflight:lock:"
+STATS_PREFIX = "singleflight:stats:"
+MISSING = object()
+
+_guard = threading.Lock()
+# ключ → [блокировка, число потоков, которые её держат или ждут]
+_locks = {}
+
+
+def record(outcome):
+    key = STATS_PREFIX + outcome
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    """Число промахов по исходам во всех процессах с общим кешем."""
+    values = cache.get_many([STATS_PREFIX + outcome for outcome in OUTCOMES])
+    return {
+        outcome: values.get(STATS_PREFIX + outcome, 0)
+        for outcome in OUTCOMES
+    }
+
+
+def reset_stats():
+    cache.delete_many([STATS_PREFIX + outcome for outcome in OUTCOMES])
+
+
+def _enter(key):
+    with _guard:
+        entry = _locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    return entry
+
+
+def _leave(key, entry):
+    with _guard:
+        entry[1] -= 1
+        if not entry[1]:
+            del _locks[key]
+
+
+def _stale(stale_key):
+    if stale_key is None:
+        return MISSING
+    value = cache.get(stale_key, MISSING)
+    if value is not MISSING:
+        record(STALE)
+    return value
+
+
+def _wait(key):
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(settings.SINGLEFLIGHT_POLL)
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+    return MISSING
+
+
+def _store(key, value, timeout, stale_key):
+    cache.set(key, value, timeout)
+    if stale_key is not None:
+        # Прежнее значение нужно и после того, как истёк срок нового.
+        cache.set(stale_key, value, None)
+
+
+def _fill(key, compute, timeout, stale_key):
+    """Пересчёт под блокировкой в кеше, общей для всех процессов."""
+    lock_key = LOCK_PREFIX + key
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, settings.SINGLEFLIGHT_LOCK_TIMEOUT):
+        value = _stale(stale_key)
+        if value is not MISSING:
+            return value
+        value = _wait(key)
+        if value is not MISSING:
+            record(COALESCED)
+            return value
+        record(TIMEOUT)
+        value = compute()
+        _store(key, value, timeout, stale_key)
+        return value
+    try:
+        value = compute()
+        _store(key, value, timeout, stale_key)
+        record(COMPUTED)
+        return value
+    finally:
+        # Блокировка могла истечь и достаться другому: чужую не снимаем.
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def get_or_set(key, compute, timeout=None, stale_key=None):
+    """Как cache.get_or_set, но ``compute`` на промахе вызывает один
+    воркер. ``stale_key`` хранит последнее значение без срока: его
+    получают остальные запросы, пока новое считается."""
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        return value
+    entry = _enter(key)
+    try:
+        lock = entry[0]
+        owner = lock.acquire(blocking=False)
+        if not owner:
+            # Значение уже считает другой поток этого процесса.
+            value = _stale(stale_key)
+            if value is not MISSING:
+                return value
+            owner = lock.acquire(timeout=settings.SINGLEFLIGHT_WAIT)
+            value = cache.get(key, MISSING)
+            if value is not MISSING:
+                if owner:
+                    lock.release()
+                record(COALESCED)
+                return value
+            if not owner:
+                record(TIMEOUT)
+                return compute()
+        try:
+            return _fill(key, compute, timeout, stale_key)
+        finally:
+            lock.release()
+    finally:
+        _leave(key, entry)
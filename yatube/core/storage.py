@@ -0,0 +1,27 @@
+import hashlib
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentHashStorage(FileSystemStorage):
+    """Называет файлы по SHA-256 содержимого.
+
+    Одинаковые загрузки хранятся один раз, а файл по адресу никогда
+    не меняется — его можно кешировать в браузере и CDN навсегда.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name.replace("\\", "/"))
+        extension = posixpath.splitext(filename)[1].lower()
+        hexdigest = digest.hexdigest()
+        name = posixpath.join(
+            directory, hexdigest[:2], hexdigest[2:] + extension
+        )
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
@@ -0,0 +1,48 @@
+from contextlib import nullcontext
+
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+from core.db.routers import (primary_pinned, replica_allowed, use_primary,
+                             use_replica)
+
+STREAM_PLACEHOLDER: str = "<!-- stream -->"
+
+
+def stream_render(request, template_name, context, items, item_template,
+                  item_name="post"):
+    """Как ``render()``, но элементы ``items`` отдаются потоком.
+
+    Страница рендерится сразу с заглушкой ``{{ stream }}`` на месте
+    списка: шапка уходит клиенту до запроса постов и их рендеринга,
+    каждый элемент — отдельным куском по шаблону ``item_template``.
+    """
+    page = render_to_string(
+        template_name,
+        {**context, "stream": mark_safe(STREAM_PLACEHOLDER)},
+        request,
+    )
+    head, tail = page.split(STREAM_PLACEHOLDER, 1)
+    item_template = get_template(item_template)
+    # Генератор дочитывается после выхода из view и middleware.
+    if primary_pinned():
+        database = use_primary()
+    elif replica_allowed():
+        database = use_replica()
+    else:
+        database = nullcontext()
+
+    def content():
+        yield head
+        with database:
+            objects = list(items)
+            last = len(objects)
+            for index, item in enumerate(objects, 1):
+                # Без request: контекст-процессоры не нужны каждой карточке.
+                yield item_template.render(
+                    {**context, item_name: item, "last": index == last}
+                )
+        yield tail
+
+    return StreamingHttpResponse(content())
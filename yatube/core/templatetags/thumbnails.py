@@ -0,0 +1,14 @@
+from django import template
+
+from core import thumbnails
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail_url(image, preset):
+    """Миниатюра из пула или исходник: при рендере картинки
+    не обрабатываются."""
+    if not image:
+        return ""
+    return thumbnails.thumbnail_url(image.name, preset)
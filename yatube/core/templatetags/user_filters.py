@@ -6,3 +6,12 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={"class": css})
+
+
+@register.filter
+def page_window(page, size=5):
+    """Номера страниц вокруг текущей: на больших лентах полный
+    page_range — это десятки тысяч ссылок."""
+    first = max(page.number - size, 1)
+    last = min(page.number + size, page.paginator.num_pages)
+    return range(first, last + 1)
@@ -0,0 +1,49 @@
+import gzip
+import zlib
+
+import brotli
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.middleware.compression import CompressionMiddleware
+
+BODY = "<p>Текст поста</p>" * 200
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, response, accept):
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(
+            self.factory.get("/", HTTP_ACCEPT_ENCODING=accept)
+        )
+
+    def test_negotiates_encoding(self):
+        """brotli предпочтительнее gzip, q=0 отключает кодировку."""
+        response = self.get(HttpResponse(BODY), "gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content).decode(), BODY)
+
+        response = self.get(HttpResponse(BODY), "gzip, br;q=0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content).decode(), BODY)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_small_responses_are_not_compressed(self):
+        """Ответы меньше порога отдаются без сжатия."""
+        response = self.get(HttpResponse("<p>Коротко</p>"), "gzip, br")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_stream_is_flushed_per_chunk(self):
+        """Первый кусок потока распаковывается до конца ответа."""
+        response = self.get(
+            StreamingHttpResponse(iter([b"<header>", b"<main>"])), "gzip"
+        )
+        chunks = iter(response.streaming_content)
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.assertEqual(decoder.decompress(next(chunks)), b"<header>")
+        rest = b"".join(decoder.decompress(chunk) for chunk in chunks)
+        self.assertEqual(rest, b"<main>")
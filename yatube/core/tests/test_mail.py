@@ -0,0 +1,131 @@
+import os
+import socketserver
+import tempfile
+import threading
+from io import StringIO
+
+from django.core.cache import cache
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.mail.delivery import MailQueue
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и запоминает их."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 Bye")
+                return
+            if command == "EHLO":
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                for data in iter(self.rfile.readline, b".\r\n"):
+                    body.append(data)
+                self.server.messages.append(b"".join(body))
+                self.reply("250 OK")
+            else:
+                self.reply("250 OK")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+def messages(count):
+    return [
+        EmailMessage(f"Сброс пароля {i}", "Ссылка", to=[f"user{i}@test"])
+        for i in range(count)
+    ]
+
+
+class FlakyBackend(EmailBackend):
+    """Обрывает соединение на третьем письме, как устаревший SMTP."""
+
+    failures = 0
+
+    def send_messages(self, messages):
+        for message in messages:
+            if len(mail.outbox) == 2 and FlakyBackend.failures:
+                FlakyBackend.failures -= 1
+                raise ConnectionResetError
+            super().send_messages([message])
+        return len(messages)
+
+
+class MailQueueTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_smtp_connection_is_pooled(self):
+        """Пачки писем уходят через одно SMTP-соединение."""
+        server = SMTPStandIn()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        mail_queue = MailQueue(
+            "django.core.mail.backends.smtp.EmailBackend",
+            batch_size=4,
+            host="127.0.0.1",
+            port=server.server_address[1],
+        )
+        mail_queue.put(messages(10))
+        self.assertTrue(mail_queue.flush(timeout=5))
+        mail_queue.put(messages(3))
+        self.assertTrue(mail_queue.flush(timeout=5))
+
+        self.assertEqual(len(server.messages), 13)
+        self.assertEqual(server.connections, 1)
+        stats = mail_queue.stats.snapshot()
+        self.assertEqual((stats["sent"], stats["failed"]), (13, 0))
+        self.assertGreaterEqual(stats["max_queue_depth"], 10)
+        self.assertIsNotNone(stats["latency_p95"])
+
+    def test_file_backend_writes_batch_to_one_file(self):
+        """Файловый backend пишет пачку писем в один файл."""
+        with tempfile.TemporaryDirectory() as path:
+            mail_queue = MailQueue(
+                "django.core.mail.backends.filebased.EmailBackend",
+                idle_timeout=0.1,
+                file_path=path,
+            )
+            mail_queue.put(messages(5))
+            self.assertTrue(mail_queue.flush(timeout=5))
+            files = os.listdir(path)
+            self.assertEqual(len(files), 1)
+            with open(os.path.join(path, files[0])) as sent:
+                self.assertEqual(sent.read().count("Subject:"), 5)
+
+    def test_retry_sends_only_unsent(self):
+        """После сбоя посреди пачки повторно уходят только
+        неотправленные письма, а итоги видны команде mail_stats."""
+        FlakyBackend.failures = 1
+        mail_queue = MailQueue("core.tests.test_mail.FlakyBackend")
+        mail_queue.put(messages(5))
+        self.assertTrue(mail_queue.flush(timeout=5))
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            [f"Сброс пароля {i}" for i in range(5)],
+        )
+        output = StringIO()
+        call_command("mail_stats", stdout=output)
+        self.assertIn("Отправлено: 5\nОшибок: 0", output.getvalue())
@@ -0,0 +1,73 @@
+import fakeredis
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve
+
+from core.middleware.ratelimit import RateLimitMiddleware
+from core.ratelimit import MemoryStore, RedisStore
+
+RATELIMITS = {"users:login": {"rate": "2/m"}}
+
+
+@override_settings(
+    RATELIMITS=RATELIMITS,
+    RATELIMIT_STORE="core.ratelimit.MemoryStore",
+    RATELIMIT_STORE_OPTIONS={},
+)
+class RateLimitMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse())
+
+    def request(self, method="post", ip="10.0.0.1"):
+        request = getattr(self.factory, method)("/auth/login/", REMOTE_ADDR=ip)
+        request.user = AnonymousUser()
+        request.resolver_match = resolve(request.path)
+        return self.middleware.process_view(request, None, (), {})
+
+    def test_limits_writes_per_ip(self):
+        """После исчерпания ведра POST получает 429, другой IP — нет."""
+        self.assertIsNone(self.request())
+        self.assertIsNone(self.request())
+        response = self.request()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertIsNone(self.request(ip="10.0.0.2"))
+
+    def test_reads_are_not_limited(self):
+        """GET не трогает хранилище."""
+        for _ in range(5):
+            self.assertIsNone(self.request(method="get"))
+        self.assertEqual(
+            sum(len(buckets) for _, buckets in self.middleware.store.shards),
+            0,
+        )
+
+
+class StoreTests(SimpleTestCase):
+    def check_bucket(self, store):
+        self.assertEqual(store.take("key", 2, 1, 100.0), (True, 1))
+        self.assertEqual(store.take("key", 2, 1, 100.0), (True, 0))
+        self.assertFalse(store.take("key", 2, 1, 100.5)[0])
+        self.assertTrue(store.take("key", 2, 1, 102.0)[0])
+
+    def test_memory_store(self):
+        """Ведро пополняется со временем и не больше ёмкости."""
+        self.check_bucket(MemoryStore(shards=4))
+
+    def test_memory_store_evicts_least_recent(self):
+        """Сверх max_keys вытесняется ведро, которое дольше всех не
+        трогали, а не недавнее опустошённое."""
+        store = MemoryStore(shards=1, max_keys=3)
+        self.assertEqual(store.take("busy", 1, 0.001, 0.0), (True, 0))
+        for client in range(5):
+            store.take(f"ip:{client}", 1, 0.001, 1.0)
+            store.take("busy", 1, 0.001, 1.0)
+        _, buckets = store.shards[0]
+        self.assertEqual(list(buckets), ["ip:3", "ip:4", "busy"])
+        self.assertFalse(store.take("busy", 1, 0.001, 2.0)[0])
+
+    def test_redis_store(self):
+        """Redis-хранилище ведёт себя так же, как память процесса."""
+        self.check_bucket(RedisStore(client=fakeredis.FakeRedis()))
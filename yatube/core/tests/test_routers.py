@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db.utils import ConnectionDoesNotExist
+from django.http import HttpResponse
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.urls import reverse
+
+from core.db.routers import (ReplicaRouter, primary_pinned, use_primary,
+                             use_replica)
+from core.middleware.replicas import PIN_COOKIE, PrimaryPinningMiddleware
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_PIN_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    @use_replica()
+    def view(self, request):
+        self.seen.append(self.router.db_for_read(None))
+        return HttpResponse()
+
+    def test_reads_go_to_replica_only_when_allowed(self):
+        """С реплики читают только внутри use_replica(), запись — всегда
+        в основную базу."""
+        self.assertEqual(self.router.db_for_read(None), "default")
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(None), "replica")
+        self.assertEqual(self.router.db_for_write(None), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "posts"))
+
+    def test_use_primary_pins_reads(self):
+        """Внутри use_primary() чтение идёт в основную базу даже там, где
+        разрешены реплики."""
+        with use_primary(), use_replica():
+            self.assertEqual(self.router.db_for_read(None), "default")
+        self.assertFalse(primary_pinned())
+
+    def test_write_sets_sticky_cookie(self):
+        """После POST клиент читает из основной базы."""
+        middleware = PrimaryPinningMiddleware(self.view)
+        response = middleware(self.factory.post("/create/"))
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        middleware(request)
+        middleware(self.factory.get("/"))
+        self.assertEqual(self.seen, ["default", "default", "replica"])
+
+
+class ReplicaViewsTests(TestCase):
+    def test_session_survives_pin_expiry(self):
+        """Сессия, созданная в основной базе, действует и после того, как
+        кука закрепления истекла: сессии с реплик не читаются."""
+        user = get_user_model().objects.create_user(username="Reader")
+        self.client.force_login(user)
+        self.assertNotIn(PIN_COOKIE, self.client.cookies)
+        # Реплики «replica» в тестах нет: чтение с неё упало бы.
+        with self.settings(DATABASE_REPLICAS=["replica"]):
+            response = self.client.get(reverse("posts:follow_index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["user"], user)
+
+    def test_feed_views_read_replica(self):
+        """Ленты читают с реплики."""
+        with self.settings(DATABASE_REPLICAS=["replica"]):
+            for url in (reverse("posts:index"), reverse("posts:index_rss")):
+                with self.subTest(url=url):
+                    with self.assertRaises(ConnectionDoesNotExist):
+                        self.client.get(url)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import singleflight
+
+KEY = "page:2"
+STALE_KEY = "page:stale"
+
+
+@override_settings(SINGLEFLIGHT_WAIT=1, SINGLEFLIGHT_POLL=0.01)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        time.sleep(0.1)
+        return "new"
+
+    def lock_elsewhere(self):
+        """Пересчёт уже идёт в другом процессе."""
+        cache.add(singleflight.LOCK_PREFIX + KEY, "other", 30)
+
+    def test_concurrent_misses_compute_once(self):
+        """Потоки с одновременным промахом ждут один пересчёт."""
+        results = []
+
+        def request():
+            results.append(singleflight.get_or_set(KEY, self.compute))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["new"] * 8)
+        self.assertEqual(self.calls, 1)
+        stats = singleflight.stats()
+        self.assertEqual(stats[singleflight.COMPUTED], 1)
+        self.assertEqual(stats[singleflight.COALESCED], 7)
+        self.assertFalse(cache.get(singleflight.LOCK_PREFIX + KEY))
+
+    def test_stale_value_while_computing(self):
+        """Пока другой процесс считает, отдаётся прежнее значение."""
+        cache.set(STALE_KEY, "old")
+        self.lock_elsewhere()
+        self.assertEqual(
+            singleflight.get_or_set(KEY, self.compute, stale_key=STALE_KEY),
+            "old",
+        )
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(singleflight.stats()[singleflight.STALE], 1)
+
+    def test_waits_for_other_process(self):
+        """Без прежнего значения запрос дожидается чужого пересчёта."""
+        self.lock_elsewhere()
+        threading.Timer(0.05, cache.set, [KEY, "theirs"]).start()
+        self.assertEqual(singleflight.get_or_set(KEY, self.compute), "theirs")
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(singleflight.stats()[singleflight.COALESCED], 1)
+
+    @override_settings(SINGLEFLIGHT_WAIT=0.05)
+    def test_computes_after_wait(self):
+        """Если чужой пересчёт не успел, запрос считает сам."""
+        self.lock_elsewhere()
+        self.assertEqual(
+            singleflight.get_or_set(KEY, self.compute, stale_key=STALE_KEY),
+            "new",
+        )
+        self.assertEqual(cache.get(KEY), "new")
+        self.assertEqual(cache.get(STALE_KEY), "new")
+        self.assertEqual(singleflight.stats()[singleflight.TIMEOUT], 1)
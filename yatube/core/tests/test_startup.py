@@ -0,0 +1,30 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.management.commands.profile_startup import Command
+from yatube import settings_feed
+
+
+class FeedProfileTests(SimpleTestCase):
+    def test_profile_skips_admin_and_messages(self):
+        """Профиль лент не загружает админку и сообщения."""
+        for app in settings_feed.SKIPPED_APPS:
+            self.assertNotIn(app, settings_feed.INSTALLED_APPS)
+        self.assertNotIn(
+            "django.contrib.messages.middleware.MessageMiddleware",
+            settings_feed.MIDDLEWARE,
+        )
+
+    def test_cold_start_without_admin(self):
+        """В отдельном процессе с settings_feed воркер разбирает URL
+        ленты, не импортируя админку и сообщения."""
+        with mock.patch.dict(
+            os.environ, DJANGO_SETTINGS_MODULE="yatube.settings_feed"
+        ):
+            _, phases, modules = Command().probe("/")
+        self.assertGreater(phases["urlconf"], 0)
+        self.assertIn("about.views", modules)
+        for app in settings_feed.SKIPPED_APPS:
+            self.assertNotIn(app, modules)
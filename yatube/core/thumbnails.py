@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import posixpath
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_name(name, preset):
+    """Имя миниатюры выводится из имени исходника, которое уже содержит
+    хеш содержимого, поэтому тоже не меняется со временем."""
+    return posixpath.join(
+        "thumbs", preset, posixpath.splitext(name)[0] + ".jpg"
+    )
+
+
+def make_thumbnail(source, target, size, crop):
+    """Выполняется в процессе пула: только Pillow, без Django и базы."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        if crop:
+            image = ImageOps.fit(image, size, Image.LANCZOS)
+        else:
+            image.thumbnail(size, Image.LANCZOS)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Пишем во временный файл: читатели не увидят миниатюру наполовину.
+        fd, temporary = tempfile.mkstemp(
+            dir=os.path.dirname(target), suffix=".tmp"
+        )
+        with os.fdopen(fd, "wb") as output:
+            image.save(output, "JPEG", quality=85, optimize=True)
+        os.replace(temporary, target)
+    return target
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: дочерние процессы не наследуют потоки и соединения
+            # с базой родителя.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def schedule(name):
+    """Ставит в пул построение недостающих миниатюр картинки."""
+    futures = []
+    for preset, options in settings.THUMBNAIL_PRESETS.items():
+        target = thumbnail_name(name, preset)
+        if default_storage.exists(target):
+            continue
+        futures.append(get_executor().submit(
+            make_thumbnail,
+            default_storage.path(name),
+            default_storage.path(target),
+            options["size"],
+            options.get("crop", False),
+        ))
+    return futures
+
+
+def thumbnail_url(name, preset):
+    """Адрес готовой миниатюры, а пока её нет — исходной картинки."""
+    target = thumbnail_name(name, preset)
+    if default_storage.exists(target):
+        return default_storage.url(target)
+    return default_storage.url(name)
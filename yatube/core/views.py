@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+
+def serve_media(request, path):
+    """Отдаёт загруженные файлы при DEBUG. Их имена содержат хеш
+    содержимого, поэтому ответ кешируется надолго и не перепроверяется."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if response.status_code == 200:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.MEDIA_CACHE_MAX_AGE,
+            immutable=True,
+        )
+    return response
+
+
+def serve_sitemap(request, path):
+    """Отдаёт файлы карты сайта при DEBUG."""
+    return serve(request, path, document_root=settings.SITEMAP_ROOT)
@@ -1,19 +1,167 @@
-from django.contrib import admin
+from datetime import timedelta
 
-from .models import Group, Post
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from core.paginator import EstimatedCountPaginator
+
+from .bulk import move_to_groups
+from .models import ArchivedPost, Comment, Follow, Group, Post, PostReview
+
+
+class GroupActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.all(),
+        required=False,
+        label="Группа",
+    )
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ("pk", "text", "pub_date", "author", "group")
     list_editable = ("group",)
+    list_select_related = ("author", "group")
     search_fields = ("text",)
     list_filter = ("pub_date",)
+    date_hierarchy = "pub_date"
+    autocomplete_fields = ("author", "group")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = "-пусто-"
+    action_form = GroupActionForm
+    actions = ("move_to_group",)
+
+    def move_to_group(self, request, queryset):
+        form = GroupActionForm(request.POST)
+        form.fields["action"].choices = self.get_action_choices(request)
+        if not form.is_valid():
+            self.message_user(request, "Группа не найдена.", messages.ERROR)
+            return
+        group = form.cleaned_data["group"]
+        group_id = group.pk if group else None
+        post_ids = queryset.values_list("pk", flat=True)
+        move_to_groups(dict.fromkeys(post_ids, group_id))
+        self.message_user(request, f"Перенесено постов: {len(post_ids)}")
+
+    move_to_group.short_description = "Перенести в группу"
+
+    def save_model(self, request, obj, form, change):
+        pending = getattr(request, "group_changes", None)
+        if pending is not None and form.changed_data == ["group"]:
+            pending[obj.pk] = obj.group_id
+            return
+        super().save_model(request, obj, form, change)
+
+    def changelist_view(self, request, extra_context=None):
+        # Правки колонки группы собираем со всей страницы и сохраняем
+        # пакетно вместо полного save() на каждую строку.
+        if request.method == "POST" and "_save" in request.POST:
+            request.group_changes = {}
+        with transaction.atomic():
+            response = super().changelist_view(request, extra_context)
+            move_to_groups(getattr(request, "group_changes", None))
+        return response
+
+    def get_changelist_formset(self, request, **kwargs):
+        # Список групп загружаем один раз на страницу, а не в каждой строке.
+        formset = super().get_changelist_formset(request, **kwargs)
+        field = formset.form.base_fields["group"]
+        field.widget = forms.Select()
+        field.choices = list(field.choices)
+        return formset
 
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ("title", "slug", "description")
+    list_display = (
+        "title",
+        "slug",
+        "description",
+        "posts_count",
+        "authors_count",
+        "week_posts",
+    )
+    list_select_related = ("stats",)
     search_fields = ("title",)
     list_filter = ("slug",)
+
+    def get_queryset(self, request):
+        week_ago = timezone.localdate() - timedelta(days=6)
+        return super().get_queryset(request).annotate(
+            week_posts=Sum(
+                "daily_stats__posts_count",
+                filter=Q(daily_stats__day__gte=week_ago),
+            )
+        )
+
+    def posts_count(self, obj):
+        stats = getattr(obj, "stats", None)
+        return stats.posts_count if stats else 0
+
+    posts_count.short_description = "Постов"
+
+    def authors_count(self, obj):
+        stats = getattr(obj, "stats", None)
+        return stats.authors_count if stats else 0
+
+    authors_count.short_description = "Активных авторов"
+
+    def week_posts(self, obj):
+        return obj.week_posts or 0
+
+    week_posts.short_description = "Постов за неделю"
+    week_posts.admin_order_field = "week_posts"
+
+
+@admin.register(ArchivedPost)
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = ("pk", "text", "pub_date", "author", "group")
+    list_select_related = ("author", "group")
+    search_fields = ("text",)
+    raw_id_fields = ("author", "group")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = "-пусто-"
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ("pk", "user", "author")
+    list_select_related = ("user", "author")
+    search_fields = ("user__username", "author__username")
+    raw_id_fields = ("user", "author")
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ("pk", "text", "created", "author", "post_id")
+    list_select_related = ("author",)
+    search_fields = ("text",)
+    raw_id_fields = ("author",)
+    readonly_fields = ("post",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(PostReview)
+class PostReviewAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk", "text", "created", "author", "duplicate_of_id", "similarity"
+    )
+    list_select_related = ("author",)
+    search_fields = ("text",)
+    raw_id_fields = ("author", "group")
+    actions = ("publish",)
+
+    def publish(self, request, queryset):
+        with transaction.atomic():
+            for review in queryset:
+                review.publish()
+        self.message_user(request, f"Опубликовано постов: {len(queryset)}")
+
+    publish.short_description = "Опубликовать"
@@ -0,0 +1,240 @@
+import random
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (ArchivedPost, Group, GroupAuthorStats, GroupDailyStats,
+                     GroupStats, LikeCounterShard, Post, TimelineEntry,
+                     ViewCounterShard)
+
+
+def change_counters(group_id, author_id, pub_date, delta):
+    """Прибавляет ``delta`` постов к счётчикам сообщества, автора и дня."""
+    change_day_counters(
+        group_id, author_id, timezone.localdate(pub_date), delta
+    )
+
+
+def change_day_counters(group_id, author_id, day, delta):
+    if group_id is None:
+        return
+    enough = {"posts_count__gte": -delta} if delta < 0 else {}
+    if delta > 0:
+        GroupStats.objects.get_or_create(group_id=group_id)
+        GroupDailyStats.objects.get_or_create(group_id=group_id, day=day)
+        author_stats, _ = GroupAuthorStats.objects.get_or_create(
+            group_id=group_id, author_id=author_id
+        )
+    else:
+        # Строки может не быть (посты вставлены в обход сигналов или
+        # счётчики разошлись): убавлять тогда нечего.
+        author_stats = GroupAuthorStats.objects.filter(
+            group_id=group_id, author_id=author_id
+        ).first()
+    GroupDailyStats.objects.filter(
+        group_id=group_id, day=day, **enough
+    ).update(posts_count=F("posts_count") + delta)
+    authors_delta = 0
+    if author_stats is not None:
+        changed = GroupAuthorStats.objects.filter(
+            pk=author_stats.pk, **enough
+        ).update(posts_count=F("posts_count") + delta)
+        author_posts = GroupAuthorStats.objects.values_list(
+            "posts_count", flat=True
+        ).get(pk=author_stats.pk)
+        if author_posts == 0:
+            GroupAuthorStats.objects.filter(pk=author_stats.pk).delete()
+            if changed and delta < 0:
+                authors_delta = -1
+        elif author_posts == delta:
+            authors_delta = 1
+    GroupStats.objects.filter(group_id=group_id, **enough).update(
+        posts_count=F("posts_count") + delta
+    )
+    if authors_delta:
+        GroupStats.objects.filter(
+            group_id=group_id, authors_count__gte=-authors_delta
+        ).update(authors_count=F("authors_count") + authors_delta)
+
+
+def change_post_counter(post_id, field, delta):
+    """Прибавляет ``delta`` к счётчику поста, где бы он ни лежал:
+    в горячей таблице, в архиве и в материализованной ленте."""
+    enough = {f"{field}__gte": -delta} if delta < 0 else {}
+    for model in (Post, ArchivedPost, TimelineEntry):
+        model.objects.filter(pk=post_id, **enough).update(
+            **{field: F(field) + delta}
+        )
+
+
+def change_comments_count(post_id, delta):
+    change_post_counter(post_id, "comments_count", delta)
+
+
+def add_to_shard(model, post_id, delta, shards):
+    """Записывает изменение в случайный шард счётчика поста."""
+    shard = random.randrange(shards)
+    rows = model.objects.filter(post_id=post_id, shard=shard)
+    if not rows.update(delta=F("delta") + delta):
+        model.objects.bulk_create(
+            [model(post_id=post_id, shard=shard)], ignore_conflicts=True
+        )
+        rows.update(delta=F("delta") + delta)
+
+
+def drain_shards(model):
+    """Забирает суммы шардов по постам. Из шарда вычитается ровно
+    забранное, так что изменения во время переноса не теряются.
+    Вызывается внутри транзакции вместе с записью сумм."""
+    totals = Counter()
+    for pk, post_id, delta in model.objects.exclude(delta=0).values_list(
+        "pk", "post_id", "delta"
+    ):
+        model.objects.filter(pk=pk).update(delta=F("delta") - delta)
+        totals[post_id] += delta
+    model.objects.filter(delta=0).delete()
+    return {post_id: delta for post_id, delta in totals.items() if delta}
+
+
+def change_likes_count(post_id, delta):
+    add_to_shard(
+        LikeCounterShard, post_id, delta, settings.LIKE_COUNTER_SHARDS
+    )
+
+
+def merge_like_counters():
+    """Переносит суммы шардов лайков в счётчики постов."""
+    with transaction.atomic():
+        totals = drain_shards(LikeCounterShard)
+        for post_id, delta in totals.items():
+            change_post_counter(post_id, "likes_count", delta)
+    return len(totals)
+
+
+def record_view(post_id):
+    add_to_shard(ViewCounterShard, post_id, 1, settings.VIEW_COUNTER_SHARDS)
+
+
+def merge_view_counters():
+    """Переносит суммы шардов просмотров в посты."""
+    with transaction.atomic():
+        totals = drain_shards(ViewCounterShard)
+        for post_id, delta in totals.items():
+            Post.objects.filter(pk=post_id).update(
+                views_count=F("views_count") + delta
+            )
+    return len(totals)
+
+
+def move_post(old_group_id, new_group_id, author_id, pub_date):
+    move_posts([(old_group_id, new_group_id, author_id, pub_date)])
+
+
+def move_posts(moves):
+    """Переносит посты в счётчиках: ``moves`` — кортежи (старая группа,
+    новая группа, автор, дата публикации).
+
+    Переносы сводятся в разницы по сообществу, автору и дню, поэтому
+    число запросов зависит от числа таких сочетаний, а не постов.
+    """
+    deltas = Counter()
+    for old_group_id, new_group_id, author_id, pub_date in moves:
+        if old_group_id == new_group_id:
+            continue
+        day = timezone.localdate(pub_date)
+        deltas[old_group_id, author_id, day] -= 1
+        deltas[new_group_id, author_id, day] += 1
+    for (group_id, author_id, day), delta in deltas.items():
+        if delta:
+            change_day_counters(group_id, author_id, day, delta)
+
+
+def compute(group_ids=None):
+    """Считает счётчики заново по горячей и архивной таблицам."""
+    totals = defaultdict(lambda: {"authors": Counter(), "days": Counter()})
+    for model in (Post, ArchivedPost):
+        posts = model.objects.filter(group__isnull=False)
+        if group_ids is not None:
+            posts = posts.filter(group_id__in=group_ids)
+        rows = (
+            posts.order_by()
+            .annotate(day=TruncDate("pub_date"))
+            .values_list("group_id", "author_id", "day")
+            .annotate(count=Count("pk"))
+        )
+        for group_id, author_id, day, count in rows:
+            totals[group_id]["authors"][author_id] += count
+            totals[group_id]["days"][day] += count
+    return totals
+
+
+def stored(group_ids=None):
+    totals = defaultdict(lambda: {"authors": Counter(), "days": Counter()})
+    filters = {} if group_ids is None else {"group_id__in": group_ids}
+    for group_id, author_id, count in GroupAuthorStats.objects.filter(
+        posts_count__gt=0, **filters
+    ).values_list("group_id", "author_id", "posts_count"):
+        totals[group_id]["authors"][author_id] = count
+    for group_id, day, count in GroupDailyStats.objects.filter(
+        posts_count__gt=0, **filters
+    ).values_list("group_id", "day", "posts_count"):
+        totals[group_id]["days"][day] = count
+    for group_id, posts, authors in GroupStats.objects.filter(
+        **filters
+    ).values_list("group_id", "posts_count", "authors_count"):
+        if posts or authors:
+            totals[group_id]["posts"] = posts
+            totals[group_id]["authors_count"] = authors
+    return totals
+
+
+def with_totals(totals):
+    for counters in totals.values():
+        counters.setdefault("posts", sum(counters["days"].values()))
+        counters.setdefault("authors_count", len(counters["authors"]))
+    return totals
+
+
+def rebuild(group_ids=None):
+    """Пересчитывает счётчики выбранных сообществ (по умолчанию всех)."""
+    totals = with_totals(compute(group_ids))
+    if group_ids is None:
+        group_ids = list(Group.objects.values_list("pk", flat=True))
+    with transaction.atomic():
+        for model in (GroupStats, GroupAuthorStats, GroupDailyStats):
+            model.objects.filter(group_id__in=group_ids).delete()
+        GroupStats.objects.bulk_create(
+            GroupStats(
+                group_id=group_id,
+                posts_count=totals[group_id]["posts"],
+                authors_count=totals[group_id]["authors_count"],
+            )
+            if group_id in totals else GroupStats(group_id=group_id)
+            for group_id in group_ids
+        )
+        GroupAuthorStats.objects.bulk_create(
+            GroupAuthorStats(
+                group_id=group_id, author_id=author_id, posts_count=count
+            )
+            for group_id, counters in totals.items()
+            for author_id, count in counters["authors"].items()
+        )
+        GroupDailyStats.objects.bulk_create(
+            GroupDailyStats(group_id=group_id, day=day, posts_count=count)
+            for group_id, counters in totals.items()
+            for day, count in counters["days"].items()
+        )
+
+
+def check():
+    """Возвращает id сообществ, у которых счётчики разошлись с постами."""
+    expected = with_totals(compute())
+    actual = with_totals(stored())
+    return sorted(
+        group_id for group_id in expected.keys() | actual.keys()
+        if expected.get(group_id) != actual.get(group_id)
+    )
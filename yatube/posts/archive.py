@@ -0,0 +1,140 @@
+from django.db import models, transaction
+from django.http import Http404
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .cache import ARCHIVE_SCOPE, bump_version, versioned_get_or_set
+from .models import ArchivedPost, Post, TimelineEntry
+from .signals import post_restored, posts_archived
+
+
+def archived_fields():
+    return [field.attname for field in ArchivedPost._meta.concrete_fields]
+
+
+def archive_posts(older_than, batch_size=1000):
+    """Переносит посты старше ``older_than`` в архивную таблицу.
+
+    Id из архива не повторятся: AutoField в SQLite — AUTOINCREMENT,
+    в PostgreSQL — последовательность, и удалённые id не выдаются снова.
+    Строки удаляются без post_delete на каждый пост: ленты и кеш
+    обновляет одно событие posts_archived на пачку.
+    """
+    cutoff = timezone.now() - older_than
+    candidates = Post.objects.filter(pub_date__lt=cutoff)
+    fields = archived_fields()
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(candidates.order_by("pk").values(*fields)[:batch_size])
+            if not rows:
+                break
+            ArchivedPost.objects.bulk_create(
+                ArchivedPost(**row) for row in rows
+            )
+            post_ids = [row["id"] for row in rows]
+            # Каскад вручную: у записей ленты нет своих сигналов удаления.
+            # Записи лент подписок остаются: id поста в архиве тот же.
+            TimelineEntry.objects.filter(post_id__in=post_ids).delete()
+            posts = Post.objects.filter(pk__in=post_ids)
+            posts._raw_delete(posts.db)
+            posts_archived.send(
+                sender=Post,
+                post_ids=post_ids,
+                group_ids={row["group_id"] for row in rows},
+                author_ids={row["author_id"] for row in rows},
+            )
+        moved += len(rows)
+    if moved:
+        bump_version(ARCHIVE_SCOPE)
+    return moved
+
+
+def unarchived_copy(archived):
+    """Несохранённый Post с теми же полями, что у архивного поста."""
+    return Post(**{
+        field: getattr(archived, field) for field in archived_fields()
+    })
+
+
+def restore_post(post):
+    """Сохраняет пост из архива обратно в горячую таблицу с прежними
+    id и датой публикации.
+
+    Обычный save() перезаписал бы pub_date (auto_now_add), поэтому
+    строка вставляется как есть, а вместо post_save отправляется
+    post_restored.
+    """
+    archived = ArchivedPost.objects.get(pk=post.pk)
+    post.render_text()
+    # save_base(raw=True) не вызывает pre_save полей: загруженную при
+    # правке картинку записываем в хранилище сами.
+    for field in post._meta.concrete_fields:
+        if isinstance(field, models.FileField):
+            field.pre_save(post, add=True)
+    with transaction.atomic():
+        archived.delete()
+        post.save_base(raw=True, force_insert=True)
+        post_restored.send(
+            sender=Post, instance=post, archived_group_id=archived.group_id
+        )
+    bump_version(ARCHIVE_SCOPE)
+    return post
+
+
+def get_post_or_404(post_id):
+    """Пост из горячей таблицы, а если его там нет — из архива."""
+    post = Post.objects.select_related("author", "group").filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        post = ArchivedPost.objects.select_related("author", "group").filter(
+            pk=post_id
+        ).first()
+    if post is None:
+        raise Http404("Пост не найден")
+    return post
+
+
+class ArchiveFallback:
+    """Лента для Paginator: горячая таблица, за ней архив.
+
+    В архив запрос уходит только если срез выходит за пределы горячей
+    таблицы; размер архивной части кешируется по версии ARCHIVE_SCOPE.
+    """
+
+    def __init__(self, hot, archived):
+        self.hot = hot
+        self.archived = archived
+
+    @cached_property
+    def hot_count(self):
+        return self.hot.count()
+
+    @cached_property
+    def archived_count(self):
+        return versioned_get_or_set(
+            self.archived.count,
+            "archive_count",
+            ARCHIVE_SCOPE,
+            extra=self.archived.query,
+        )
+
+    def count(self):
+        return self.hot_count + self.archived_count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None:
+            stop = self.count()
+        if stop <= self.hot_count:
+            return self.hot[start:stop]
+        hot = list(self.hot[start:stop]) if start < self.hot_count else []
+        archived_start = max(start - self.hot_count, 0)
+        archived_stop = stop - self.hot_count
+        return hot + list(self.archived[archived_start:archived_stop])
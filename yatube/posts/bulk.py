@@ -0,0 +1,40 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Post
+from .signals import posts_regrouped
+
+
+def move_to_groups(changes):
+    """Переносит посты по группам: ``changes`` — {id поста: id группы}.
+
+    Выполняет один UPDATE на каждую целевую группу и отправляет одно
+    событие posts_regrouped со всеми затронутыми группами и авторами
+    и списком переносов для счётчиков сообществ.
+    """
+    if not changes:
+        return
+    by_group = defaultdict(list)
+    for post_id, group_id in changes.items():
+        by_group[group_id].append(post_id)
+    post_ids, author_ids, group_ids = set(), set(), set(by_group)
+    moves = []
+    with transaction.atomic():
+        rows = Post.objects.select_for_update().filter(
+            pk__in=changes
+        ).values_list("pk", "author_id", "group_id", "pub_date")
+        for pk, author_id, group_id, pub_date in rows:
+            post_ids.add(pk)
+            author_ids.add(author_id)
+            group_ids.add(group_id)
+            moves.append((group_id, changes[pk], author_id, pub_date))
+        for group_id, ids in by_group.items():
+            Post.objects.filter(pk__in=ids).update(group_id=group_id)
+        posts_regrouped.send(
+            sender=Post,
+            post_ids=post_ids,
+            group_ids=group_ids - {None},
+            author_ids=author_ids,
+            moves=moves,
+        )
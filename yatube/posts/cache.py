@@ -0,0 +1,83 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import singleflight
+
+POSTS_SCOPE: str = "posts"
+ARCHIVE_SCOPE: str = "archive"
+FEED_SCOPE: str = "feed"
+
+
+def version_key(scope):
+    return f"version:{scope}"
+
+
+def get_version(scope):
+    """Текущая версия области кеша.
+
+    Меняется при каждом bump_version; другие процессы это видят только с
+    общим бэкендом кеша. Иначе версия сама сменится не позже чем через
+    CACHE_VERSION_TIMEOUT секунд.
+    """
+    key = version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*scopes):
+    """Инвалидирует все ключи, построенные на версии этих областей."""
+    for scope in scopes:
+        try:
+            cache.incr(version_key(scope))
+        except ValueError:
+            cache.set(
+                version_key(scope),
+                time.time_ns(),
+                settings.CACHE_VERSION_TIMEOUT,
+            )
+
+
+def versioned_key(prefix, *scopes, extra=""):
+    versions = ":".join(str(get_version(scope)) for scope in scopes)
+    digest = hashlib.md5(str(extra).encode()).hexdigest()
+    return f"{prefix}:{versions}:{digest}"
+
+
+def stale_key(prefix, extra=""):
+    """Ключ последнего значения любой версии."""
+    return versioned_key(prefix, extra=extra)
+
+
+def versioned_get_or_set(compute, prefix, *scopes, extra=""):
+    """cache.get_or_set по versioned_key. После смены версии значение
+    пересчитывает один воркер, остальным достаётся прежнее."""
+    return singleflight.get_or_set(
+        versioned_key(prefix, *scopes, extra=extra),
+        compute,
+        timeout=settings.CACHE_VERSION_TIMEOUT,
+        stale_key=stale_key(prefix, extra),
+    )
+
+
+def group_scope(pk):
+    return f"group:{pk}"
+
+
+def author_scope(pk):
+    return f"author:{pk}"
+
+
+def feed_scopes(group_ids=(), author_ids=()):
+    """Области кеша, которые меняет правка постов этих групп и авторов:
+    общая лента сайта и ленты групп и авторов."""
+    return [
+        FEED_SCOPE,
+        *(group_scope(pk) for pk in group_ids if pk is not None),
+        *(author_scope(pk) for pk in author_ids if pk is not None),
+    ]
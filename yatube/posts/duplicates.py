@@ -0,0 +1,183 @@
+"""Почти одинаковые посты: MinHash текста и LSH-индекс недавних постов.
+
+Текст разбивается на шинглы — тройки идущих подряд слов. Подпись
+MinHash из DUPLICATE_PERMUTATIONS минимумов хешей оценивает долю общих
+шинглов двух текстов (коэффициент Жаккара) долей совпавших значений.
+Подпись режется на DUPLICATE_BANDS полос; хеш полосы — корзина
+FingerprintBucket. Посты с общей корзиной — кандидаты: их подписи
+сравниваются целиком. Проверка — два запроса по индексу и не зависит от
+числа постов в индексе.
+
+В индекс попадают посты, сохранённые за последние DUPLICATE_WINDOW_DAYS
+дней; старые записи удаляет команда index_duplicates.
+"""
+import hashlib
+import random
+import re
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FingerprintBucket, PostFingerprint, PostReview
+
+WORD_RE = re.compile(r"\w+")
+SHINGLE_WORDS: int = 3
+# Короткие тексты («Спасибо!», «+1») совпадают законно: их не проверяем.
+MIN_SHINGLES: int = 5
+MERSENNE_PRIME = (1 << 61) - 1
+# Больше кандидатов бывает только у рассылки одного текста: для решения
+# хватит и части из них.
+MAX_CANDIDATES: int = 100
+SEED: int = 1
+
+
+def shingles(text):
+    words = WORD_RE.findall(text.lower())
+    return {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+@lru_cache(maxsize=None)
+def permutations(count):
+    """Коэффициенты хешей вида (a·x + b) mod p; одинаковы во всех
+    процессах, иначе подписи из базы не сравнить с новыми."""
+    import numpy as np
+
+    rng = random.Random(SEED)
+    return (
+        np.array(
+            [rng.randrange(1, MERSENNE_PRIME) for _ in range(count)],
+            dtype=np.uint64,
+        )[:, None],
+        np.array(
+            [rng.randrange(0, MERSENNE_PRIME) for _ in range(count)],
+            dtype=np.uint64,
+        )[:, None],
+    )
+
+
+def signature(text):
+    """Подпись MinHash (uint64) или None для слишком короткого текста."""
+    import numpy as np
+
+    found = shingles(text)
+    if len(found) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode(), digest_size=4).digest(),
+                "little",
+            )
+            for shingle in found
+        ),
+        dtype=np.uint64,
+        count=len(found),
+    )
+    a, b = permutations(settings.DUPLICATE_PERMUTATIONS)
+    # Переполнение uint64 в a·x — часть хеша, как в datasketch.
+    return ((a * hashes + b) % np.uint64(MERSENNE_PRIME)).min(axis=1)
+
+
+def buckets(sig):
+    """Ключи корзин LSH: хеш номера полосы и её значений."""
+    rows = len(sig) // settings.DUPLICATE_BANDS
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                sig[band * rows:(band + 1) * rows].tobytes(),
+                digest_size=8,
+                salt=band.to_bytes(2, "little"),
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(settings.DUPLICATE_BANDS)
+    ]
+
+
+def similarity(sig, data):
+    """Оценка коэффициента Жаккара по подписи и сохранённой подписи."""
+    import numpy as np
+
+    other = np.frombuffer(bytes(data), dtype=np.uint64)
+    if len(other) != len(sig):
+        return 0.0
+    return float(np.count_nonzero(sig == other)) / len(sig)
+
+
+def find_duplicate(text, exclude=None):
+    """Самый похожий недавний пост: (id, сходство) или None, если
+    сходство ниже DUPLICATE_REVIEW_SIMILARITY."""
+    sig = signature(text)
+    if sig is None:
+        return None
+    candidates = (
+        FingerprintBucket.objects.filter(bucket__in=buckets(sig))
+        .exclude(post_id=exclude)
+        .values_list("post_id", flat=True)
+        .distinct()[:MAX_CANDIDATES]
+    )
+    since = timezone.now() - timedelta(days=settings.DUPLICATE_WINDOW_DAYS)
+    fingerprints = PostFingerprint.objects.filter(
+        post_id__in=list(candidates), created__gte=since
+    ).values_list("post_id", "signature")
+    best = max(
+        ((similarity(sig, data), pk) for pk, data in fingerprints),
+        default=(0.0, None),
+    )
+    if best[0] < settings.DUPLICATE_REVIEW_SIMILARITY:
+        return None
+    return best[1], best[0]
+
+
+def index(post):
+    """Кладёт подпись сохранённого поста в индекс вместо прежней."""
+    sig = signature(post.text)
+    with transaction.atomic():
+        forget([post.pk])
+        if sig is None:
+            return
+        PostFingerprint.objects.create(
+            post_id=post.pk, signature=sig.tobytes(), created=timezone.now()
+        )
+        FingerprintBucket.objects.bulk_create(
+            FingerprintBucket(bucket=bucket, post_id=post.pk)
+            for bucket in buckets(sig)
+        )
+
+
+def forget(post_ids):
+    PostFingerprint.objects.filter(post_id__in=post_ids).delete()
+    FingerprintBucket.objects.filter(post_id__in=post_ids).delete()
+
+
+def prune():
+    """Убирает из индекса посты старше окна; возвращает их число."""
+    since = timezone.now() - timedelta(days=settings.DUPLICATE_WINDOW_DAYS)
+    stale = list(
+        PostFingerprint.objects.filter(created__lt=since).values_list(
+            "post_id", flat=True
+        )
+    )
+    for start in range(0, len(stale), 1000):
+        forget(stale[start:start + 1000])
+    return len(stale)
+
+
+def hold(form, author):
+    """Откладывает пост формы с найденным дубликатом на проверку."""
+    duplicate_of, score = form.duplicate
+    return PostReview.objects.create(
+        author=author,
+        text=form.cleaned_data["text"],
+        group=form.cleaned_data.get("group"),
+        image=form.cleaned_data.get("image") or "",
+        duplicate_of_id=duplicate_of,
+        similarity=score,
+    )
@@ -0,0 +1,190 @@
+from calendar import timegm
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import linebreaks_filter, truncatechars
+from django.urls import reverse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                quote_etag)
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+
+from core import singleflight
+from core.db.routers import use_replica
+
+from .archive import ArchiveFallback
+from .cache import (author_scope, feed_scopes, group_scope, stale_key,
+                    versioned_key)
+from .models import ArchivedPost, Group, Post, User
+from .timeline import TimelineFeed
+
+FEED_SIZE: int = 20
+TITLE_LENGTH: int = 60
+
+
+def author_name(author):
+    return author.get_full_name() or author.username
+
+
+class CachedFeed(Feed):
+    """Лента RSS или Atom, хранится в кеше целиком до изменения постов
+    (при кеше в памяти процесса — не дольше CACHE_VERSION_TIMEOUT).
+
+    ETag строится из версий областей кеша: читатель, приславший его в
+    If-None-Match, получает 304 без чтения постов и рендера XML.
+    """
+
+    def cache_scopes(self, obj):
+        return feed_scopes()
+
+    @use_replica()
+    def __call__(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404("Feed object does not exist.")
+        # Ссылки в ленте абсолютные, поэтому хост входит в ключ.
+        extra = request.get_host() + request.path
+        key = versioned_key("feed", *self.cache_scopes(obj), extra=extra)
+        etag = quote_etag(key)
+        response = None
+        if "HTTP_IF_NONE_MATCH" in request.META:
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            feed = singleflight.get_or_set(
+                key,
+                lambda: {**self.render(obj, request), "etag": etag},
+                timeout=settings.CACHE_VERSION_TIMEOUT,
+                stale_key=stale_key("feed", extra),
+            )
+            # Пока ленту пересобирают, отдаётся прежняя со своим ETag.
+            etag = feed["etag"]
+            response = get_conditional_response(
+                request, etag=etag, last_modified=feed["last_modified"]
+            )
+        if response is None:
+            response = HttpResponse(
+                feed["content"], content_type=feed["content_type"]
+            )
+            response["Last-Modified"] = http_date(feed["last_modified"])
+        response["ETag"] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.SHARED_PAGE_MAX_AGE
+        )
+        return response
+
+    def render(self, obj, request):
+        feedgen = self.get_feed(obj, request)
+        return {
+            "content": feedgen.writeString("utf-8").encode(),
+            "content_type": feedgen.content_type,
+            "last_modified": timegm(
+                feedgen.latest_post_date().utctimetuple()
+            ),
+        }
+
+    def item_title(self, post):
+        return truncatechars(post.text, TITLE_LENGTH)
+
+    def item_description(self, post):
+        # Посты из материализованной ленты приходят без text_html.
+        return linebreaks_filter(post.text, autoescape=True)
+
+    def item_link(self, post):
+        return reverse("posts:post_detail", args=[post.pk])
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_author_name(self, post):
+        return author_name(post.author)
+
+    def item_author_link(self, post):
+        return reverse("posts:profile", args=[post.author.username])
+
+    def item_categories(self, post):
+        return [post.group.title] if post.group_id else []
+
+
+class LatestPostsFeed(CachedFeed):
+    title = "Yatube: последние обновления"
+    description = "Последние обновления на сайте"
+
+    def link(self):
+        return reverse("posts:index")
+
+    def items(self):
+        return TimelineFeed(
+            ArchiveFallback(
+                Post.objects.select_related("author", "group"),
+                ArchivedPost.objects.select_related("author", "group"),
+            )
+        )[:FEED_SIZE]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsFeed(CachedFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def cache_scopes(self, group):
+        return [group_scope(group.pk)]
+
+    def title(self, group):
+        return f"Yatube: {group.title}"
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse("posts:group_list", args=[group.slug])
+
+    def items(self, group):
+        return ArchiveFallback(
+            group.posts.select_related("author"),
+            group.archived_posts.select_related("author"),
+        )[:FEED_SIZE]
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group):
+        return group.description
+
+
+class AuthorPostsFeed(CachedFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def cache_scopes(self, author):
+        return [author_scope(author.pk)]
+
+    def title(self, author):
+        return f"Yatube: {author_name(author)}"
+
+    def description(self, author):
+        return f"Все посты пользователя {author_name(author)}"
+
+    def link(self, author):
+        return reverse("posts:profile", args=[author.username])
+
+    def items(self, author):
+        return ArchiveFallback(
+            author.posts.select_related("group"),
+            author.archived_posts.select_related("group"),
+        )[:FEED_SIZE]
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
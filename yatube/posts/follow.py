@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.db.models import F
+
+from core.paginator import CursorPage, after_cursor, make_cursor, parse_cursor
+
+from .models import ArchivedPost, Follow, FollowStats, InboxEntry, Post
+
+
+def followers_count(author_id):
+    return FollowStats.objects.filter(author_id=author_id).values_list(
+        "followers_count", flat=True
+    ).first() or 0
+
+
+def fans_out(count):
+    """Раскладывать ли посты автора с ``count`` подписчиками по лентам
+    при публикации. Посты популярных авторов читаются при показе."""
+    return count <= settings.FOLLOW_FANOUT_MAX_FOLLOWERS
+
+
+def add_entries(user_ids, author_id, posts):
+    InboxEntry.objects.bulk_create(
+        (
+            InboxEntry(
+                user_id=user_id,
+                post_id=pk,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for user_id in user_ids
+            for pk, pub_date in posts
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def deliver(post):
+    """Кладёт пост в ленты подписчиков автора (fan-out on write)."""
+    if not fans_out(followers_count(post.author_id)):
+        return
+    followers = Follow.objects.filter(author_id=post.author_id).values_list(
+        "user_id", flat=True
+    )
+    add_entries(
+        followers.iterator(), post.author_id, [(post.pk, post.pub_date)]
+    )
+
+
+def backfill(user_ids, author_id):
+    """Кладёт в ленты последние FOLLOW_BACKFILL_POSTS постов автора."""
+    posts = list(
+        Post.objects.filter(author_id=author_id)
+        .order_by("-pub_date", "-pk")
+        .values_list("pk", "pub_date")[:settings.FOLLOW_BACKFILL_POSTS]
+    )
+    add_entries(user_ids, author_id, posts)
+
+
+def followed(follow):
+    author_id = follow.author_id
+    FollowStats.objects.get_or_create(author_id=author_id)
+    FollowStats.objects.filter(author_id=author_id).update(
+        followers_count=F("followers_count") + 1
+    )
+    if fans_out(followers_count(author_id)):
+        backfill([follow.user_id], author_id)
+
+
+def unfollowed(follow):
+    author_id = follow.author_id
+    FollowStats.objects.filter(
+        author_id=author_id, followers_count__gt=0
+    ).update(followers_count=F("followers_count") - 1)
+    InboxEntry.objects.filter(
+        user_id=follow.user_id, author_id=author_id
+    ).delete()
+    if followers_count(author_id) == settings.FOLLOW_FANOUT_MAX_FOLLOWERS:
+        # Автор снова раскладывает посты при публикации: доставляем
+        # подписчикам то, что до сих пор читалось при показе.
+        backfill(
+            Follow.objects.filter(author_id=author_id).values_list(
+                "user_id", flat=True
+            ),
+            author_id,
+        )
+
+
+class FollowFeed:
+    """Лента подписок: посты из InboxEntry, разложенные при публикации,
+    плюс свежие посты популярных авторов, прочитанные при показе.
+
+    Страница выбирается по курсору, поэтому время не зависит от её
+    номера. Архивные посты остаются в ленте: записи InboxEntry при
+    архивации не удаляются, а посты, которых нет в горячей таблице,
+    читаются из архива.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def heavy_authors(self):
+        return Follow.objects.filter(
+            user=self.user,
+            author__follow_stats__followers_count__gt=(
+                settings.FOLLOW_FANOUT_MAX_FOLLOWERS
+            ),
+        ).values_list("author_id", flat=True)
+
+    def page(self, cursor, per_page):
+        position = parse_cursor(cursor)
+        limit = per_page + 1
+        inbox = InboxEntry.objects.filter(user=self.user).order_by(
+            "-pub_date", "-post_id"
+        )
+        keys = set(
+            after_cursor(inbox, position, pk_field="post_id").values_list(
+                "pub_date", "post_id"
+            )[:limit]
+        )
+        for author_id in self.heavy_authors():
+            # Запрос на каждого автора идёт по индексу (author, -pub_date).
+            posts = Post.objects.filter(author_id=author_id).order_by(
+                "-pub_date", "-pk"
+            )
+            found = after_cursor(posts, position).values_list(
+                "pub_date", "pk"
+            )[:limit]
+            keys.update(found)
+            if len(found) < limit:
+                # Горячая таблица кончилась: продолжение — в архиве.
+                archived = ArchivedPost.objects.filter(
+                    author_id=author_id
+                ).order_by("-pub_date", "-pk")
+                keys.update(
+                    after_cursor(archived, position).values_list(
+                        "pub_date", "pk"
+                    )[:limit - len(found)]
+                )
+        keys = sorted(keys, reverse=True)
+        next_cursor = None
+        if len(keys) > per_page:
+            del keys[per_page:]
+            next_cursor = make_cursor(*keys[-1])
+        ids = [pk for _, pk in keys]
+        posts = Post.objects.select_related("author", "group").in_bulk(ids)
+        missing = [pk for pk in ids if pk not in posts]
+        if missing:
+            posts.update(
+                ArchivedPost.objects.select_related(
+                    "author", "group"
+                ).in_bulk(missing)
+            )
+        return CursorPage(
+            [posts[pk] for _, pk in keys if pk in posts],
+            next_cursor,
+            position is None,
+        )
@@ -1,6 +1,8 @@
 from django import forms
+from django.conf import settings
 
-from .models import Post
+from .duplicates import find_duplicate
+from .models import Comment, Post
 
 
 class PostForm(forms.ModelForm):
@@ -13,6 +15,29 @@ class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
-        fields = ("text", "group")
+        fields = ("text", "group", "image")
         labels = {"group": "Выберите нужную группу"}
         help_text = {"group": "Группа поста"}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # (id, сходство) похожего недавнего поста: такой пост view
+        # откладывает на проверку вместо публикации.
+        self.duplicate = None
+        text = cleaned_data.get("text")
+        if text and self.instance.pk is None:
+            self.duplicate = find_duplicate(text)
+        if (
+            self.duplicate is not None
+            and self.duplicate[1] >= settings.DUPLICATE_REJECT_SIMILARITY
+        ):
+            raise forms.ValidationError(
+                "Такой пост уже опубликован недавно.", code="duplicate"
+            )
+        return cleaned_data
+
+
+class CommentForm(forms.ModelForm):
+    class Meta:
+        model = Comment
+        fields = ("text",)
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = "Переносит старые посты в архивную таблицу."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.POSTS_ARCHIVE_AFTER_DAYS,
+            help="Архивировать посты старше указанного числа дней.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        moved = archive_posts(
+            timedelta(days=options["days"]),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(f"Перенесено в архив: {moved}")
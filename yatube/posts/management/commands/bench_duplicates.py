@@ -0,0 +1,121 @@
+import random
+import statistics
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts import duplicates
+from posts.models import FingerprintBucket, Post, PostFingerprint
+
+BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет время проверки на дубликаты при заполненном индексе. "
+        "Индекс наполняется в транзакции, которая в конце откатывается."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1_000_000)
+        parser.add_argument("--checks", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def make_text(self, rng, vocabulary):
+        return " ".join(rng.choices(vocabulary, k=rng.randint(20, 80)))
+
+    def fill(self, count, rng, texts):
+        """Индексирует ``texts`` через index() и добавляет случайные
+        подписи до ``count`` постов: подпись случайного текста так же
+        равномерна, а считать миллион текстов незачем. Id отрицательные,
+        чтобы не пересечься с настоящими постами."""
+        for i, text in enumerate(texts):
+            duplicates.index(Post(pk=-(i + 1), text=text))
+        np_rng = np.random.default_rng(rng.randrange(2**32))
+        now = timezone.now()
+        for start in range(len(texts), count, BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, count)
+            signatures = np_rng.integers(
+                0, duplicates.MERSENNE_PRIME,
+                (stop - start, settings.DUPLICATE_PERMUTATIONS),
+                dtype=np.uint64,
+            )
+            PostFingerprint.objects.bulk_create(
+                PostFingerprint(
+                    post_id=-(start + i + 1),
+                    signature=sig.tobytes(),
+                    created=now,
+                )
+                for i, sig in enumerate(signatures)
+            )
+            FingerprintBucket.objects.bulk_create(
+                FingerprintBucket(bucket=bucket, post_id=-(start + i + 1))
+                for i, sig in enumerate(signatures)
+                for bucket in duplicates.buckets(sig)
+            )
+
+    def measure(self, texts):
+        timings, found = [], 0
+        for text in texts:
+            started = time.perf_counter()
+            found += duplicates.find_duplicate(text) is not None
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return found, timings
+
+    def report(self, title, found, timings):
+        def quantile(q):
+            return timings[int(q * (len(timings) - 1))] * 1000
+
+        self.stdout.write(
+            f"  {title}: найдено {found}/{len(timings)}, "
+            f"медиана {statistics.median(timings) * 1000:.2f} мс, "
+            f"p95 {quantile(0.95):.2f} мс, p99 {quantile(0.99):.2f} мс"
+        )
+
+    def edit(self, rng, text, vocabulary):
+        """Копия текста с заменой одного слова из двадцати."""
+        words = text.split()
+        for i in rng.sample(range(len(words)), len(words) // 20):
+            words[i] = rng.choice(vocabulary)
+        return " ".join(words)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        vocabulary = [f"слово{i}" for i in range(20000)]
+        checks = options["checks"]
+        indexed = [self.make_text(rng, vocabulary) for _ in range(checks)]
+        copies = [self.edit(rng, text, vocabulary) for text in indexed]
+        fresh = [self.make_text(rng, vocabulary) for _ in range(checks)]
+        # Первый вызов импортирует NumPy и строит перестановки.
+        duplicates.signature(fresh[0])
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                self.fill(options["posts"], rng, indexed)
+                self.stdout.write(
+                    f"Индекс: {options['posts']} постов, "
+                    f"{FingerprintBucket.objects.count()} корзин, "
+                    f"заполнен за {time.perf_counter() - started:.0f} с"
+                )
+                self.report("новые тексты", *self.measure(fresh))
+                self.report("правленые копии", *self.measure(copies))
+                started = time.perf_counter()
+                for text in fresh:
+                    duplicates.signature(text)
+                self.stdout.write(
+                    "  из них подпись MinHash: "
+                    f"{(time.perf_counter() - started) / checks * 1000:.2f}"
+                    " мс"
+                )
+                raise Rollback
+        except Rollback:
+            pass
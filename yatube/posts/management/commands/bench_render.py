@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+
+from posts.models import Post
+
+FILTER_TEMPLATE = Template(
+    "{% for post in posts %}<p>{{ post.text|linebreaksbr }}</p>{% endfor %}"
+)
+CACHED_TEMPLATE = Template(
+    "{% for post in posts %}<p>{{ post.body_html_br }}</p>{% endfor %}"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает рендер ленты с фильтром linebreaksbr "
+        "и с сохранённым HTML."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=10)
+        parser.add_argument("--lines", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def measure(self, template, posts, repeat):
+        context = Context({"posts": posts})
+        started = time.perf_counter()
+        for _ in range(repeat):
+            template.render(context)
+        return (time.perf_counter() - started) / repeat
+
+    def handle(self, *args, **options):
+        line = "Длинная строка поста с <тегами> & спецсимволами.\n"
+        posts = [
+            Post(pk=i, text=line * options["lines"])
+            for i in range(1, options["posts"] + 1)
+        ]
+        for post in posts:
+            post.render_text()
+        filtered = self.measure(FILTER_TEMPLATE, posts, options["repeat"])
+        cached = self.measure(CACHED_TEMPLATE, posts, options["repeat"])
+        self.stdout.write(
+            f"linebreaksbr: {filtered * 1000:.2f} мс на страницу\n"
+            f"сохранённый HTML: {cached * 1000:.2f} мс на страницу\n"
+            f"ускорение: x{filtered / cached:.1f}"
+        )
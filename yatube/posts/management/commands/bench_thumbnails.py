@@ -0,0 +1,105 @@
+import io
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.test import override_settings
+from PIL import Image
+
+from core import thumbnails
+from posts.models import Post, User
+
+ITEM_TEMPLATE = "posts/includes/index_post.html"
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает рендер страницы ленты с картинками: без картинок, "
+        "пока пул строит миниатюры, с готовыми миниатюрами и с "
+        "построением миниатюр прямо при рендере."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=10)
+        parser.add_argument("--size", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def measure(self, posts, repeat, before_render=None):
+        template = get_template(ITEM_TEMPLATE)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            if before_render is not None:
+                before_render()
+            for post in posts:
+                template.render({"post": post})
+        return (time.perf_counter() - started) / repeat
+
+    def make_images(self, count, size):
+        names = []
+        for i in range(count):
+            buffer = io.BytesIO()
+            Image.effect_noise((size, size * 3 // 4), 64 + i).save(
+                buffer, "JPEG"
+            )
+            names.append(default_storage.save(
+                "posts/bench.jpg", ContentFile(buffer.getvalue())
+            ))
+        return names
+
+    def handle(self, *args, **options):
+        count, repeat = options["posts"], options["repeat"]
+        author = User(username="bench")
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root):
+            names = self.make_images(count, options["size"])
+            plain = [
+                Post(pk=i, text="Пост", author=author) for i in range(count)
+            ]
+            with_images = [
+                Post(pk=i, text="Пост", author=author, image=name)
+                for i, name in enumerate(names)
+            ]
+            results = {"без картинок": self.measure(plain, repeat)}
+            results["миниатюры ещё строятся"] = self.measure(
+                with_images, repeat
+            )
+
+            started = time.perf_counter()
+            futures = [
+                future for name in names
+                for future in thumbnails.schedule(name)
+            ]
+            for future in futures:
+                future.result()
+            pool = time.perf_counter() - started
+            results["миниатюры готовы"] = self.measure(with_images, repeat)
+
+            card = settings.THUMBNAIL_PRESETS["card"]
+
+            def build_inline():
+                # Так работает построение миниатюр при первом рендере.
+                for name in names:
+                    target = thumbnails.thumbnail_name(name, "card")
+                    default_storage.delete(target)
+                    thumbnails.make_thumbnail(
+                        default_storage.path(name),
+                        default_storage.path(target),
+                        card["size"],
+                        card.get("crop", False),
+                    )
+
+            results["построение при рендере"] = self.measure(
+                with_images, max(repeat // 10, 1), build_inline
+            )
+        for title, seconds in results.items():
+            self.stdout.write(
+                f"{title}: {seconds * 1000:.2f} мс на страницу"
+            )
+        self.stdout.write(
+            f"пул построил {len(futures)} миниатюр за {pool * 1000:.0f} мс "
+            "(вне запроса)"
+        )
@@ -0,0 +1,85 @@
+import heapq
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import scoring
+
+HOUR = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет скорость оценки кандидатов в популярное: NumPy против "
+        "цикла Python на синтетических постах."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def make_candidates(self, count, seed):
+        rng = np.random.default_rng(seed)
+        now = time.time()
+        candidates = np.empty(count, scoring.CANDIDATE_DTYPE)
+        candidates["pk"] = np.arange(1, count + 1)
+        candidates["timestamp"] = now - rng.uniform(
+            0, settings.TRENDING_WINDOW_HOURS * HOUR, count
+        )
+        candidates["views"] = rng.zipf(1.5, count).clip(max=10**6)
+        candidates["likes"] = rng.binomial(candidates["views"], 0.05)
+        candidates["comments"] = rng.binomial(candidates["views"], 0.01)
+        return candidates, now
+
+    def rank_numpy(self, candidates, now):
+        scores = scoring.score(
+            candidates, now, settings.TRENDING_WEIGHTS,
+            settings.TRENDING_GRAVITY,
+        )
+        return scoring.top(scores, candidates["pk"], settings.TRENDING_SIZE)
+
+    def rank_python(self, rows, now):
+        weights, gravity = settings.TRENDING_WEIGHTS, settings.TRENDING_GRAVITY
+        scored = []
+        for pk, timestamp, views, likes, comments in rows:
+            engagement = (
+                weights["views"] * views
+                + weights["likes"] * likes
+                + weights["comments"] * comments
+            )
+            age_hours = max(now - timestamp, 0) / HOUR
+            scored.append((engagement / (age_hours + 2) ** gravity, pk))
+        return heapq.nlargest(settings.TRENDING_SIZE, scored)
+
+    def measure(self, rank, data, now, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = rank(data, now)
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    def handle(self, *args, **options):
+        count = options["posts"]
+        candidates, now = self.make_candidates(count, options["seed"])
+        rows = candidates.tolist()
+        self.stdout.write(
+            f"Кандидатов: {count}, в списке: {settings.TRENDING_SIZE}"
+        )
+        vectorized, best = self.measure(
+            self.rank_numpy, candidates, now, options["repeat"]
+        )
+        loop, expected = self.measure(
+            self.rank_python, rows, now, max(1, options["repeat"] // 2)
+        )
+        if candidates["pk"][best].tolist() != [pk for _, pk in expected]:
+            self.stderr.write("Списки NumPy и цикла Python расходятся")
+        for title, seconds in (("NumPy", vectorized), ("Python", loop)):
+            self.stdout.write(
+                f"  {title}: {seconds * 1000:8.1f} мс, "
+                f"{count / seconds / 1e6:6.1f} млн постов/с"
+            )
+        self.stdout.write(f"  Ускорение: {loop / vectorized:.0f}×")
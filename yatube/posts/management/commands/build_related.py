@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import related
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = (
+        "Собирает индексы TF-IDF сообществ и списки похожих постов. "
+        "Между сборками списки обновляются при сохранении постов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group", help="Slug сообщества; по умолчанию все."
+        )
+
+    def handle(self, *args, **options):
+        groups = Group.objects.order_by("pk")
+        if options["group"]:
+            groups = groups.filter(slug=options["group"])
+        for pk, slug in groups.values_list("pk", "slug"):
+            started = time.perf_counter()
+            count = related.build(pk)
+            self.stdout.write(
+                f"{slug}: постов {count}, "
+                f"{time.perf_counter() - started:.2f} с"
+            )
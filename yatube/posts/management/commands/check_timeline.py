@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = "Сверяет материализованную главную ленту с таблицей постов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Пересобрать ленту, если найдены расхождения.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched = timeline.check()
+        if not mismatched:
+            self.stdout.write("Лента согласована.")
+            return
+        if options["fix"]:
+            timeline.rebuild()
+            self.stdout.write(
+                f"Лента пересобрана, расхождений: {len(mismatched)}"
+            )
+            return
+        raise CommandError(f"Расходятся записи постов: {mismatched}")
@@ -0,0 +1,254 @@
+import os
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+from multiprocessing import Pool
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.template.defaultfilters import linebreaks_filter, linebreaksbr
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import aggregates, related, timeline
+from posts.cache import POSTS_SCOPE, bump_version
+from posts.models import Group, Post, User
+
+WORDS = (
+    "яндекс практикум пост лента группа автор текст новости код django "
+    "python база запрос индекс кеш страница профиль сообщество неделя "
+    "сегодня завтра проект тест данные сервер ответ вопрос идея"
+).split()
+
+POST_COLUMNS = (
+    "text",
+    "text_html",
+    "text_html_br",
+    "pub_date",
+    "author_id",
+    "group_id",
+    "image",
+    "comments_count",
+    "likes_count",
+    "views_count",
+)
+
+# Даты постов отсчитываются от EPOCH + seed секунд, а не от текущего
+# времени: повторный запуск с тем же seed даёт те же строки.
+EPOCH = datetime(2024, 1, 1)
+
+_options = {}
+
+
+def parse_now(value):
+    """``--now``: дата ISO 8601 или ``now``; наивное время в UTC."""
+    if value == "now":
+        return datetime.utcnow()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"Неверная дата --now: {value}")
+    if timezone.is_aware(parsed):
+        parsed = timezone.make_naive(parsed, timezone.utc)
+    return parsed
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса распределения Ципфа для random.choices."""
+    return list(
+        accumulate(1 / rank ** exponent for rank in range(1, count + 1))
+    )
+
+
+def init_worker(options):
+    _options.update(options)
+    _options["author_weights"] = zipf_weights(
+        len(options["author_ids"]), options["author_skew"]
+    )
+    _options["group_weights"] = zipf_weights(
+        len(options["group_ids"]), options["group_skew"]
+    )
+
+
+def make_text(rng):
+    lines = []
+    for _ in range(rng.randint(1, 4)):
+        words = rng.choices(WORDS, k=rng.randint(5, 30))
+        lines.append(" ".join(words).capitalize() + ".")
+    return "\n".join(lines)
+
+
+def generate_chunk(chunk):
+    """Строки постов для чанка; результат зависит только от seed и номера
+    чанка, поэтому не зависит от числа процессов."""
+    index, size = chunk
+    rng = random.Random(f"{_options['seed']}:{index}")
+    authors = rng.choices(
+        _options["author_ids"], cum_weights=_options["author_weights"], k=size
+    )
+    groups = _options["group_ids"]
+    rows = []
+    for author_id in authors:
+        group_id = None
+        if groups and rng.random() >= _options["no_group_share"]:
+            group_id = rng.choices(
+                groups, cum_weights=_options["group_weights"]
+            )[0]
+        age = min(
+            rng.expovariate(4 / _options["days"]), _options["days"]
+        )
+        pub_date = _options["now"] - timedelta(days=age)
+        text = make_text(rng)
+        # В словаре нет спецсимволов HTML: экранирование ничего не меняет,
+        # а на кириллице заметно замедляет генерацию.
+        rows.append((
+            text,
+            linebreaks_filter(text, autoescape=False),
+            linebreaksbr(text, autoescape=False),
+            str(pub_date),
+            author_id,
+            group_id,
+            "",
+            0,
+            0,
+            0,
+        ))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт пользователей, сообщества и посты с реалистичным "
+        "распределением для нагрузочных тестов. Пользователи и сообщества "
+        "создаются через bulk_create, посты — одним executemany на пачку: "
+        "bulk_create затёр бы их даты (auto_now_add) и работает втрое "
+        "медленнее."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--groups", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument(
+            "--now",
+            help=(
+                "Дата самого нового поста (ISO 8601 или now); по умолчанию "
+                f"{EPOCH:%Y-%m-%d} плюс seed секунд."
+            ),
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--author-skew", type=float, default=1.1)
+        parser.add_argument("--group-skew", type=float, default=0.8)
+        parser.add_argument("--no-group-share", type=float, default=0.2)
+
+    def create_users(self, count, seed):
+        # Повторный запуск с тем же seed дописывает посты тем же авторам.
+        usernames = [f"gen{seed}_{i}" for i in range(count)]
+        password = make_password(None)
+        User.objects.bulk_create(
+            (User(username=name, password=password) for name in usernames),
+            ignore_conflicts=True,
+        )
+        return list(
+            User.objects.filter(username__startswith=f"gen{seed}_")
+            .order_by("pk")
+            .values_list("pk", flat=True)[:count]
+        )
+
+    def create_groups(self, count, seed):
+        slugs = [f"gen{seed}-{i}" for i in range(count)]
+        Group.objects.bulk_create(
+            (
+                Group(title=f"Сообщество {i}", slug=slug)
+                for i, slug in enumerate(slugs)
+            ),
+            ignore_conflicts=True,
+        )
+        return list(
+            Group.objects.filter(slug__startswith=f"gen{seed}-")
+            .order_by("pk")
+            .values_list("pk", flat=True)[:count]
+        )
+
+    def insert_posts(self, rows):
+        """Вставляет пачку постов одним executemany.
+
+        Не bulk_create: pre_save поля pub_date (auto_now_add) заменил бы
+        сгенерированные даты текущим временем, а сборка 100 000 объектов
+        модели занимает около 15 с против 4,5 с на SQLite.
+        """
+        table = connection.ops.quote_name(Post._meta.db_table)
+        columns = ", ".join(
+            connection.ops.quote_name(column) for column in POST_COLUMNS
+        )
+        placeholders = ", ".join(["%s"] * len(POST_COLUMNS))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                rows,
+            )
+
+    def handle(self, *args, **options):
+        seed = options["seed"]
+        now = EPOCH + timedelta(seconds=seed)
+        if options["now"]:
+            now = parse_now(options["now"])
+        batch_size = options["batch_size"]
+        worker_options = {
+            "seed": seed,
+            "days": options["days"],
+            "author_skew": options["author_skew"],
+            "group_skew": options["group_skew"],
+            "no_group_share": options["no_group_share"],
+            "now": now,
+            "author_ids": self.create_users(options["users"], seed),
+            "group_ids": self.create_groups(options["groups"], seed),
+        }
+        self.stdout.write(
+            f"Пользователей: {options['users']}, "
+            f"сообществ: {options['groups']}"
+        )
+        total = options["posts"]
+        chunks = [
+            (index, min(batch_size, total - start))
+            for index, start in enumerate(range(0, total, batch_size))
+        ]
+        if options["workers"] > 1:
+            pool = Pool(
+                options["workers"],
+                initializer=init_worker,
+                initargs=(worker_options,),
+            )
+            results = pool.imap(generate_chunk, chunks)
+        else:
+            pool = None
+            init_worker(worker_options)
+            results = map(generate_chunk, chunks)
+        created = 0
+        try:
+            for rows in results:
+                self.insert_posts(rows)
+                created += len(rows)
+                self.stdout.write(f"Постов: {created}/{total}")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        # Посты вставлены в обход сигналов: пересобираем производные данные.
+        # Ленты подписок пусты и без пересборки: подписок команда не создаёт.
+        bump_version(POSTS_SCOPE)
+        timeline.rebuild()
+        aggregates.rebuild()
+        for group_id in worker_options["group_ids"]:
+            related.build(group_id)
+        # В индекс дубликатов попадут только посты моложе его окна.
+        call_command("index_duplicates", stdout=self.stdout)
+        self.stdout.write(
+            "Лента, статистика сообществ и похожие посты пересобраны."
+        )
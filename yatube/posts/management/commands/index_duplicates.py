@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import duplicates
+from posts.models import Post, PostFingerprint
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет из индекса дубликатов посты старше окна и добавляет "
+        "недавние посты, сохранённые в обход post_save. "
+        "Запускается раз в сутки."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pruned = duplicates.prune()
+        since = timezone.now() - timedelta(
+            days=settings.DUPLICATE_WINDOW_DAYS
+        )
+        missing = Post.objects.filter(pub_date__gte=since).exclude(
+            pk__in=PostFingerprint.objects.values("post_id")
+        )
+        indexed = 0
+        for post in missing.only("pk", "text").iterator():
+            duplicates.index(post)
+            indexed += 1
+        self.stdout.write(
+            f"Удалено из индекса: {pruned}, добавлено: {indexed}, "
+            f"{time.perf_counter() - started:.2f} с"
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import aggregates
+
+
+class Command(BaseCommand):
+    help = "Переносит накопленные шарды счётчиков лайков в посты."
+
+    def handle(self, *args, **options):
+        merged = aggregates.merge_like_counters()
+        self.stdout.write(f"Обновлены счётчики лайков у постов: {merged}")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import aggregates, trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит шарды просмотров в посты и пересчитывает популярное. "
+        "Запускается раз в несколько минут."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        merged = aggregates.merge_view_counters()
+        scored = trending.rank()
+        self.stdout.write(
+            f"Просмотры перенесены у постов: {merged}, оценено постов: "
+            f"{scored}, пересчёт {trending.current_generation()} за "
+            f"{time.perf_counter() - started:.2f} с"
+        )
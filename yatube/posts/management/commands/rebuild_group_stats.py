@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import aggregates
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает статистику сообществ или проверяет её расхождение."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только найти сообщества с разошедшимися счётчиками.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drifted = aggregates.check()
+            if drifted:
+                raise CommandError(
+                    f"Счётчики разошлись у сообществ: {drifted}"
+                )
+            self.stdout.write("Счётчики согласованы.")
+            return
+        aggregates.rebuild()
+        self.stdout.write("Статистика сообществ пересчитана.")
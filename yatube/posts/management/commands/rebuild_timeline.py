@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает материализованную главную ленту. Воркеры с кешем "
+        "в памяти процесса увидят её через CACHE_VERSION_TIMEOUT секунд."
+    )
+
+    def handle(self, *args, **options):
+        count = timeline.rebuild()
+        self.stdout.write(f"В ленте записей: {count}")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import update_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        "Обновляет файлы карты сайта: пересобирает только шарды, "
+        "в которых изменились записи."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            help="Адрес сайта для ссылок; по умолчанию SITEMAP_BASE_URL.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Пересобрать все шарды.",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = update_sitemaps(options["base_url"], full=options["full"])
+        for section, count in rebuilt.items():
+            self.stdout.write(f"{section}: пересобрано шардов {count}")
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_archivedpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timeline_entry', serialize=False, to='posts.Post')),
+                ('pub_date', models.DateTimeField(db_index=True)),
+                ('text', models.TextField()),
+                ('author_pk', models.IntegerField()),
+                ('author_username', models.CharField(max_length=150)),
+                ('author_first_name', models.CharField(blank=True, max_length=150)),
+                ('author_last_name', models.CharField(blank=True, max_length=150)),
+                ('group_pk', models.IntegerField(blank=True, null=True)),
+                ('group_slug', models.CharField(blank=True, max_length=50)),
+                ('group_title', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'ordering': ['-pub_date', '-post_id'],
+            },
+        ),
+    ]
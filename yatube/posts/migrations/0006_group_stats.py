@@ -0,0 +1,53 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0005_post_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('authors_count', models.PositiveIntegerField(default=0, verbose_name='Активных авторов')),
+            ],
+            options={
+                'verbose_name': 'Статистика сообщества',
+                'verbose_name_plural': 'Статистика сообществ',
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='posts.Group')),
+            ],
+            options={
+                'ordering': ['-day'],
+                'unique_together': {('group', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupAuthorStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to=settings.AUTH_USER_MODEL)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_stats', to='posts.Group')),
+            ],
+            options={
+                'unique_together': {('group', 'author')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapShard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20)),
+                ('number', models.PositiveIntegerField()),
+                ('dirty', models.BooleanField(default=True)),
+                ('covered_pk', models.PositiveIntegerField(default=0)),
+                ('urls', models.PositiveIntegerField(default=0)),
+                ('generated', models.DateTimeField(null=True)),
+            ],
+            options={
+                'unique_together': {('section', 'number')},
+            },
+        ),
+    ]
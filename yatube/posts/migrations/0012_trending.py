@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_sitemap_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Просмотров'),
+        ),
+        migrations.CreateModel(
+            name='ViewCounterShard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.IntegerField()),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('delta', models.IntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+                'unique_together': {('post_id', 'shard')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveIntegerField()),
+                ('position', models.PositiveIntegerField()),
+                ('post_id', models.IntegerField()),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'unique_together': {('generation', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_trending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedIndex',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='related_index', serialize=False, to='posts.Group')),
+                ('data', models.BinaryField()),
+                ('built', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.IntegerField()),
+                ('related_id', models.IntegerField()),
+                ('score', models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RelatedVector',
+            fields=[
+                ('post_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('group_id', models.IntegerField(db_index=True)),
+                ('built', models.DateTimeField()),
+                ('data', models.BinaryField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='relatedpost',
+            index=models.Index(fields=['post_id', '-score'], name='related_post_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='relatedpost',
+            index=models.Index(fields=['related_id'], name='related_related_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='relatedpost',
+            unique_together={('post_id', 'related_id')},
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0013_related_posts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FingerprintBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('post_id', models.IntegerField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PostFingerprint',
+            fields=[
+                ('post_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('signature', models.BinaryField()),
+                ('created', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PostReview',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('image', models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка')),
+                ('duplicate_of_id', models.IntegerField(verbose_name='Похож на пост')),
+                ('similarity', models.FloatField(verbose_name='Сходство')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата отправки')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_reviews', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Пост на проверке',
+                'verbose_name_plural': 'Посты на проверке',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_duplicates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inboxentry',
+            name='post',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='inbox_entries', to='posts.Post'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.template.defaultfilters import linebreaks_filter, linebreaksbr
+from django.utils.safestring import mark_safe
 
 User = get_user_model()
 
@@ -28,11 +30,53 @@ class Group(models.Model):
         verbose_name_plural = "Сообщества"
 
 
-class Post(models.Model):
+class RenderedTextMixin:
+    """Хранит HTML текста после ``linebreaks`` и ``linebreaksbr``.
+
+    HTML пересчитывается при сохранении; у старых записей, где его ещё
+    нет, он считается при первом обращении и дописывается в базу.
+    """
+
+    RENDERED_FIELDS = ("text_html", "text_html_br")
+
+    def render_text(self):
+        self.text_html = linebreaks_filter(self.text, autoescape=True)
+        self.text_html_br = linebreaksbr(self.text, autoescape=True)
+
+    def backfill_text(self):
+        self.render_text()
+        if self.pk is not None and not self._state.adding:
+            type(self)._default_manager.filter(pk=self.pk).update(
+                text_html=self.text_html, text_html_br=self.text_html_br
+            )
+
+    @property
+    def body_html(self):
+        if self.text and not self.text_html:
+            self.backfill_text()
+        return mark_safe(self.text_html)
+
+    @property
+    def body_html_br(self):
+        if self.text and not self.text_html_br:
+            self.backfill_text()
+        return mark_safe(self.text_html_br)
+
+    def save(self, *args, **kwargs):
+        self.render_text()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "text" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *self.RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+
+
+class Post(RenderedTextMixin, models.Model):
     text = models.TextField(
         verbose_name="Текст",
         help_text="Введите текст поста"
     )
+    text_html = models.TextField(blank=True, editable=False)
+    text_html_br = models.TextField(blank=True, editable=False)
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Дата публикации"
@@ -43,10 +87,6 @@ class Post(models.Model):
         related_name="posts",
         verbose_name="Автор"
     )
-
-    def __str__(self):
-        return self.text[:15]
-
     group = models.ForeignKey(
         Group,
         on_delete=models.SET_NULL,
@@ -56,8 +96,512 @@ class Post(models.Model):
         verbose_name="Группа",
         help_text="Группа, к которой будет относиться пост",
     )
+    image = models.ImageField(
+        "Картинка",
+        upload_to="posts/",
+        blank=True,
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Комментариев",
+    )
+    likes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Лайков",
+    )
+    # Нужен только для популярного (posts.trending), поэтому в архив и
+    # материализованную ленту не переносится.
+    views_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Просмотров",
+    )
+
+    COUNTER_FIELDS = ("comments_count", "likes_count", "views_count")
 
     class Meta:
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(fields=["-pub_date"], name="post_pub_date_idx"),
+            models.Index(
+                fields=["group", "-pub_date"], name="post_group_pub_date_idx"
+            ),
+            models.Index(
+                fields=["author", "-pub_date"], name="post_author_pub_date_idx"
+            ),
+        ]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
+
+    def __str__(self):
+        return self.text[:15]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Запоминаем группу из базы, чтобы обработчики сигналов видели,
+        # откуда пост перенесли.
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_group_id = instance.__dict__.get("group_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # Счётчики меняются только через UPDATE с F(): save() старого
+            # экземпляра не должен затирать их.
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        self.loaded_group_id = self.group_id
+
+
+class ArchivedPost(RenderedTextMixin, models.Model):
+    """Старый пост, перенесённый из горячей таблицы командой archive_posts.
+
+    id совпадает с исходным, поэтому адреса постов не меняются.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name="Текст")
+    text_html = models.TextField(blank=True, editable=False)
+    text_html_br = models.TextField(blank=True, editable=False)
+    pub_date = models.DateTimeField(
+        db_index=True,
+        verbose_name="Дата публикации"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_posts",
+        verbose_name="Автор"
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name="archived_posts",
+        blank=True,
+        null=True,
+        verbose_name="Группа",
+    )
+    image = models.ImageField(
+        "Картинка",
+        upload_to="posts/",
+        blank=True,
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Комментариев",
+    )
+    likes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Лайков",
+    )
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ["-pub_date"]
+        verbose_name = "Архивный пост"
+        verbose_name_plural = "Архивные посты"
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной главной ленты: самые новые посты
+    с полями, нужными карточке, без обращения к таблице постов."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="timeline_entry",
+    )
+    pub_date = models.DateTimeField(db_index=True)
+    text = models.TextField()
+    author_pk = models.IntegerField()
+    author_username = models.CharField(max_length=150)
+    author_first_name = models.CharField(max_length=150, blank=True)
+    author_last_name = models.CharField(max_length=150, blank=True)
+    group_pk = models.IntegerField(blank=True, null=True)
+    group_slug = models.CharField(max_length=50, blank=True)
+    group_title = models.CharField(max_length=200, blank=True)
+    image = models.CharField(max_length=100, blank=True)
+    comments_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-pub_date", "-post_id"]
+
+
+class GroupStats(models.Model):
+    """Счётчики сообщества, которые поддерживаются инкрементально."""
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Постов"
+    )
+    authors_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Активных авторов"
+    )
+
+    class Meta:
+        verbose_name = "Статистика сообщества"
+        verbose_name_plural = "Статистика сообществ"
+
+
+class GroupAuthorStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name="author_stats",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="group_stats",
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("group", "author")
+
+
+class GroupDailyStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+    )
+    day = models.DateField()
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        unique_together = ("group", "day")
+
+
+class Comment(models.Model):
+    # Без ограничения внешнего ключа: при архивации строка поста
+    # переезжает в ArchivedPost с тем же id, а комментарии остаются.
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="comments",
+        verbose_name="Пост"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="comments",
+        verbose_name="Автор"
+    )
+    text = models.TextField(
+        verbose_name="Текст комментария",
+        help_text="Введите текст комментария"
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата публикации"
+    )
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ["-created", "-pk"]
+        indexes = [
+            models.Index(
+                fields=["post", "-created"], name="comment_post_created_idx"
+            ),
+        ]
+        verbose_name = "Комментарий"
+        verbose_name_plural = "Комментарии"
+
+
+class Like(models.Model):
+    # Как у комментариев: лайки переживают перенос поста в архив.
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="likes",
+        verbose_name="Пост"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="likes",
+        verbose_name="Пользователь"
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="like_unique"
+            ),
+        ]
+        verbose_name = "Лайк"
+        verbose_name_plural = "Лайки"
+
+
+class CounterShard(models.Model):
+    """Часть счётчика поста, ещё не перенесённая в Post.
+
+    Изменение пишется в случайный из нескольких шардов, поэтому
+    одновременные лайки или просмотры популярного поста не ждут
+    блокировку одной строки. Суммы переносит в Post периодическая
+    команда.
+    """
+
+    post_id = models.IntegerField()
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        unique_together = ("post_id", "shard")
+
+
+class LikeCounterShard(CounterShard):
+    """Шард счётчика лайков; переносит команда merge_like_counters."""
+
+
+class ViewCounterShard(CounterShard):
+    """Шард счётчика просмотров; переносит команда rank_trending."""
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="follower",
+        verbose_name="Подписчик"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="following",
+        verbose_name="Автор"
+    )
+
+    def __str__(self):
+        return f"{self.user} → {self.author}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"], name="follow_unique"
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F("author")),
+                name="follow_not_self",
+            ),
+        ]
+        verbose_name = "Подписка"
+        verbose_name_plural = "Подписки"
+
+
+class FollowStats(models.Model):
+    """Число подписчиков автора: по нему выбирается способ доставки
+    постов в ленту подписок."""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="follow_stats",
+    )
+    followers_count = models.PositiveIntegerField(default=0)
+
+
+class InboxEntry(models.Model):
+    """Пост в ленте подписок пользователя, доставленный при публикации."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="inbox",
+    )
+    # Без ограничения внешнего ключа, как у комментариев: архивный пост
+    # остаётся в лентах подписчиков.
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="inbox_entries",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-pub_date", "-post_id"]
+        unique_together = ("user", "post")
+        indexes = [
+            models.Index(
+                fields=["user", "-pub_date", "-post"],
+                name="inbox_user_pub_date_idx",
+            ),
+            models.Index(
+                fields=["user", "author"], name="inbox_user_author_idx"
+            ),
+        ]
+
+
+class SitemapShard(models.Model):
+    """Файл карты сайта: SITEMAP_SHARD_SIZE идущих подряд id раздела.
+
+    ``covered_pk`` — наибольший id, который мог попасть в файл при
+    генерации; новые записи с большими id добавляются пересборкой только
+    последних шардов. Удаления и переименования помечают шард ``dirty``.
+    """
+
+    section = models.CharField(max_length=20)
+    number = models.PositiveIntegerField()
+    dirty = models.BooleanField(default=True)
+    covered_pk = models.PositiveIntegerField(default=0)
+    urls = models.PositiveIntegerField(default=0)
+    generated = models.DateTimeField(null=True)
+
+    class Meta:
+        unique_together = ("section", "number")
+
+
+class TrendingEntry(models.Model):
+    """Место поста в списке популярного одного пересчёта.
+
+    Предыдущий пересчёт удаляется только следующим: читатель, листающий
+    список по курсору, досматривает свою версию без пропусков и повторов.
+    """
+
+    generation = models.PositiveIntegerField()
+    position = models.PositiveIntegerField()
+    post_id = models.IntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ("generation", "position")
+
+
+class RelatedPost(models.Model):
+    """Похожий пост из того же сообщества (posts.related)."""
+
+    post_id = models.IntegerField()
+    related_id = models.IntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ("post_id", "related_id")
+        indexes = [
+            models.Index(
+                fields=["post_id", "-score"], name="related_post_score_idx"
+            ),
+            models.Index(fields=["related_id"], name="related_related_idx"),
+        ]
+
+
+class RelatedIndex(models.Model):
+    """Индекс TF-IDF сообщества: словарь, IDF и матрица документов,
+    сохранённые командой build_related в формате NumPy .npz."""
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="related_index",
+    )
+    data = models.BinaryField()
+    built = models.DateTimeField()
+
+
+class RelatedVector(models.Model):
+    """Вектор поста, сохранённого после сборки индекса сообщества.
+
+    Такие посты ещё не вошли в матрицу индекса, поэтому новые посты
+    сравниваются и с ними. Сборка индекса их удаляет.
+    """
+
+    post_id = models.IntegerField(primary_key=True)
+    group_id = models.IntegerField(db_index=True)
+    # Сборка индекса, по словарю которой построен вектор.
+    built = models.DateTimeField()
+    data = models.BinaryField()
+
+
+class PostFingerprint(models.Model):
+    """Подпись MinHash недавнего поста (posts.duplicates)."""
+
+    post_id = models.IntegerField(primary_key=True)
+    signature = models.BinaryField()
+    created = models.DateTimeField(db_index=True)
+
+
+class FingerprintBucket(models.Model):
+    """Корзина LSH: хеш полосы подписи поста. Посты с общей корзиной —
+    кандидаты в почти одинаковые."""
+
+    bucket = models.BigIntegerField(db_index=True)
+    post_id = models.IntegerField(db_index=True)
+
+
+class PostReview(models.Model):
+    """Пост, похожий на недавний: ждёт решения модератора."""
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="post_reviews",
+        verbose_name="Автор",
+    )
+    text = models.TextField("Текст")
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+        verbose_name="Группа",
+    )
+    image = models.ImageField("Картинка", upload_to="posts/", blank=True)
+    # Пост мог быть удалён, пока запись ждёт проверки.
+    duplicate_of_id = models.IntegerField("Похож на пост")
+    similarity = models.FloatField("Сходство")
+    created = models.DateTimeField("Дата отправки", auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created",)
+        verbose_name = "Пост на проверке"
+        verbose_name_plural = "Посты на проверке"
+
+    def __str__(self):
+        return self.text[:15]
+
+    def publish(self):
+        """Публикует пост и убирает его из очереди."""
+        post = Post.objects.create(
+            author_id=self.author_id,
+            text=self.text,
+            group_id=self.group_id,
+            image=self.image.name,
+        )
+        self.delete()
+        return post
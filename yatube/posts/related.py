@@ -0,0 +1,295 @@
+"""Похожие посты: косинусная близость TF-IDF текстов внутри сообщества.
+
+Команда build_related собирает индекс сообщества разреженной матрицей
+SciPy и сохраняет каждому посту RELATED_POSTS ближайших. Сохранённый
+пост сравнивается с матрицей и с постами, сохранёнными после сборки,
+и попадает в списки своих соседей. Страница поста читает готовый
+список запросом по индексу.
+
+NumPy и SciPy импортируются при первом обращении: страницам, которые
+только читают списки, они не нужны.
+"""
+import io
+import re
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Post, RelatedIndex, RelatedPost, RelatedVector
+
+TOKEN_RE = re.compile(r"[^\W\d_]{3,}")
+ENDINGS = "аеёиоуыэюяйь"
+CHUNK_ROWS: int = 512
+# В маленьком сообществе почти все слова «частые»: порог RELATED_MAX_DF
+# включается с этого числа постов.
+MAX_DF_MIN_POSTS: int = 20
+
+Index = namedtuple("Index", "built ids vocabulary idf matrix")
+
+
+def tokenize(text):
+    """Слова без гласных окончаний: «борща» и «борщ», «свёклой» и
+    «свёкла» дают один термин."""
+    return [
+        word.rstrip(ENDINGS) or word
+        for word in TOKEN_RE.findall(text.lower())
+    ]
+
+
+def tf_idf(tf, idf):
+    """Строки tf (CSR) → сублинейный TF-IDF с единичной нормой."""
+    import numpy as np
+    from scipy import sparse
+
+    matrix = tf.astype(float)
+    matrix.data = 1 + np.log(matrix.data)
+    matrix = matrix @ sparse.diags(idf)
+    matrix.eliminate_zeros()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)))
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms.ravel()) @ matrix).tocsr()
+
+
+def best(ids, scores, exclude, limit):
+    """До ``limit`` пар (id, оценка) с наибольшей оценкой."""
+    import numpy as np
+
+    keep = np.flatnonzero(
+        (scores >= settings.RELATED_MIN_SCORE) & (ids != exclude)
+    )
+    if len(keep) > limit:
+        keep = keep[np.argpartition(scores[keep], -limit)[-limit:]]
+    return [(int(ids[i]), float(scores[i])) for i in keep]
+
+
+def build(group_id):
+    """Собирает индекс сообщества и списки похожих постов заново.
+
+    Возвращает число проиндексированных постов.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    built = timezone.now()
+    if not Post.objects.filter(group_id=group_id).exists():
+        RelatedIndex.objects.filter(group_id=group_id).delete()
+        return 0
+    ids, indptr, indices, counts = [], [0], [], []
+    vocabulary = {}
+    posts = Post.objects.filter(group_id=group_id).order_by("pk")
+    for pk, text in posts.values_list("pk", "text").iterator():
+        for term, count in Counter(tokenize(text)).items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+        ids.append(pk)
+    ids = np.asarray(ids, dtype=np.int64)
+    tf = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.int64), indices, indptr),
+        shape=(len(ids), len(vocabulary)),
+    )
+    df = np.bincount(tf.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(ids)) / (1 + df)) + 1
+    if len(ids) >= MAX_DF_MIN_POSTS:
+        # Частые слова ничего не различают, а произведение матриц с ними
+        # становится почти плотным.
+        idf[df > settings.RELATED_MAX_DF * len(ids)] = 0
+    matrix = tf_idf(tf, idf)
+
+    related = []
+    transposed = matrix.T.tocsr()
+    for start in range(0, len(ids), CHUNK_ROWS):
+        block = (matrix[start:start + CHUNK_ROWS] @ transposed).tocsr()
+        for offset in range(block.shape[0]):
+            row = slice(block.indptr[offset], block.indptr[offset + 1])
+            pk = int(ids[start + offset])
+            related.extend(
+                RelatedPost(post_id=pk, related_id=other, score=score)
+                for other, score in best(
+                    ids[block.indices[row]],
+                    block.data[row],
+                    pk,
+                    settings.RELATED_POSTS,
+                )
+            )
+
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        ids=ids,
+        terms=np.frombuffer("\n".join(vocabulary).encode(), np.uint8),
+        idf=idf,
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+    )
+    with transaction.atomic():
+        RelatedPost.objects.filter(
+            post_id__in=Post.objects.filter(group_id=group_id).values("pk")
+        ).delete()
+        RelatedPost.objects.bulk_create(related)
+        # Посты, сохранённые во время сборки, получили id больше.
+        RelatedVector.objects.filter(
+            group_id=group_id, post_id__lte=int(ids[-1])
+        ).delete()
+        RelatedIndex.objects.update_or_create(
+            group_id=group_id,
+            defaults={"data": buffer.getvalue(), "built": built},
+        )
+    return len(ids)
+
+
+@lru_cache(maxsize=16)
+def load_index(group_id, built):
+    import numpy as np
+    from scipy import sparse
+
+    data = RelatedIndex.objects.values_list("data", flat=True).get(
+        group_id=group_id
+    )
+    arrays = np.load(io.BytesIO(bytes(data)), allow_pickle=False)
+    terms = bytes(arrays["terms"]).decode()
+    vocabulary = {
+        term: column
+        for column, term in enumerate(terms.split("\n") if terms else [])
+    }
+    matrix = sparse.csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]),
+        shape=(len(arrays["ids"]), len(vocabulary)),
+    )
+    return Index(built, arrays["ids"], vocabulary, arrays["idf"], matrix)
+
+
+def current_index(group_id):
+    """Индекс сообщества; в процессе держится до следующей сборки."""
+    built = RelatedIndex.objects.filter(group_id=group_id).values_list(
+        "built", flat=True
+    ).first()
+    return None if built is None else load_index(group_id, built)
+
+
+def vectorize(index, text):
+    """Текст → (столбцы, веса) по словарю индекса."""
+    import numpy as np
+    from scipy import sparse
+
+    counts = Counter(
+        term for term in tokenize(text) if term in index.vocabulary
+    )
+    tf = sparse.csr_matrix(
+        (
+            list(counts.values()),
+            [index.vocabulary[term] for term in counts],
+            [0, len(counts)],
+        ),
+        shape=(1, len(index.vocabulary)),
+    )
+    vector = tf_idf(tf, index.idf)
+    return vector.indices.astype(np.int32), vector.data.astype(np.float32)
+
+
+def pack(columns, weights):
+    return columns.tobytes() + weights.tobytes()
+
+
+def unpack(data):
+    import numpy as np
+
+    data = bytes(data)
+    half = len(data) // 2
+    return (
+        np.frombuffer(data[:half], np.int32),
+        np.frombuffer(data[half:], np.float32),
+    )
+
+
+def forget(post_ids):
+    """Убирает посты из списков похожих и из векторов после сборки."""
+    RelatedPost.objects.filter(
+        Q(post_id__in=post_ids) | Q(related_id__in=post_ids)
+    ).delete()
+    RelatedVector.objects.filter(post_id__in=post_ids).delete()
+
+
+def trim(post_id):
+    extra = list(
+        RelatedPost.objects.filter(post_id=post_id)
+        .order_by("-score")
+        .values_list("pk", flat=True)[settings.RELATED_POSTS:]
+    )
+    if extra:
+        RelatedPost.objects.filter(pk__in=extra).delete()
+
+
+def update(post):
+    """Пересчитывает похожие посты для сохранённого ``post``."""
+    import numpy as np
+
+    forget([post.pk])
+    index = None if post.group_id is None else current_index(post.group_id)
+    if index is None:
+        return
+    columns, weights = vectorize(index, post.text)
+    if not len(columns):
+        return
+    query = np.zeros(len(index.vocabulary))
+    query[columns] = weights
+    found = best(
+        index.ids, index.matrix @ query, post.pk, settings.RELATED_POSTS
+    )
+    pending = RelatedVector.objects.filter(
+        group_id=post.group_id, built=index.built
+    ).values_list("post_id", "data")
+    for other, data in pending.iterator():
+        other_columns, other_weights = unpack(data)
+        _, mine, theirs = np.intersect1d(
+            columns, other_columns, assume_unique=True, return_indices=True
+        )
+        score = float(weights[mine] @ other_weights[theirs])
+        if score >= settings.RELATED_MIN_SCORE:
+            found.append((other, score))
+    found = sorted(found, key=lambda item: item[1], reverse=True)[
+        :settings.RELATED_POSTS
+    ]
+    with transaction.atomic():
+        RelatedVector.objects.create(
+            post_id=post.pk,
+            group_id=post.group_id,
+            built=index.built,
+            data=pack(columns, weights),
+        )
+        RelatedPost.objects.bulk_create(
+            [
+                RelatedPost(post_id=post.pk, related_id=other, score=score)
+                for other, score in found
+            ] + [
+                RelatedPost(post_id=other, related_id=post.pk, score=score)
+                for other, score in found
+            ],
+            ignore_conflicts=True,
+        )
+        for other, _ in found:
+            trim(other)
+
+
+def related_posts(post):
+    """Похожие посты того же сообщества, лучшие первыми."""
+    if post.group_id is None:
+        return []
+    ids = list(
+        RelatedPost.objects.filter(post_id=post.pk)
+        .order_by("-score")
+        .values_list("related_id", flat=True)[:settings.RELATED_POSTS]
+    )
+    if not ids:
+        return []
+    # До пересборки индекса в нём могут остаться удалённые посты и
+    # посты, перенесённые в другое сообщество.
+    posts = Post.objects.filter(group_id=post.group_id).select_related(
+        "author"
+    ).in_bulk(ids)
+    return [posts[pk] for pk in ids if pk in posts]
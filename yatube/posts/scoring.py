@@ -0,0 +1,36 @@
+"""Оценка постов для популярного: векторные операции NumPy над всеми
+кандидатами окна сразу, без цикла Python по постам."""
+import numpy as np
+
+CANDIDATE_DTYPE = np.dtype([
+    ("pk", np.int64),
+    ("timestamp", np.float64),
+    ("views", np.int64),
+    ("likes", np.int64),
+    ("comments", np.int64),
+])
+
+
+def load(rows, count=-1):
+    """Кортежи (pk, timestamp, просмотры, лайки, комментарии) → массив."""
+    return np.fromiter(rows, CANDIDATE_DTYPE, count)
+
+
+def score(candidates, now, weights, gravity):
+    """Взвешенная сумма реакций, затухающая с возрастом поста."""
+    engagement = (
+        weights["views"] * candidates["views"]
+        + weights["likes"] * candidates["likes"]
+        + weights["comments"] * candidates["comments"]
+    )
+    age_hours = np.maximum(now - candidates["timestamp"], 0) / 3600
+    return engagement / (age_hours + 2) ** gravity
+
+
+def top(scores, pks, size):
+    """Индексы ``size`` лучших по убыванию оценки (при равенстве — новые
+    выше). Полностью сортируются только отобранные argpartition."""
+    best = np.flatnonzero(scores > 0)
+    if size < len(best):
+        best = best[np.argpartition(scores[best], -size)[-size:]]
+    return best[np.lexsort((-pks[best], -scores[best]))]
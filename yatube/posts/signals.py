@@ -0,0 +1,176 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from core import thumbnails
+
+from . import (aggregates, duplicates, follow, related, sitemaps,
+               timeline)
+from .cache import POSTS_SCOPE, bump_version, feed_scopes
+from .models import (Comment, Follow, Group, InboxEntry, Like,
+                     LikeCounterShard, Post, TimelineEntry, User)
+
+# Одно событие на пакетный перенос постов между группами
+# вместо post_save на каждый пост.
+posts_regrouped = Signal(
+    providing_args=["post_ids", "group_ids", "author_ids", "moves"]
+)
+
+# Пост вернули из архива: строка вставлена без post_save.
+post_restored = Signal(providing_args=["instance", "archived_group_id"])
+
+# Пачка постов перенесена в архив: строки удалены без post_delete.
+posts_archived = Signal(providing_args=["post_ids", "group_ids", "author_ids"])
+
+
+def published(post, group_ids):
+    """Общее для сохранённого поста и поста, возвращённого из архива."""
+    bump_version(*feed_scopes(group_ids, {post.author_id}))
+    timeline.push(post)
+    related.update(post)
+    duplicates.index(post)
+    if post.image:
+        thumbnails.schedule(post.image.name)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded_group_id = getattr(instance, "loaded_group_id", None)
+    if created:
+        bump_version(POSTS_SCOPE)
+        aggregates.change_counters(
+            instance.group_id, instance.author_id, instance.pub_date, 1
+        )
+        follow.deliver(instance)
+    elif hasattr(instance, "loaded_group_id"):
+        aggregates.move_post(
+            loaded_group_id,
+            instance.group_id,
+            instance.author_id,
+            instance.pub_date,
+        )
+    published(instance, {instance.group_id, loaded_group_id})
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    bump_version(POSTS_SCOPE)
+    bump_version(*feed_scopes({instance.group_id}, {instance.author_id}))
+    timeline.fill()
+    aggregates.change_counters(
+        instance.group_id, instance.author_id, instance.pub_date, -1
+    )
+    # У комментариев, лайков и лент подписок нет внешнего ключа с каскадом.
+    Comment.objects.filter(post_id=instance.pk).delete()
+    Like.objects.filter(post_id=instance.pk).delete()
+    InboxEntry.objects.filter(post_id=instance.pk).delete()
+    LikeCounterShard.objects.filter(post_id=instance.pk).delete()
+    sitemaps.mark_dirty("posts", instance.pk)
+    related.forget([instance.pk])
+    duplicates.forget([instance.pk])
+
+
+@receiver(posts_archived, sender=Post)
+def posts_archived_batch(sender, post_ids, group_ids, author_ids, **kwargs):
+    # Пост остаётся в сообществе: счётчики, комментарии и индексы те же.
+    bump_version(POSTS_SCOPE, *feed_scopes(group_ids, author_ids))
+    timeline.fill()
+
+
+@receiver(posts_regrouped, sender=Post)
+def posts_moved(sender, post_ids, group_ids, author_ids, moves, **kwargs):
+    bump_version(*feed_scopes(group_ids, author_ids))
+    timeline.refresh_groups(post_ids)
+    related.forget(post_ids)
+    aggregates.move_posts(moves)
+
+
+@receiver(post_restored, sender=Post)
+def post_unarchived(sender, instance, archived_group_id, **kwargs):
+    bump_version(POSTS_SCOPE)
+    aggregates.move_post(
+        archived_group_id,
+        instance.group_id,
+        instance.author_id,
+        instance.pub_date,
+    )
+    published(instance, {instance.group_id, archived_group_id})
+    follow.deliver(instance)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    TimelineEntry.objects.filter(group_pk=instance.pk).update(
+        group_slug=instance.slug, group_title=instance.title
+    )
+    bump_version(*feed_scopes({instance.pk}))
+    sitemaps.mark_dirty("groups", instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    TimelineEntry.objects.filter(group_pk=instance.pk).update(
+        group_pk=None, group_slug="", group_title=""
+    )
+    bump_version(*feed_scopes({instance.pk}))
+    sitemaps.mark_dirty("groups", instance.pk)
+
+
+AUTHOR_FIELDS = {"username", "first_name", "last_name"}
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, raw=False, update_fields=None,
+                 **kwargs):
+    if raw or created:
+        return
+    if update_fields is not None and not AUTHOR_FIELDS & set(update_fields):
+        return
+    TimelineEntry.objects.filter(author_pk=instance.pk).update(
+        author_username=instance.username,
+        author_first_name=instance.first_name,
+        author_last_name=instance.last_name,
+    )
+    bump_version(*feed_scopes(author_ids={instance.pk}))
+    sitemaps.mark_dirty("profiles", instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    sitemaps.mark_dirty("profiles", instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        aggregates.change_comments_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    aggregates.change_comments_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Like)
+def like_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        aggregates.change_likes_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Like)
+def like_deleted(sender, instance, **kwargs):
+    aggregates.change_likes_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        follow.followed(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    follow.unfollowed(instance)
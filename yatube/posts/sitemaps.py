@@ -0,0 +1,241 @@
+"""Карта сайта в файлах: индекс и шарды постов, сообществ и профилей.
+
+Шард — SITEMAP_SHARD_SIZE идущих подряд id раздела. Записи читаются
+потоком через iterator(), файл пишется построчно, поэтому память не
+зависит от числа постов. При обновлении пересобираются только шарды,
+в которых появились новые id или которые помечены ``dirty``.
+"""
+import gzip
+import heapq
+import os
+from abc import ABC, abstractmethod
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ArchivedPost, Group, Post, SitemapShard, User
+
+INDEX_NAME = "sitemap.xml"
+CHUNK_SIZE: int = 2000
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+class Section(ABC):
+    name = None
+
+    @abstractmethod
+    def sources(self):
+        """Запросы раздела; каждый отдаёт кортежи, первый элемент — id."""
+
+    @abstractmethod
+    def location(self, row):
+        """Путь страницы для строки из sources()."""
+
+    def lastmod(self, row):
+        return None
+
+    def max_pk(self):
+        values = [
+            source.aggregate(max_pk=Max("pk"))["max_pk"]
+            for source in self.sources()
+        ]
+        return max(filter(None, values), default=None)
+
+    def rows(self, start, stop):
+        return heapq.merge(*(
+            source.filter(pk__gte=start, pk__lt=stop)
+            .order_by("pk")
+            .iterator(chunk_size=CHUNK_SIZE)
+            for source in self.sources()
+        ))
+
+
+class PostsSection(Section):
+    """Посты из горячей таблицы и архива: у них общее пространство id.
+
+    lastmod — дата публикации, поэтому правка поста шард не меняет.
+    """
+
+    name = "posts"
+
+    def __init__(self):
+        # reverse() на каждый из миллионов постов заметно дороже строки.
+        prefix, suffix = reverse(
+            "posts:post_detail", args=[1]
+        ).rsplit("1", 1)
+        self.template = prefix + "{}" + suffix
+
+    def sources(self):
+        return [
+            Post.objects.values_list("pk", "pub_date"),
+            ArchivedPost.objects.values_list("pk", "pub_date"),
+        ]
+
+    def location(self, row):
+        return self.template.format(row[0])
+
+    def lastmod(self, row):
+        return row[1]
+
+
+class GroupsSection(Section):
+    name = "groups"
+
+    def sources(self):
+        return [Group.objects.values_list("pk", "slug")]
+
+    def location(self, row):
+        return reverse("posts:group_list", args=[row[1]])
+
+
+class ProfilesSection(Section):
+    name = "profiles"
+
+    def sources(self):
+        return [User.objects.values_list("pk", "username")]
+
+    def location(self, row):
+        return reverse("posts:profile", args=[row[1]])
+
+
+SECTIONS = [PostsSection, GroupsSection, ProfilesSection]
+
+
+def shard_number(pk):
+    return pk // settings.SITEMAP_SHARD_SIZE
+
+
+def shard_name(section, number):
+    return f"sitemap-{section}-{number}.xml.gz"
+
+
+def mark_dirty(section, pk):
+    """Помечает шард с этим id: запись из него удалена или сменила URL."""
+    SitemapShard.objects.filter(
+        section=section, number=shard_number(pk)
+    ).update(dirty=True)
+
+
+def w3c_date(value):
+    return value.isoformat(timespec="seconds")
+
+
+def write_atomic(path, lines, compress=False):
+    temp = path + ".tmp"
+    opener = gzip.open if compress else open
+    with opener(temp, "wt", encoding="utf-8") as out:
+        out.writelines(lines)
+    os.replace(temp, path)
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def url_entry(location, lastmod=None):
+    entry = f"<url><loc>{escape(location)}</loc>"
+    if lastmod is not None:
+        entry += f"<lastmod>{w3c_date(lastmod)}</lastmod>"
+    return entry + "</url>\n"
+
+
+def write_shard(section, number, base_url):
+    """Пишет шард на диск и возвращает число URL в нём."""
+    start = number * settings.SITEMAP_SHARD_SIZE
+    stop = start + settings.SITEMAP_SHARD_SIZE
+    count = 0
+
+    def lines():
+        nonlocal count
+        yield XML_HEAD + f"<urlset {XMLNS}>\n"
+        for row in section.rows(start, stop):
+            count += 1
+            yield url_entry(
+                base_url + section.location(row), section.lastmod(row)
+            )
+        yield "</urlset>\n"
+
+    path = os.path.join(
+        settings.SITEMAP_ROOT, shard_name(section.name, number)
+    )
+    write_atomic(path, lines(), compress=True)
+    if not count:
+        remove(path)
+    return count
+
+
+def update_section(section, base_url, full=False):
+    """Пересобирает изменившиеся шарды раздела; возвращает их число."""
+    shards = {
+        shard.number: shard
+        for shard in SitemapShard.objects.filter(section=section.name)
+    }
+    max_pk = section.max_pk()
+    last = -1 if max_pk is None else shard_number(max_pk)
+    rebuilt = 0
+    for number in range(last + 1):
+        stop = (number + 1) * settings.SITEMAP_SHARD_SIZE
+        covered = min(max_pk, stop - 1)
+        shard = shards.get(number)
+        if shard is None:
+            shard = SitemapShard.objects.create(
+                section=section.name, number=number
+            )
+        elif not (full or shard.dirty or shard.covered_pk < covered):
+            continue
+        # Флаг снимается до чтения: удаление во время генерации снова
+        # пометит шард, и он пересоберётся при следующем запуске.
+        SitemapShard.objects.filter(pk=shard.pk).update(dirty=False)
+        SitemapShard.objects.filter(pk=shard.pk).update(
+            covered_pk=covered,
+            urls=write_shard(section, number, base_url),
+            generated=timezone.now(),
+        )
+        rebuilt += 1
+    for shard in SitemapShard.objects.filter(
+        section=section.name, number__gt=last
+    ):
+        remove(os.path.join(
+            settings.SITEMAP_ROOT, shard_name(section.name, shard.number)
+        ))
+        shard.delete()
+    return rebuilt
+
+
+def write_index(base_url):
+    def lines():
+        yield XML_HEAD + f"<sitemapindex {XMLNS}>\n"
+        shards = SitemapShard.objects.filter(urls__gt=0).order_by(
+            "section", "number"
+        )
+        for shard in shards.iterator():
+            name = shard_name(shard.section, shard.number)
+            yield (
+                f"<sitemap><loc>{escape(f'{base_url}/{name}')}</loc>"
+                f"<lastmod>{w3c_date(shard.generated)}</lastmod></sitemap>\n"
+            )
+        yield "</sitemapindex>\n"
+
+    write_atomic(os.path.join(settings.SITEMAP_ROOT, INDEX_NAME), lines())
+
+
+def update_sitemaps(base_url=None, full=False):
+    """Обновляет файлы карты сайта в SITEMAP_ROOT.
+
+    Возвращает {раздел: число пересобранных шардов}.
+    """
+    base_url = (base_url or settings.SITEMAP_BASE_URL).rstrip("/")
+    os.makedirs(settings.SITEMAP_ROOT, exist_ok=True)
+    rebuilt = {
+        section.name: update_section(section, base_url, full)
+        for section in (section_class() for section_class in SECTIONS)
+    }
+    write_index(base_url)
+    return rebuilt
@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import EstimatedCountPaginator
+
+from ..models import Group, Post, TimelineEntry, User
+from ..signals import posts_regrouped
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="admin-slug",
+            description="Тестовое описание",
+        )
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def create_posts(self, count):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            author = User.objects.create_user(username=f"author{i}")
+            Post.objects.create(text="Пост", author=author, group=self.group)
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(
+                reverse("admin:posts_post_changelist")
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow(self):
+        """Число запросов списка постов не зависит от числа авторов."""
+        self.create_posts(2)
+        few = self.changelist_queries()
+        self.create_posts(8)
+        self.assertEqual(self.changelist_queries(), few)
+
+    def test_estimated_count_for_large_tables(self):
+        """Без фильтров большая таблица считается по оценке."""
+        self.create_posts(3)
+        queryset = Post.objects.all()
+        with mock.patch.object(EstimatedCountPaginator, "threshold", 1):
+            paginator = EstimatedCountPaginator(queryset, 10)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(paginator.count, 3)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries)
+        )
+        filtered = EstimatedCountPaginator(queryset.filter(pk=0), 10)
+        self.assertEqual(filtered.count, 0)
+
+    def test_list_editable_groups_saved_in_batch(self):
+        """Правки колонки группы сохраняются одним UPDATE на группу."""
+        self.create_posts(3)
+        target = Group.objects.create(title="Новая группа", slug="new-slug")
+        posts = list(Post.objects.order_by("pk"))
+        data = {
+            "form-TOTAL_FORMS": len(posts),
+            "form-INITIAL_FORMS": len(posts),
+            "form-MIN_NUM_FORMS": 0,
+            "form-MAX_NUM_FORMS": 1000,
+            "_save": "Сохранить",
+        }
+        for i, post in enumerate(posts):
+            data[f"form-{i}-id"] = post.pk
+            data[f"form-{i}-group"] = target.pk if i < 2 else ""
+        events = []
+
+        def receiver(sender, **kwargs):
+            events.append(kwargs)
+
+        posts_regrouped.connect(receiver, sender=Post)
+        self.addCleanup(posts_regrouped.disconnect, receiver, sender=Post)
+        with CaptureQueriesContext(connection) as queries:
+            self.admin_client.post(
+                reverse("admin:posts_post_changelist"), data
+            )
+        updates = [
+            query for query in queries
+            if query["sql"].startswith('UPDATE "posts_post"')
+        ]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            Post.objects.filter(group=target).count(), 2
+        )
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["group_ids"], {self.group.pk, target.pk})
+        self.assertEqual(
+            events[0]["author_ids"], {post.author_id for post in posts}
+        )
+
+    def test_move_to_group_action(self):
+        """Действие переносит выбранные посты в группу."""
+        self.create_posts(2)
+        target = Group.objects.create(title="Новая группа", slug="new-slug")
+        self.admin_client.post(
+            reverse("admin:posts_post_changelist"),
+            {
+                "action": "move_to_group",
+                "group": target.pk,
+                "_selected_action": list(
+                    Post.objects.values_list("pk", flat=True)
+                ),
+            },
+        )
+        self.assertEqual(Post.objects.filter(group=target).count(), 2)
+        entry = TimelineEntry.objects.first()
+        self.assertEqual(entry.group_slug, "new-slug")
+
+    def test_group_changelist_shows_stats(self):
+        """Список сообществ показывает счётчики постов."""
+        self.create_posts(2)
+        response = self.admin_client.get(
+            reverse("admin:posts_group_changelist")
+        )
+        self.assertContains(response, '<td class="field-posts_count">2</td>')
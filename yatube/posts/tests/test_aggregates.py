@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import aggregates
+from ..archive import archive_posts, restore_post, unarchived_copy
+from ..bulk import move_to_groups
+from ..models import (ArchivedPost, Group, GroupAuthorStats, GroupStats, Post,
+                      User)
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Counter")
+        cls.other = User.objects.create_user(username="Other")
+        cls.group = Group.objects.create(title="Первая", slug="first")
+        cls.second = Group.objects.create(title="Вторая", slug="second")
+
+    def setUp(self):
+        self.posts = [
+            Post.objects.create(text="Пост", author=author, group=self.group)
+            for author in (self.user, self.user, self.other)
+        ]
+
+    def stats(self, group):
+        return GroupStats.objects.get(group=group)
+
+    def test_counters_follow_posts(self):
+        """Счётчики меняются при создании, переносе и удалении постов."""
+        stats = self.stats(self.group)
+        self.assertEqual((stats.posts_count, stats.authors_count), (3, 2))
+
+        post = Post.objects.get(pk=self.posts[2].pk)
+        post.group = self.second
+        post.save()
+        self.posts[0].delete()
+        stats = self.stats(self.group)
+        self.assertEqual((stats.posts_count, stats.authors_count), (1, 1))
+        self.assertEqual(self.stats(self.second).posts_count, 1)
+        self.assertEqual(aggregates.check(), [])
+
+    def test_archive_and_bulk_moves_keep_counters(self):
+        """Архивация и пакетный перенос не ломают счётчики."""
+        Post.objects.filter(pk=self.posts[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+        # Дата сменена в обход счётчиков.
+        aggregates.rebuild()
+        archive_posts(timedelta(days=90))
+        self.assertEqual(self.stats(self.group).posts_count, 3)
+
+        post = unarchived_copy(ArchivedPost.objects.get())
+        post.group = self.second
+        restore_post(post)
+        move_to_groups({self.posts[1].pk: self.second.pk})
+        self.assertEqual(self.stats(self.group).posts_count, 1)
+        self.assertEqual(self.stats(self.second).posts_count, 2)
+        self.assertEqual(aggregates.check(), [])
+
+    def test_bulk_move_applies_deltas(self):
+        """Пакетный перенос меняет счётчики разницами, без пересчёта
+        по таблице постов."""
+        move_to_groups({post.pk: self.second.pk for post in self.posts[:2]})
+        with CaptureQueriesContext(connection) as queries:
+            move_to_groups({self.posts[2].pk: self.second.pk})
+        self.assertFalse(
+            any("GROUP BY" in query["sql"] for query in queries)
+        )
+        self.assertEqual(
+            (self.stats(self.group).posts_count,
+             self.stats(self.group).authors_count),
+            (0, 0),
+        )
+        stats = self.stats(self.second)
+        self.assertEqual((stats.posts_count, stats.authors_count), (3, 2))
+        self.assertEqual(aggregates.check(), [])
+
+    def test_delete_without_author_row(self):
+        """Удаление поста автора, для которого нет строки статистики, не
+        создаёт её и не уменьшает число авторов."""
+        GroupAuthorStats.objects.filter(author=self.other).delete()
+        self.posts[2].delete()
+        self.assertFalse(
+            GroupAuthorStats.objects.filter(author=self.other).exists()
+        )
+        stats = self.stats(self.group)
+        self.assertEqual((stats.posts_count, stats.authors_count), (2, 2))
+
+    def test_drift_detected_and_rebuilt(self):
+        """Проверка находит расхождение, пересчёт его устраняет."""
+        GroupStats.objects.filter(group=self.group).update(posts_count=10)
+        self.assertEqual(aggregates.check(), [self.group.pk])
+        aggregates.rebuild()
+        self.assertEqual(aggregates.check(), [])
+        self.assertEqual(self.stats(self.group).posts_count, 3)
+
+    def test_group_page_shows_stats(self):
+        """Страница сообщества показывает счётчики."""
+        response = Client().get(
+            reverse("posts:group_list", kwargs={"slug": self.group.slug})
+        )
+        # Страница отдаётся потоком: его можно прочитать только один раз.
+        html = b"".join(response.streaming_content).decode()
+        self.assertIn("Постов: 3", html)
+        self.assertIn("Активных авторов: 2", html)
+        self.assertEqual(
+            response.context["daily_stats"][0].day, timezone.localdate()
+        )
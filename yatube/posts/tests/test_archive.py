@@ -0,0 +1,129 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import related
+from ..archive import archive_posts
+from ..models import ArchivedPost, Group, Post, RelatedPost, User
+from .test_images import image_file
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ArchiveTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Archivist")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="archive-slug",
+            description="Тестовое описание",
+        )
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=self.user, group=self.group)
+            for i in range(13)
+        )
+        old = Post.objects.order_by("pk")[:8].values_list("pk", flat=True)
+        Post.objects.filter(pk__in=list(old)).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+        self.moved = archive_posts(timedelta(days=90), batch_size=3)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_old_posts_moved(self):
+        """Старые посты перенесены в архив с прежними id."""
+        self.assertEqual(self.moved, 8)
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(ArchivedPost.objects.count(), 8)
+        self.assertFalse(
+            Post.objects.filter(
+                pk__in=ArchivedPost.objects.values("pk")
+            ).exists()
+        )
+
+    def archive_queries(self, count):
+        old = timezone.now() - timedelta(days=365)
+        Post.objects.bulk_create(
+            Post(text=f"Старый {i}", author=self.user, group=self.group)
+            for i in range(count)
+        )
+        Post.objects.filter(text__startswith="Старый").update(pub_date=old)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(archive_posts(timedelta(days=90)), count)
+        return len(queries)
+
+    def test_archive_queries_do_not_grow_with_batch(self):
+        """Пачка архивируется за одно и то же число запросов, сколько бы
+        в ней ни было постов."""
+        self.assertEqual(self.archive_queries(40), self.archive_queries(4))
+
+    def test_feeds_fall_back_to_archive(self):
+        """Лента продолжается архивом на последней странице."""
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.user}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).context["page_obj"]
+                second = self.client.get(url + "?page=2").context["page_obj"]
+                self.assertEqual(first.paginator.count, 13)
+                self.assertEqual(len(second), 3)
+                self.assertIsInstance(second[0], ArchivedPost)
+
+    def test_archived_post_detail_and_edit(self):
+        """Архивный пост открывается и при правке возвращается в ленту."""
+        archived = ArchivedPost.objects.first()
+        detail = reverse("posts:post_detail", kwargs={"post_id": archived.pk})
+        self.assertEqual(self.client.get(detail).context["post"], archived)
+
+        self.authorized_client.post(
+            reverse("posts:post_edit", kwargs={"post_id": archived.pk}),
+            data={"text": "Исправленный пост", "group": self.group.pk},
+        )
+        post = Post.objects.get(pk=archived.pk)
+        self.assertEqual(post.text, "Исправленный пост")
+        self.assertEqual(post.pub_date, archived.pub_date)
+        self.assertFalse(ArchivedPost.objects.filter(pk=archived.pk).exists())
+
+    def test_edit_with_image_restores_like_save(self):
+        """Картинка, загруженная при правке архивного поста, записана в
+        хранилище, а пост попадает в миниатюры и похожие, как при
+        обычном сохранении."""
+        related.build(self.group.pk)
+        archived = ArchivedPost.objects.first()
+        with mock.patch("posts.signals.thumbnails.schedule") as schedule:
+            self.authorized_client.post(
+                reverse("posts:post_edit", kwargs={"post_id": archived.pk}),
+                data={
+                    "text": "Пост с картинкой",
+                    "group": self.group.pk,
+                    "image": image_file(),
+                },
+            )
+        post = Post.objects.get(pk=archived.pk)
+        self.assertTrue(post.image)
+        self.assertTrue(default_storage.exists(post.image.name))
+        schedule.assert_called_once_with(post.image.name)
+        self.assertTrue(RelatedPost.objects.filter(post_id=post.pk).exists())
@@ -0,0 +1,42 @@
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from .. import cache as posts_cache
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "web",
+    },
+    # Кеш в памяти другого процесса, например management-команды.
+    "command": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "command",
+    },
+}
+
+
+@override_settings(CACHES=CACHES, CACHE_VERSION_TIMEOUT=0.2)
+class VersionTimeoutTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["command"].clear()
+        self.counts = iter(range(1, 100))
+
+    def count(self):
+        return posts_cache.versioned_get_or_set(
+            lambda: next(self.counts), "count", posts_cache.POSTS_SCOPE
+        )
+
+    def test_bump_in_other_process_seen_after_timeout(self):
+        """Смену версии в чужом кеше в памяти воркер видит не позже
+        CACHE_VERSION_TIMEOUT."""
+        self.assertEqual(self.count(), 1)
+        with mock.patch.object(posts_cache, "cache", caches["command"]):
+            posts_cache.bump_version(posts_cache.POSTS_SCOPE)
+        self.assertEqual(self.count(), 1)
+        time.sleep(0.3)
+        self.assertEqual(self.count(), 2)
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_posts
+from ..models import ArchivedPost, Comment, Post, TimelineEntry, User
+
+
+class CommentsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Commentator")
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(author=self.user, text="Обсуждаем")
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.comment_url = reverse("posts:add_comment", args=[self.post.pk])
+
+    def comment(self, text="Комментарий"):
+        return self.authorized_client.post(self.comment_url, {"text": text})
+
+    def test_add_comment(self):
+        """Комментарий добавляется и увеличивает счётчики поста."""
+        response = self.comment("Первый")
+        self.assertRedirects(
+            response, reverse("posts:post_detail", args=[self.post.pk])
+        )
+        self.client.post(self.comment_url, {"text": "Аноним"})
+        self.assertEqual(
+            list(Comment.objects.values_list("text", flat=True)), ["Первый"]
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(TimelineEntry.objects.get().comments_count, 1)
+        Comment.objects.get().delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_cards_do_not_count_comments(self):
+        """Карточки ленты берут число комментариев из поста."""
+        for _ in range(3):
+            self.comment()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("posts:index"))
+            content = b"".join(response.streaming_content).decode()
+        self.assertIn("Комментариев: 3", content)
+        self.assertFalse(
+            any("posts_comment" in query["sql"] for query in queries)
+        )
+
+    def test_comments_are_paged_by_cursor(self):
+        """Комментарии листаются по курсору без пропусков и повторов."""
+        for i in range(25):
+            Comment.objects.create(
+                post=self.post, author=self.user, text=f"Комментарий {i}"
+            )
+        url = reverse("posts:post_detail", args=[self.post.pk])
+        first = self.client.get(url).context["comments"]
+        self.assertEqual(len(first), 20)
+        second = self.client.get(
+            url, {"cursor": first.next_cursor}
+        ).context["comments"]
+        self.assertFalse(second.has_next())
+        self.assertEqual(
+            [comment.text for comment in [*first, *second]],
+            [f"Комментарий {i}" for i in reversed(range(25))],
+        )
+
+    def test_stale_post_save_keeps_count(self):
+        """Правка поста не затирает счётчик, изменённый после загрузки."""
+        post = Post.objects.get(pk=self.post.pk)
+        self.comment()
+        post.text = "Исправленный текст"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_comments_survive_archiving(self):
+        """Архивация поста сохраняет комментарии, удаление — удаляет."""
+        self.comment()
+        Post.objects.create(author=self.user, text="Новее")
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+        archive_posts(timedelta(days=90))
+        self.assertEqual(ArchivedPost.objects.get().comments_count, 1)
+        response = self.client.get(
+            reverse("posts:post_detail", args=[self.post.pk])
+        )
+        self.assertEqual(len(response.context["comments"]), 1)
+        self.comment()
+        self.assertEqual(ArchivedPost.objects.get().comments_count, 2)
+
+        post = Post.objects.create(author=self.user, text="Удалим")
+        Comment.objects.create(post=post, author=self.user, text="Пропадёт")
+        post.delete()
+        self.assertFalse(Comment.objects.filter(post_id=post.pk).exists())
+        self.assertEqual(Comment.objects.count(), 2)
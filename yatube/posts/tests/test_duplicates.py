@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import duplicates
+from ..models import FingerprintBucket, Post, PostFingerprint, PostReview, User
+
+SPAM = (
+    "Только сегодня скидки до девяноста процентов на все товары нашего "
+    "магазина переходите по ссылке в профиле и получите подарок каждому "
+    "покупателю доставка бесплатно по всей стране в течение одного дня "
+    "количество подарков ограничено торопитесь пока акция ещё действует"
+)
+
+
+@override_settings(
+    DUPLICATE_REJECT_SIMILARITY=0.99, DUPLICATE_REVIEW_SIMILARITY=0.5
+)
+class DuplicateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Spammer")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.original = Post.objects.create(author=self.user, text=SPAM)
+
+    def submit(self, text):
+        return self.client.post(reverse("posts:post_create"), {"text": text})
+
+    def test_copy_is_rejected(self):
+        """Точная копия недавнего поста не публикуется."""
+        response = self.submit(SPAM.upper())
+        self.assertFormError(
+            response, "form", None, "Такой пост уже опубликован недавно."
+        )
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_edited_copy_is_held_for_review(self):
+        """Копия с правками уходит на проверку и публикуется модератором."""
+        words = SPAM.split()
+        words[10], words[25] = "вчера", "завтра"
+        response = self.submit(" ".join(words))
+        self.assertTrue(response.context["held"])
+        self.assertEqual(Post.objects.count(), 1)
+        review = PostReview.objects.get()
+        self.assertEqual(review.duplicate_of_id, self.original.pk)
+        self.assertLess(review.similarity, 0.99)
+        post = review.publish()
+        self.assertEqual(post.text, " ".join(words))
+        self.assertFalse(PostReview.objects.exists())
+
+    def test_unrelated_short_and_edited_posts_pass(self):
+        """Другие тексты, короткие повторы и правки своих постов
+        публикуются как обычно."""
+        self.assertRedirects(
+            self.submit("Сегодня ходили в поход на озеро и видели лося"),
+            reverse("posts:profile", args=[self.user.username]),
+        )
+        self.submit("Спасибо!")
+        self.submit("Спасибо!")
+        self.assertEqual(Post.objects.filter(text="Спасибо!").count(), 2)
+        response = self.client.post(
+            reverse("posts:post_edit", args=[self.original.pk]),
+            {"text": SPAM + " до конца недели"},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_index_follows_posts(self):
+        """Удалённые и устаревшие посты уходят из индекса."""
+        self.assertIsNotNone(duplicates.find_duplicate(SPAM))
+        PostFingerprint.objects.update(
+            created=timezone.now() - timedelta(days=30)
+        )
+        self.assertIsNone(duplicates.find_duplicate(SPAM))
+        self.assertEqual(duplicates.prune(), 1)
+        self.assertFalse(FingerprintBucket.objects.exists())
+
+        post = Post.objects.create(author=self.user, text=SPAM)
+        post.delete()
+        self.assertIsNone(duplicates.find_duplicate(SPAM))
+        self.assertFalse(PostFingerprint.objects.exists())
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username="Writer", first_name="Лев", last_name="Толстой"
+        )
+        cls.group = Group.objects.create(
+            title="Классика", slug="classic", description="Книги"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text="Все счастливые семьи"
+        )
+
+    def test_feeds_list_posts(self):
+        """Ленты сайта, группы и автора в RSS и Atom содержат пост."""
+        names = (
+            ("posts:index_rss", []),
+            ("posts:index_atom", []),
+            ("posts:group_rss", ["classic"]),
+            ("posts:group_atom", ["classic"]),
+            ("posts:profile_rss", ["Writer"]),
+            ("posts:profile_atom", ["Writer"]),
+        )
+        for name, args in names:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=args))
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "Все счастливые семьи")
+                self.assertContains(
+                    response,
+                    reverse("posts:post_detail", args=[self.post.pk]),
+                )
+                self.assertIn("public", response["Cache-Control"])
+        response = self.client.get(reverse("posts:group_rss", args=["none"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_not_modified_without_posts_query(self):
+        """Повторный запрос с ETag получает 304, не читая посты."""
+        url = reverse("posts:group_rss", args=["classic"])
+        etag = self.client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(
+            any("posts_post" in query["sql"] for query in queries)
+        )
+
+    def test_cached_until_posts_change(self):
+        """Лента берётся из кеша, пока её посты не изменились."""
+        url = reverse("posts:index_rss")
+        etag = self.client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertEqual(len(queries), 0)
+
+        self.post.text = "Каждая несчастливая семья"
+        self.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Каждая несчастливая семья")
+
+    def test_feed_invalidated_only_by_its_posts(self):
+        """Пост другого автора не сбрасывает ленту автора."""
+        url = reverse("posts:profile_rss", args=["Writer"])
+        etag = self.client.get(url)["ETag"]
+        other = User.objects.create_user(username="Other")
+        Post.objects.create(author=other, text="Чужой пост")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.author.first_name = "Лев Николаевич"
+        self.author.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Лев Николаевич Толстой")
@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_posts
+from ..models import ArchivedPost, Follow, FollowStats, InboxEntry, Post, User
+
+
+@override_settings(FOLLOW_FANOUT_MAX_FOLLOWERS=2, FOLLOW_BACKFILL_POSTS=3)
+class FollowFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username="Reader")
+        cls.author = User.objects.create_user(username="Author")
+        cls.star = User.objects.create_user(username="Star")
+        cls.fans = [
+            User.objects.create_user(username=f"Fan{i}") for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def follow(self, user, author):
+        client = Client()
+        client.force_login(user)
+        return client.post(
+            reverse("posts:profile_follow", args=[author.username])
+        )
+
+    def feed(self, cursor=None):
+        data = {"cursor": cursor} if cursor else {}
+        return self.reader_client.get(reverse("posts:follow_index"), data)
+
+    def test_follow_and_unfollow(self):
+        """Подписка добавляет последние посты автора, отписка убирает."""
+        for i in range(5):
+            Post.objects.create(author=self.author, text=f"Старый {i}")
+        response = self.follow(self.reader, self.author)
+        self.assertRedirects(
+            response, reverse("posts:profile", args=["Author"])
+        )
+        self.follow(self.reader, self.author)
+        self.follow(self.reader, self.reader)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.author.follow_stats.followers_count, 1)
+        self.assertEqual(
+            InboxEntry.objects.filter(user=self.reader).count(), 3
+        )
+
+        self.reader_client.post(
+            reverse("posts:profile_unfollow", args=["Author"])
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(InboxEntry.objects.exists())
+        self.assertEqual(
+            FollowStats.objects.get(author=self.author).followers_count, 0
+        )
+
+    def test_new_post_reaches_followers(self):
+        """Новый пост попадает только в ленты подписчиков."""
+        self.follow(self.reader, self.author)
+        post = Post.objects.create(author=self.author, text="Свежий пост")
+        self.assertEqual(list(self.feed().context["page_obj"]), [post])
+        stranger = Client()
+        stranger.force_login(self.fans[0])
+        response = stranger.get(reverse("posts:follow_index"))
+        self.assertEqual(len(response.context["page_obj"]), 0)
+        post.delete()
+        self.assertFalse(InboxEntry.objects.exists())
+
+    def test_heavy_author_is_read_on_show(self):
+        """Посты популярного автора не раскладываются, но есть в ленте;
+        страницы по курсору идут без пропусков и повторов."""
+        for user in (self.reader, *self.fans):
+            self.follow(user, self.star)
+        self.follow(self.reader, self.author)
+        InboxEntry.objects.all().delete()
+        for i in range(12):
+            Post.objects.create(
+                author=self.star if i % 2 else self.author, text=f"Пост {i}"
+            )
+        self.assertFalse(
+            InboxEntry.objects.filter(author=self.star).exists()
+        )
+
+        seen, cursor, queries = [], None, set()
+        while True:
+            with CaptureQueriesContext(connection) as captured:
+                page_obj = self.feed(cursor).context["page_obj"]
+            queries.add(len(captured))
+            seen.extend(page_obj)
+            if not page_obj.has_next():
+                break
+            cursor = page_obj.next_cursor
+        self.assertEqual(
+            seen, list(Post.objects.order_by("-pub_date", "-pk"))
+        )
+        self.assertEqual(len(queries), 1)
+
+    def test_archived_posts_stay_in_feed(self):
+        """Архивные посты подписок остаются в ленте, и разложенные при
+        публикации, и прочитанные при показе."""
+        for user in (self.reader, *self.fans):
+            self.follow(user, self.star)
+        self.follow(self.reader, self.author)
+        for author in (self.author, self.star):
+            Post.objects.create(author=author, text="Старый пост")
+        Post.objects.update(pub_date=timezone.now() - timedelta(days=365))
+        fresh = Post.objects.create(author=self.author, text="Свежий пост")
+        self.assertEqual(archive_posts(timedelta(days=90)), 2)
+
+        page_obj = self.feed().context["page_obj"]
+        self.assertEqual(page_obj[0], fresh)
+        self.assertEqual(
+            {(type(post), post.author) for post in page_obj[1:]},
+            {(ArchivedPost, self.author), (ArchivedPost, self.star)},
+        )
+
+    def test_author_back_under_threshold_is_delivered(self):
+        """Автор, опустившийся до порога, снова раскладывает посты, а его
+        свежие посты доставляются оставшимся подписчикам."""
+        for user in (self.reader, *self.fans):
+            self.follow(user, self.star)
+        post = Post.objects.create(author=self.star, text="Для всех")
+        self.assertFalse(InboxEntry.objects.filter(post=post).exists())
+        Follow.objects.filter(user=self.fans[0]).delete()
+        self.assertEqual(InboxEntry.objects.filter(post=post).count(), 2)
+
+    def test_follow_button_state(self):
+        """Меню пользователя сообщает, подписан ли он на автора."""
+        url = reverse("users:nav")
+        response = self.reader_client.get(url, {"author": "Author"})
+        self.assertContains(response, 'data-following="0"')
+        self.follow(self.reader, self.author)
+        response = self.reader_client.get(url, {"author": "Author"})
+        self.assertContains(response, 'data-following="1"')
+        response = self.reader_client.get(url, {"author": "Reader"})
+        self.assertNotContains(response, "data-following")
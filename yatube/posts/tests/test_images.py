@@ -0,0 +1,91 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core import thumbnails
+from core.views import serve_media
+
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(name="photo.png", color="red", size=(1200, 800)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Photographer")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_upload_is_named_by_content(self):
+        """Одинаковые картинки сохраняются под одним именем-хешем."""
+        with mock.patch("posts.signals.thumbnails.schedule"):
+            for name in ("first.png", "second.PNG"):
+                self.authorized_client.post(
+                    reverse("posts:post_create"),
+                    {"text": "Пост с картинкой", "image": image_file(name)},
+                )
+        first, second = Post.objects.order_by("pk")
+        self.assertRegex(
+            first.image.name, r"^posts/[0-9a-f]{2}/[0-9a-f]{62}\.png$"
+        )
+        self.assertEqual(first.image.name, second.image.name)
+
+    def test_feed_uses_thumbnail_from_pool(self):
+        """Лента не строит миниатюры сама: пока пул не закончил, в ней
+        исходная картинка, потом — миниатюра."""
+        with mock.patch("posts.signals.thumbnails.schedule") as schedule:
+            post = Post.objects.create(
+                author=self.user, text="Фото", image=image_file()
+            )
+        schedule.assert_called_once_with(post.image.name)
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, f'src="/media/{post.image.name}"')
+
+        futures = thumbnails.schedule(post.image.name)
+        self.assertEqual(len(futures), 1)
+        target = futures[0].result(timeout=60)
+        with Image.open(target) as thumbnail:
+            self.assertEqual(thumbnail.size, (960, 339))
+        self.assertEqual(thumbnails.schedule(post.image.name), [])
+
+        cache.clear()
+        url = thumbnails.thumbnail_name(post.image.name, "card")
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, f'src="/media/{url}"')
+
+    def test_media_is_cached_for_long(self):
+        """Файлы с хешем в имени отдаются с долгим кешированием."""
+        with mock.patch("posts.signals.thumbnails.schedule"):
+            post = Post.objects.create(
+                author=self.user, text="Фото", image=image_file(color="blue")
+            )
+        request = RequestFactory().get("/media/" + post.image.name)
+        response = serve_media(request, post.image.name)
+        self.assertEqual(
+            response["Cache-Control"],
+            "public, max-age=31536000, immutable",
+        )
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import aggregates
+from ..models import (Follow, Like, LikeCounterShard, Post, TimelineEntry,
+                      User)
+
+
+@override_settings(LIKE_COUNTER_SHARDS=4)
+class LikesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Liked")
+        cls.fans = [
+            User.objects.create_user(username=f"Fan{i}") for i in range(12)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.posts = [
+            Post.objects.create(author=self.author, text=f"Пост {i}")
+            for i in range(3)
+        ]
+
+    def like(self, user, post):
+        client = Client()
+        client.force_login(user)
+        return client.post(reverse("posts:post_like", args=[post.pk]))
+
+    def test_like_toggles_and_is_unique(self):
+        """Повторное нажатие снимает лайк; двух лайков одного
+        пользователя у поста быть не может."""
+        post = self.posts[0]
+        self.like(self.fans[0], post)
+        self.assertTrue(Like.objects.filter(user=self.fans[0]).exists())
+        self.like(self.fans[0], post)
+        self.assertFalse(Like.objects.exists())
+        Like.objects.create(user=self.fans[0], post=post)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Like.objects.create(user=self.fans[0], post=post)
+
+    def test_sharded_counters_are_merged(self):
+        """Лайки копятся в шардах и переносятся в пост при слиянии."""
+        post = self.posts[0]
+        for fan in self.fans:
+            self.like(fan, post)
+        self.like(self.fans[0], post)
+        shards = LikeCounterShard.objects.filter(post_id=post.pk)
+        self.assertLessEqual(shards.count(), 4)
+        self.assertEqual(sum(shards.values_list("delta", flat=True)), 11)
+        post.refresh_from_db()
+        self.assertEqual(post.likes_count, 0)
+
+        self.assertEqual(aggregates.merge_like_counters(), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.likes_count, 11)
+        self.assertEqual(
+            TimelineEntry.objects.get(pk=post.pk).likes_count, 11
+        )
+        self.assertFalse(LikeCounterShard.objects.exists())
+        response = self.client.get(reverse("posts:index"))
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("&#9829; 11", content)
+
+    def test_liked_state_in_one_query(self):
+        """Отметки «мне нравится» для страницы — один запрос."""
+        fan = self.fans[0]
+        self.like(fan, self.posts[0])
+        self.like(fan, self.posts[2])
+        client = Client()
+        client.force_login(fan)
+        ids = ",".join(str(post.pk) for post in self.posts)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("users:nav"), {"liked": ids})
+        self.assertContains(
+            response,
+            f'data-liked="{self.posts[0].pk} {self.posts[2].pk}"',
+        )
+        self.assertEqual(
+            sum("posts_like" in query["sql"] for query in queries), 1
+        )
+
+        Follow.objects.create(user=fan, author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("posts:follow_index"))
+            b"".join(response.streaming_content)
+        self.assertEqual(response.context["liked"], {
+            self.posts[0].pk, self.posts[2].pk
+        })
+        self.assertEqual(
+            sum("posts_like" in query["sql"] for query in queries), 1
+        )
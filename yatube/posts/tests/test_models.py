@@ -60,3 +60,22 @@ class PostModelTest(TestCase):
                     post._meta.get_field(field).help_text,
                     expected_value
                 )
+
+    def test_rendered_text_saved(self):
+        """HTML текста сохраняется вместе с постом."""
+        post = Post.objects.create(author=self.user, text="<b>а</b>\n\nб\nв")
+        post.refresh_from_db()
+        self.assertEqual(
+            post.text_html, "<p>&lt;b&gt;а&lt;/b&gt;</p>\n\n<p>б<br>в</p>"
+        )
+        self.assertEqual(
+            post.text_html_br, "&lt;b&gt;а&lt;/b&gt;<br><br>б<br>в"
+        )
+
+    def test_rendered_text_backfilled(self):
+        """У старых записей HTML считается при первом обращении."""
+        Post.objects.filter(pk=self.post.pk).update(text_html="")
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.body_html, f"<p>{post.text}</p>")
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, f"<p>{post.text}</p>")
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import related
+from ..models import Group, Post, RelatedPost, User
+
+TEXTS = {
+    "python": "Python декораторы и генераторы: пишем генераторы на Python",
+    "generators": "Генераторы Python экономят память, генераторы ленивые",
+    "borscht": "Рецепт борща: свёкла, капуста, картофель и сметана",
+    "soup": "Суп из свёклы и капусты: борщ без мяса со сметаной",
+}
+
+
+@override_settings(RELATED_POSTS=2, RELATED_MIN_SCORE=0.05)
+class RelatedPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Librarian")
+        cls.group = Group.objects.create(title="Разное", slug="misc")
+        cls.other_group = Group.objects.create(title="Другое", slug="other")
+
+    def setUp(self):
+        cache.clear()
+        self.posts = {
+            key: Post.objects.create(
+                author=self.user, group=self.group, text=text
+            )
+            for key, text in TEXTS.items()
+        }
+
+    def related_ids(self, post):
+        return [item.pk for item in related.related_posts(post)]
+
+    def test_build_finds_similar_texts(self):
+        """Сборка индекса связывает посты с общими словами."""
+        self.assertEqual(related.build(self.group.pk), 4)
+        self.assertEqual(
+            self.related_ids(self.posts["python"]),
+            [self.posts["generators"].pk],
+        )
+        self.assertEqual(
+            self.related_ids(self.posts["soup"]), [self.posts["borscht"].pk]
+        )
+        response = self.client.get(
+            reverse("posts:post_detail", args=[self.posts["soup"].pk])
+        )
+        self.assertContains(response, "Похожие записи")
+        self.assertEqual(
+            response.context["related"], [self.posts["borscht"]]
+        )
+
+    def test_new_post_is_added_incrementally(self):
+        """Новый пост без пересборки попадает в списки соседей, в том
+        числе постов, сохранённых после сборки."""
+        related.build(self.group.pk)
+        first = Post.objects.create(
+            author=self.user, group=self.group,
+            text="Борщ со сметаной и свёклой",
+        )
+        self.assertIn(self.posts["borscht"].pk, self.related_ids(first))
+        self.assertIn(first.pk, self.related_ids(self.posts["borscht"]))
+        second = Post.objects.create(
+            author=self.user, group=self.group,
+            text="Сметана и свёкла для борща",
+        )
+        self.assertIn(first.pk, self.related_ids(second))
+        self.assertLessEqual(
+            RelatedPost.objects.filter(
+                post_id=self.posts["borscht"].pk
+            ).count(),
+            2,
+        )
+
+    def test_moved_and_deleted_posts_are_forgotten(self):
+        """Удалённый или перенесённый пост исчезает из похожих."""
+        related.build(self.group.pk)
+        self.posts["generators"].delete()
+        self.assertEqual(self.related_ids(self.posts["python"]), [])
+        soup = self.posts["soup"]
+        soup.group = self.other_group
+        soup.save()
+        self.assertEqual(self.related_ids(self.posts["borscht"]), [])
+        self.assertEqual(self.related_ids(soup), [])
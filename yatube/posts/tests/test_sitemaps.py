@@ -0,0 +1,101 @@
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..archive import archive_posts
+from ..models import Group, Post, User
+from ..sitemaps import shard_name, shard_number, update_sitemaps
+
+TEMP_SITEMAP_ROOT = tempfile.mkdtemp()
+BASE_URL = "https://yatube.test"
+
+
+@override_settings(SITEMAP_ROOT=TEMP_SITEMAP_ROOT, SITEMAP_SHARD_SIZE=3)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Mapper")
+        cls.group = Group.objects.create(title="Карты", slug="maps")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_SITEMAP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.posts = [
+            Post.objects.create(author=self.user, text=f"Пост {i}")
+            for i in range(7)
+        ]
+
+    def read(self, name):
+        path = os.path.join(TEMP_SITEMAP_ROOT, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as sitemap:
+            return sitemap.read()
+
+    def shard_name(self, post):
+        return shard_name("posts", shard_number(post.pk))
+
+    def shard(self, post):
+        return self.read(self.shard_name(post))
+
+    def post_url(self, post):
+        return f"{BASE_URL}/posts/{post.pk}/</loc>"
+
+    def test_index_lists_shards(self):
+        """Индекс ссылается на шарды, а в шардах есть все URL."""
+        update_sitemaps(BASE_URL)
+        index = self.read("sitemap.xml")
+        for post in self.posts:
+            self.assertIn(f"{BASE_URL}/{self.shard_name(post)}", index)
+            self.assertIn(self.post_url(post), self.shard(post))
+        self.assertIn(f"{BASE_URL}/group/maps/", self.read(
+            shard_name("groups", shard_number(self.group.pk))
+        ))
+        self.assertIn(f"{BASE_URL}/profile/Mapper/", self.read(
+            shard_name("profiles", shard_number(self.user.pk))
+        ))
+
+    def test_only_changed_shards_are_rebuilt(self):
+        """Повторный запуск пересобирает только шарды с изменениями."""
+        update_sitemaps(BASE_URL)
+        self.assertEqual(
+            update_sitemaps(BASE_URL),
+            {"posts": 0, "groups": 0, "profiles": 0},
+        )
+
+        new = Post.objects.create(author=self.user, text="Новый")
+        self.assertEqual(update_sitemaps(BASE_URL)["posts"], 1)
+        self.assertIn(self.post_url(new), self.shard(new))
+
+        numbers = [shard_number(post.pk) for post in self.posts]
+        deleted = next(
+            post for post, number in zip(self.posts, numbers)
+            if numbers.count(number) > 1
+        )
+        url, name = self.post_url(deleted), self.shard_name(deleted)
+        deleted.delete()
+        self.assertEqual(update_sitemaps(BASE_URL)["posts"], 1)
+        self.assertNotIn(url, self.read(name))
+
+        self.user.username = "Cartographer"
+        self.user.save()
+        self.assertEqual(update_sitemaps(BASE_URL)["profiles"], 1)
+
+    def test_archived_posts_stay_in_sitemap(self):
+        """Архивация не убирает пост из карты сайта."""
+        old = self.posts[0]
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+        update_sitemaps(BASE_URL)
+        archive_posts(timedelta(days=90))
+        update_sitemaps(BASE_URL, full=True)
+        self.assertIn(self.post_url(old), self.shard(old))
@@ -0,0 +1,99 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import cache as posts_cache
+from .. import timeline
+from ..models import Group, Post, TimelineEntry, User
+from .test_cache import CACHES
+
+
+@override_settings(TIMELINE_SIZE=20)
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Timeline")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="timeline-slug",
+            description="Тестовое описание",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        for i in range(25):
+            Post.objects.create(
+                text=f"Пост {i}", author=self.user, group=self.group
+            )
+
+    def test_window_is_trimmed(self):
+        """В ленте хранятся только TIMELINE_SIZE самых новых постов."""
+        self.assertEqual(TimelineEntry.objects.count(), 20)
+        self.assertEqual(timeline.check(), [])
+
+    def test_first_pages_skip_posts_table(self):
+        """Первые страницы главной не обращаются к таблице постов."""
+        url = reverse("posts:index")
+        self.guest_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url + "?page=2")
+        self.assertFalse(
+            any("posts_post" in query["sql"] for query in queries)
+        )
+        self.assertEqual(
+            list(response.context["page_obj"]),
+            list(Post.objects.order_by("-pub_date", "-pk")[10:20]),
+        )
+        self.assertEqual(response.context["page_obj"][0].group, self.group)
+
+        last_page = self.guest_client.get(url + "?page=3")
+        self.assertEqual(len(last_page.context["page_obj"]), 5)
+
+    def test_changes_are_tracked(self):
+        """Правка, удаление и переименование группы обновляют ленту."""
+        newest = Post.objects.first()
+        newest.text = "Исправленный пост"
+        newest.save()
+        Post.objects.last().delete()
+        Post.objects.order_by("-pub_date")[1].delete()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = "Новое название"
+        group.save()
+        self.assertEqual(TimelineEntry.objects.count(), 20)
+        self.assertEqual(timeline.check(), [])
+
+    def test_check_and_rebuild(self):
+        """Проверка находит расхождения, пересборка их устраняет."""
+        Post.objects.filter(pk=Post.objects.first().pk).update(text="Тайком")
+        self.assertEqual(len(timeline.check()), 1)
+        timeline.rebuild()
+        self.assertEqual(timeline.check(), [])
+
+    @override_settings(CACHES=CACHES, CACHE_VERSION_TIMEOUT=0.2)
+    def test_rebuild_from_command_process(self):
+        """rebuild_timeline в другом процессе с кешем в памяти: воркер
+        видит новое число постов не позже CACHE_VERSION_TIMEOUT."""
+        url = reverse("posts:index")
+        self.assertEqual(
+            self.guest_client.get(url).context["page_obj"].paginator.count,
+            25,
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Загружен {i}", author=self.user) for i in range(5)
+        )
+        with mock.patch.object(posts_cache, "cache", caches["command"]):
+            call_command("rebuild_timeline", stdout=mock.Mock())
+        time.sleep(0.3)
+        response = self.guest_client.get(url)
+        self.assertEqual(response.context["page_obj"].paginator.count, 30)
+        self.assertEqual(
+            response.context["page_obj"][0].text, "Загружен 4"
+        )
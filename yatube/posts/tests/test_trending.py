@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import aggregates, trending
+from ..models import Post, TrendingEntry, User
+
+
+@override_settings(
+    TRENDING_WEIGHTS={"views": 1.0, "likes": 5.0, "comments": 10.0},
+    TRENDING_GRAVITY=1.8,
+    TRENDING_WINDOW_HOURS=72,
+)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Trendsetter")
+
+    def setUp(self):
+        cache.clear()
+
+    def make_post(self, text, hours_ago=0, **counters):
+        post = Post.objects.create(author=self.user, text=text)
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.now() - timedelta(hours=hours_ago), **counters
+        )
+        return post
+
+    def page(self, cursor=None):
+        data = {"cursor": cursor} if cursor else {}
+        response = self.client.get(reverse("posts:trending"), data)
+        return response.context["page_obj"]
+
+    def test_engagement_and_age_order(self):
+        """Реакции поднимают пост, возраст опускает; посты без реакций и
+        вне окна в список не попадают."""
+        self.make_post("Обсуждаемый", hours_ago=5, comments_count=10)
+        self.make_post("Просмотренный", hours_ago=5, views_count=10)
+        self.make_post("Вчерашний", hours_ago=30, comments_count=10)
+        self.make_post("Тихий")
+        self.make_post("Старый", hours_ago=100, likes_count=1000)
+        self.assertEqual(trending.rank(), 4)
+        self.assertEqual(
+            [post.text for post in self.page()],
+            ["Обсуждаемый", "Просмотренный", "Вчерашний"],
+        )
+
+    @override_settings(TRENDING_SIZE=30)
+    def test_cursor_survives_new_ranking(self):
+        """Новый пересчёт во время чтения не даёт пропусков и повторов."""
+        posts = [
+            self.make_post(f"Пост {i}", likes_count=i + 1) for i in range(25)
+        ]
+        trending.rank()
+        first = self.page()
+        Post.objects.filter(pk=posts[0].pk).update(likes_count=1000)
+        trending.rank()
+        seen, page_obj = list(first), first
+        while page_obj.has_next():
+            page_obj = self.page(page_obj.next_cursor)
+            seen.extend(page_obj)
+        self.assertEqual(seen, posts[::-1])
+        self.assertEqual(self.page()[0], posts[0])
+
+        trending.rank()
+        self.assertEqual(
+            set(TrendingEntry.objects.values_list("generation", flat=True)),
+            {trending.current_generation() - 1, trending.current_generation()},
+        )
+
+    def test_views_are_counted_by_beacon(self):
+        """Просмотр засчитывается POST-запросом раз на посетителя и
+        переносится в пост; меню пользователя ничего не записывает."""
+        post = self.make_post("Читаемый")
+        url = reverse("posts:post_view", args=[post.pk])
+        self.client.get(reverse("users:nav"), {"viewed": post.pk})
+        self.assertEqual(self.client.get(url).status_code, 405)
+        for _ in range(3):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, 204)
+            self.assertNotIn("pin_primary", response.cookies)
+        self.client.post(url, REMOTE_ADDR="10.0.0.2")
+        self.client.post(reverse("posts:post_view", args=[post.pk + 100]))
+        self.assertEqual(aggregates.merge_view_counters(), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.views_count, 2)
@@ -1,4 +1,7 @@
+import re
+
 from django import forms
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -23,6 +26,7 @@ class PostsPagesTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -48,6 +52,18 @@ class PostsPagesTests(TestCase):
                 response = self.authorized_client.get(reverse_name)
                 self.assertTemplateUsed(response, template[0])
 
+    def test_feed_pages_are_streamed(self):
+        """Главная и профиль отдаются потоком вместе с постами."""
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:profile", kwargs={"username": self.user.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.streaming)
+                self.assertContains(response, "Тестовый пост")
+
     def test_index_show_correct_context(self):
         """Шаблон index сформирован с правильным контекстом."""
         response = self.authorized_client.get(reverse("posts:index"))
@@ -156,6 +172,7 @@ class PaginatorViewsTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
 
@@ -196,3 +213,62 @@ class PaginatorViewsTest(TestCase):
                 self.assertEqual(len(response.context["page_obj"]),
                                  NUMBER_POSTS
                                  ),
+
+
+class SharedPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="Shared")
+        cls.post = Post.objects.create(author=cls.user, text="Общий пост")
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client(enforce_csrf_checks=True)
+        self.authorized_client.force_login(self.user)
+
+    def test_anonymous_page_is_public(self):
+        """Страница для анонима одна на всех и кешируется CDN."""
+        url = reverse("posts:post_detail", kwargs={"post_id": self.post.pk})
+        response = self.client.get(url)
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+        self.assertIn("Cookie", response["Vary"])
+        self.assertFalse(response.cookies)
+        self.assertFalse(response.wsgi_request.session.accessed)
+        self.assertContains(response, 'data-owner="Shared" hidden')
+
+        response = self.authorized_client.get(url)
+        self.assertEqual(response["Cache-Control"], "private, max-age=0")
+        self.assertContains(response, 'data-owner="Shared" hidden')
+
+    def test_user_nav(self):
+        """Меню пользователя отдаётся отдельно и не кешируется CDN."""
+        response = self.authorized_client.get(reverse("users:nav"))
+        self.assertContains(response, 'data-username="Shared"')
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("Cookie", response["Vary"])
+        self.assertContains(self.client.get(reverse("users:nav")), "Войти")
+
+    def test_user_nav_issues_csrf_token(self):
+        """Без cookie csrftoken формы общей страницы получают токен из
+        меню пользователя."""
+        self.assertNotIn("csrftoken", self.authorized_client.cookies)
+        response = self.authorized_client.get(reverse("users:nav"))
+        token = re.search(r'data-csrf="([^"]+)"', response.content.decode())
+        response = self.authorized_client.post(
+            reverse("posts:post_like", args=[self.post.pk]),
+            {"csrfmiddlewaretoken": token[1]},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_create_post_keeps_csrf(self):
+        """Форма создания поста не кешируется и проходит проверку CSRF."""
+        response = self.authorized_client.get(reverse("posts:post_create"))
+        self.assertIn("no-store", response["Cache-Control"])
+        token = response.cookies["csrftoken"].value
+        response = self.authorized_client.post(
+            reverse("posts:post_create"),
+            {"text": "Через форму", "csrfmiddlewaretoken": token},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.objects.filter(text="Через форму").exists())
@@ -0,0 +1,192 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from .cache import (ARCHIVE_SCOPE, POSTS_SCOPE, bump_version,
+                    versioned_get_or_set)
+from .models import Group, Post, TimelineEntry, User
+
+ENTRY_FIELDS = (
+    "pub_date",
+    "text",
+    "author_pk",
+    "author_username",
+    "author_first_name",
+    "author_last_name",
+    "group_pk",
+    "group_slug",
+    "group_title",
+    "image",
+    "comments_count",
+    "likes_count",
+)
+
+
+def entry_values(post):
+    group = post.group
+    return {
+        "pub_date": post.pub_date,
+        "text": post.text,
+        "author_pk": post.author.pk,
+        "author_username": post.author.username,
+        "author_first_name": post.author.first_name,
+        "author_last_name": post.author.last_name,
+        "group_pk": group.pk if group else None,
+        "group_slug": group.slug if group else "",
+        "group_title": group.title if group else "",
+        "image": post.image.name,
+        "comments_count": post.comments_count,
+        "likes_count": post.likes_count,
+    }
+
+
+def newest_posts():
+    return Post.objects.select_related("author", "group").order_by(
+        "-pub_date", "-pk"
+    )
+
+
+def hydrate(entry):
+    """Собирает из записи ленты Post, не обращаясь к базе."""
+    author = User(
+        pk=entry.author_pk,
+        username=entry.author_username,
+        first_name=entry.author_first_name,
+        last_name=entry.author_last_name,
+    )
+    post = Post(
+        pk=entry.post_id,
+        text=entry.text,
+        pub_date=entry.pub_date,
+        author=author,
+        image=entry.image,
+        comments_count=entry.comments_count,
+        likes_count=entry.likes_count,
+    )
+    if entry.group_pk is not None:
+        post.group = Group(
+            pk=entry.group_pk, slug=entry.group_slug, title=entry.group_title
+        )
+    for obj in (post, author, post.group):
+        if obj is not None:
+            obj._state.adding = False
+            obj._state.db = entry._state.db
+    return post
+
+
+def trim():
+    stale = TimelineEntry.objects.values_list("pk", flat=True)[
+        settings.TIMELINE_SIZE:
+    ]
+    TimelineEntry.objects.filter(pk__in=list(stale)).delete()
+
+
+def push(post):
+    """Добавляет или обновляет пост, если он попадает в окно ленты."""
+    entries = TimelineEntry.objects.all()
+    if not entries.filter(pk=post.pk).exists():
+        oldest = entries.values_list("pub_date", flat=True)[
+            settings.TIMELINE_SIZE - 1:settings.TIMELINE_SIZE
+        ].first()
+        if oldest is not None and post.pub_date < oldest:
+            return
+    TimelineEntry.objects.update_or_create(
+        post_id=post.pk, defaults=entry_values(post)
+    )
+    trim()
+
+
+def refresh_groups(post_ids):
+    """Обновляет группы в записях ленты после пакетного переноса постов:
+    один UPDATE на каждую новую группу."""
+    moved = defaultdict(list)
+    rows = Post.objects.filter(
+        pk__in=TimelineEntry.objects.filter(pk__in=post_ids).values("pk")
+    ).values_list("pk", "group_id")
+    for pk, group_id in rows:
+        moved[group_id].append(pk)
+    groups = Group.objects.in_bulk([pk for pk in moved if pk is not None])
+    for group_id, pks in moved.items():
+        group = groups.get(group_id)
+        TimelineEntry.objects.filter(pk__in=pks).update(
+            group_pk=group_id,
+            group_slug=group.slug if group else "",
+            group_title=group.title if group else "",
+        )
+
+
+def fill():
+    """Дополняет ленту более старыми постами после удалений."""
+    entries = TimelineEntry.objects.all()
+    missing = settings.TIMELINE_SIZE - entries.count()
+    if missing <= 0:
+        return
+    posts = newest_posts()
+    oldest = entries.last()
+    if oldest is not None:
+        posts = posts.filter(pub_date__lte=oldest.pub_date).exclude(
+            pk__in=entries.values("pk")
+        )
+    TimelineEntry.objects.bulk_create(
+        TimelineEntry(post_id=post.pk, **entry_values(post))
+        for post in posts[:missing]
+    )
+
+
+def rebuild():
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        fill()
+    bump_version(POSTS_SCOPE)
+    return TimelineEntry.objects.count()
+
+
+def check():
+    """Возвращает id постов, записи которых расходятся с таблицей постов."""
+    expected = {
+        post.pk: entry_values(post)
+        for post in newest_posts()[:settings.TIMELINE_SIZE]
+    }
+    actual = {
+        entry.post_id: {field: getattr(entry, field) for field in ENTRY_FIELDS}
+        for entry in TimelineEntry.objects.all()
+    }
+    return sorted(
+        pk for pk in expected.keys() | actual.keys()
+        if expected.get(pk) != actual.get(pk)
+    )
+
+
+class TimelineFeed:
+    """Лента для Paginator: первые TIMELINE_SIZE постов отдаются из
+    материализованной ленты, остальное — из ``fallback``."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    @cached_property
+    def total(self):
+        return versioned_get_or_set(
+            self.fallback.count, "timeline_count", POSTS_SCOPE, ARCHIVE_SCOPE
+        )
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = self.total if index.stop is None else index.stop
+        expected = min(stop, self.total) - start
+        if stop <= settings.TIMELINE_SIZE:
+            entries = list(TimelineEntry.objects.all()[start:stop])
+            # Неполная лента (после деплоя или удалений) — читаем из базы.
+            if len(entries) == expected:
+                return [hydrate(entry) for entry in entries]
+        return self.fallback[start:stop]
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.paginator import CursorPage
+
+from .models import Post, TrendingEntry
+
+CHUNK_SIZE: int = 10000
+
+
+def current_generation():
+    return TrendingEntry.objects.aggregate(
+        generation=Max("generation")
+    )["generation"]
+
+
+def make_cursor(generation, position):
+    return f"{generation}_{position}"
+
+
+def parse_cursor(value):
+    """Курсор → (пересчёт, место); None для пустого или испорченного."""
+    try:
+        generation, position = value.split("_")
+        return int(generation), int(position)
+    except (AttributeError, ValueError):
+        return None
+
+
+def candidates(since):
+    rows = Post.objects.filter(pub_date__gte=since).values_list(
+        "pk", "pub_date", "views_count", "likes_count", "comments_count"
+    )
+    for pk, pub_date, views, likes, comments in rows.iterator(CHUNK_SIZE):
+        yield pk, pub_date.timestamp(), views, likes, comments
+
+
+def rank(now=None):
+    """Пересчитывает популярное по постам окна TRENDING_WINDOW_HOURS.
+
+    Возвращает число оценённых постов. Сохраняется новый пересчёт,
+    а позапрошлый удаляется.
+    """
+    # NumPy нужен только периодической задаче, веб-воркеры его не грузят.
+    from . import scoring
+
+    now = now or timezone.now()
+    posts = scoring.load(
+        candidates(now - timedelta(hours=settings.TRENDING_WINDOW_HOURS))
+    )
+    scores = scoring.score(
+        posts,
+        now.timestamp(),
+        settings.TRENDING_WEIGHTS,
+        settings.TRENDING_GRAVITY,
+    )
+    best = scoring.top(scores, posts["pk"], settings.TRENDING_SIZE)
+    generation = (current_generation() or 0) + 1
+    with transaction.atomic():
+        TrendingEntry.objects.bulk_create(
+            TrendingEntry(
+                generation=generation,
+                position=position,
+                post_id=int(posts["pk"][index]),
+                score=float(scores[index]),
+            )
+            for position, index in enumerate(best, 1)
+        )
+        # Пустой пересчёт не сохраняется: старый список тоже убираем.
+        keep = generation - 1 if len(best) else generation
+        TrendingEntry.objects.filter(generation__lt=keep).delete()
+    return len(posts)
+
+
+class TrendingFeed:
+    """Популярное: готовый список последнего пересчёта.
+
+    Курсор помнит пересчёт, поэтому новый пересчёт во время чтения не
+    даёт пропусков и повторов.
+    """
+
+    def page(self, cursor, per_page):
+        position = parse_cursor(cursor)
+        if position is None:
+            generation, after = current_generation(), 0
+        else:
+            generation, after = position
+        entries = list(
+            TrendingEntry.objects.filter(
+                generation=generation, position__gt=after
+            ).order_by("position").values_list("position", "post_id")[
+                :per_page + 1
+            ]
+        )
+        next_cursor = None
+        if len(entries) > per_page:
+            del entries[per_page:]
+            next_cursor = make_cursor(generation, entries[-1][0])
+        posts = Post.objects.select_related("author", "group").in_bulk(
+            [post_id for _, post_id in entries]
+        )
+        return CursorPage(
+            [posts[post_id] for _, post_id in entries if post_id in posts],
+            next_cursor,
+            position is None,
+        )
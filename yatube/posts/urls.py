@@ -1,14 +1,51 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = "posts"
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path("rss/", feeds.LatestPostsFeed(), name="index_rss"),
+    path("atom/", feeds.LatestPostsAtomFeed(), name="index_atom"),
+    path("trending/", views.trending, name="trending"),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
+    path("group/<slug:slug>/rss/", feeds.GroupPostsFeed(), name="group_rss"),
+    path(
+        "group/<slug:slug>/atom/",
+        feeds.GroupPostsAtomFeed(),
+        name="group_atom",
+    ),
     path("profile/<str:username>/", views.profile, name="profile"),
+    path(
+        "profile/<str:username>/rss/",
+        feeds.AuthorPostsFeed(),
+        name="profile_rss",
+    ),
+    path(
+        "profile/<str:username>/atom/",
+        feeds.AuthorPostsAtomFeed(),
+        name="profile_atom",
+    ),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
     path("create/", views.post_create, name="post_create"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
+    path(
+        "posts/<int:post_id>/comment/",
+        views.add_comment,
+        name="add_comment",
+    ),
+    path("posts/<int:post_id>/like/", views.post_like, name="post_like"),
+    path("posts/<int:post_id>/view/", views.post_view, name="post_view"),
+    path("follow/", views.follow_index, name="follow_index"),
+    path(
+        "profile/<str:username>/follow/",
+        views.profile_follow,
+        name="profile_follow",
+    ),
+    path(
+        "profile/<str:username>/unfollow/",
+        views.profile_unfollow,
+        name="profile_unfollow",
+    ),
 ]
@@ -1,11 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import is_safe_url
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from core.db.routers import use_primary, use_replica
+from core.decorators import shared_page, unpinned
+from core.paginator import cursor_paginate
+from core.ratelimit import client_key
+from core.streaming import stream_render
 
-from .forms import PostForm
-from .models import Group, Post, User
+from .aggregates import record_view
+from .archive import (ArchiveFallback, get_post_or_404, restore_post,
+                      unarchived_copy)
+from .duplicates import hold
+from .follow import FollowFeed
+from .forms import CommentForm, PostForm
+from .models import (ArchivedPost, Comment, Follow, Group, Like, Post,
+                     User)
+from .related import related_posts
+from .timeline import TimelineFeed
+from .trending import TrendingFeed
 
 NUMBER_POSTS: int = 10
+NUMBER_COMMENTS: int = 20
+DAILY_STATS_DAYS: int = 7
 
 
 def paginator_func(posts, request):
@@ -14,73 +43,153 @@ def paginator_func(posts, request):
     return paginator.get_page(page_number)
 
 
+@shared_page
+@use_replica()
 def index(request):
-    posts = Post.objects.all()
+    posts = TimelineFeed(
+        ArchiveFallback(Post.objects.all(), ArchivedPost.objects.all())
+    )
     page_obj = paginator_func(posts, request)
     context = {
         "page_obj": page_obj,
     }
 
-    return render(request, "posts/index.html", context)
+    return stream_render(
+        request,
+        "posts/index.html",
+        context,
+        page_obj,
+        "posts/includes/index_post.html",
+    )
+
+
+@shared_page
+@use_replica()
+def trending(request):
+    page_obj = TrendingFeed().page(request.GET.get("cursor"), NUMBER_POSTS)
+    return stream_render(
+        request,
+        "posts/trending.html",
+        {"page_obj": page_obj},
+        page_obj,
+        "posts/includes/index_post.html",
+    )
 
 
+@shared_page
+@use_replica()
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = get_object_or_404(Group.objects.select_related("stats"), slug=slug)
+    posts = ArchiveFallback(
+        group.posts.select_related("author"),
+        group.archived_posts.select_related("author"),
+    )
     page_obj = paginator_func(posts, request)
+    week_ago = timezone.localdate() - timedelta(days=DAILY_STATS_DAYS - 1)
     context = {
         "group": group,
         "page_obj": page_obj,
+        "daily_stats": group.daily_stats.filter(day__gte=week_ago),
     }
-
-    return render(request, "posts/group_list.html", context)
+    return stream_render(
+        request,
+        "posts/group_list.html",
+        context,
+        page_obj,
+        "posts/includes/group_post.html",
+    )
 
 
+@shared_page
+@use_replica()
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    posts = ArchiveFallback(
+        author.posts.select_related("group"),
+        author.archived_posts.select_related("group"),
+    )
     page_obj = paginator_func(posts, request)
     context = {
         "author": author,
         "page_obj": page_obj,
-        "posts_count": author.posts.count(),
+        "posts_count": page_obj.paginator.count,
     }
-    return render(request, "posts/profile.html", context)
+    return stream_render(
+        request,
+        "posts/profile.html",
+        context,
+        page_obj,
+        "posts/includes/profile_post.html",
+    )
 
 
+@shared_page
+@use_replica()
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_404(post_id)
+    author = post.author
     context = {
         "post": post,
-        "author": post.author,
-        "posts_count": post.author.posts.count(),
+        "author": author,
+        "posts_count": ArchiveFallback(
+            author.posts.all(), author.archived_posts.all()
+        ).count(),
+        "comments": cursor_paginate(
+            Comment.objects.filter(post_id=post.pk).select_related("author"),
+            request.GET.get("cursor"),
+            NUMBER_COMMENTS,
+            date_field="created",
+        ),
+        "form": CommentForm(),
+        "related": related_posts(post),
     }
     return render(request, "posts/post_detail.html", context)
 
 
+@never_cache
 @login_required
+@use_primary()
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
         return render(
             request,
             "posts/create_post.html",
             {"form": form},
         )
+    if form.duplicate is not None:
+        hold(form, request.user)
+        return render(
+            request,
+            "posts/create_post.html",
+            {"form": PostForm(), "held": True},
+        )
     new_post = form.save(commit=False)
     new_post.author = request.user
     new_post.save()
     return redirect("posts:profile", request.user)
 
 
+@never_cache
 @login_required
+@use_primary()
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_post_or_404(post_id)
     if post.author == request.user:
-        form = PostForm(request.POST or None, instance=post)
+        archived = isinstance(post, ArchivedPost)
+        if archived:
+            post = unarchived_copy(post)
+        form = PostForm(
+            request.POST or None,
+            files=request.FILES or None,
+            instance=post,
+        )
         if form.is_valid():
             post = form.save(commit=False)
-            post = form.save()
+            if archived:
+                restore_post(post)
+            else:
+                post.save()
             return redirect('posts:post_detail', post.id)
         context = {
             'form': form,
@@ -90,3 +199,92 @@ def post_edit(request, post_id):
         return render(request, "posts/create_post.html", context)
     else:
         return redirect('posts:post_detail', post_id)
+
+
+@require_POST
+@login_required
+def add_comment(request, post_id):
+    post = get_post_or_404(post_id)
+    form = CommentForm(request.POST)
+    if form.is_valid():
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post_id = post.pk
+        comment.save()
+    return redirect("posts:post_detail", post_id)
+
+
+@require_POST
+@login_required
+def post_like(request, post_id):
+    """Ставит или снимает лайк и возвращает на страницу, где нажали."""
+    post = get_post_or_404(post_id)
+    deleted, _ = Like.objects.filter(
+        user=request.user, post_id=post.pk
+    ).delete()
+    if not deleted:
+        Like.objects.get_or_create(user=request.user, post_id=post.pk)
+    next_url = request.META.get("HTTP_REFERER")
+    if not is_safe_url(
+        next_url,
+        allowed_hosts={request.get_host()},
+        require_https=request.is_secure(),
+    ):
+        next_url = reverse("posts:post_detail", args=[post.pk])
+    return redirect(next_url)
+
+
+# Просмотры шлёт navigator.sendBeacon без токена CSRF; подделанный
+# запрос засчитает разве что один просмотр.
+@csrf_exempt
+@require_POST
+@unpinned
+def post_view(request, post_id):
+    """Засчитывает просмотр поста: саму страницу отдаёт кеш."""
+    visitor = request.session.session_key or client_key(request, "ip")
+    if cache.add(
+        f"viewed:{post_id}:{visitor}", True, settings.VIEW_DEDUPE_SECONDS
+    ) and Post.objects.filter(pk=post_id).exists():
+        record_view(post_id)
+    return HttpResponse(status=204)
+
+
+@never_cache
+@login_required
+def follow_index(request):
+    page_obj = FollowFeed(request.user).page(
+        request.GET.get("cursor"), NUMBER_POSTS
+    )
+    context = {
+        "page_obj": page_obj,
+        # Страница личная: лайки отмечаем сразу, одним запросом.
+        "liked": set(Like.objects.filter(
+            user=request.user, post_id__in=[post.pk for post in page_obj]
+        ).values_list("post_id", flat=True)),
+        "csrf_token": get_token(request),
+    }
+    return stream_render(
+        request,
+        "posts/follow.html",
+        context,
+        page_obj,
+        "posts/includes/index_post.html",
+    )
+
+
+@require_POST
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect("posts:profile", username)
+
+
+@require_POST
+@login_required
+def profile_unfollow(request, username):
+    Follow.objects.filter(
+        user=request.user, author__username=username
+    ).delete()
+    return redirect("posts:profile", username)
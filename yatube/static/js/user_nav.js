@@ -0,0 +1,55 @@
+// Общие страницы кешируются без данных пользователя: меню и кнопки,
+// доступные только автору, подписчику или вошедшему посетителю,
+// подставляются после загрузки.
+(function () {
+  const params = new URLSearchParams();
+  const profile = document.querySelector("[data-follow]");
+  if (profile) {
+    params.set("author", profile.dataset.author);
+  }
+  // Отметки «мне нравится» для всей страницы — одним запросом.
+  const likes = document.querySelectorAll("[data-like]");
+  if (likes.length) {
+    params.set("liked", [...likes].map((form) => form.dataset.like).join());
+  }
+  // Саму страницу поста отдаёт кеш, поэтому просмотр засчитывается
+  // отдельным POST-запросом.
+  const viewed = document.querySelector("[data-viewed]");
+  if (viewed) {
+    navigator.sendBeacon(viewed.dataset.viewed);
+  }
+  const url = document.currentScript.dataset.url + "?" + params;
+  fetch(url, {credentials: "same-origin"})
+    .then((response) => response.text())
+    .then((html) => {
+      document.getElementById("user-nav").outerHTML = html;
+      const nav = document.getElementById("user-nav");
+      const username = nav.dataset.username;
+      document.querySelectorAll("[data-owner]").forEach((element) => {
+        element.hidden = element.dataset.owner !== username;
+      });
+      document.querySelectorAll("[data-authenticated]").forEach((element) => {
+        element.hidden = username === undefined;
+      });
+      document.querySelectorAll("[data-follow]").forEach((form) => {
+        form.hidden = form.dataset.follow !== nav.dataset.following;
+      });
+      const liked = new Set((nav.dataset.liked || "").split(" "));
+      likes.forEach((form) => {
+        const button = form.querySelector("button");
+        button.classList.toggle("btn-danger", liked.has(form.dataset.like));
+        button.classList.toggle(
+          "btn-outline-danger", !liked.has(form.dataset.like)
+        );
+      });
+      // В общей странице токена CSRF нет: его выдаёт меню пользователя.
+      const cookie = document.cookie.match(/(?:^|; )csrftoken=([^;]*)/);
+      const csrf = nav.dataset.csrf || (cookie && cookie[1]);
+      if (csrf) {
+        document.querySelectorAll("input[name=csrfmiddlewaretoken]")
+          .forEach((input) => {
+            input.value = input.value || csrf;
+          });
+      }
+    });
+})();
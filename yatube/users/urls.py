@@ -22,6 +22,7 @@ urlpatterns = [
         views.SignUp.as_view(),
         name="signup"
     ),
+    path("nav/", views.UserNavView.as_view(), name="nav"),
     path(
         "login/",
         LoginView.as_view(template_name="users/login.html"),
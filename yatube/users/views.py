@@ -2,11 +2,19 @@ from django.contrib.auth.views import (LoginView, LogoutView,
                                        PasswordChangeView,
                                        PasswordResetConfirmView,
                                        PasswordResetView)
+from django.middleware.csrf import get_token
 from django.urls import reverse_lazy
-from django.views.generic import CreateView
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.vary import vary_on_cookie
+from django.views.generic import CreateView, TemplateView
+
+from posts.models import Follow, Like
 
 from .forms import CreationForm
 
+MAX_LIKED_IDS: int = 100
+
 
 class SignUp(CreateView):
     form_class = CreationForm
@@ -15,6 +23,39 @@ class SignUp(CreateView):
     template_name = "users/signup.html"
 
 
+@method_decorator(
+    [vary_on_cookie, cache_control(private=True, max_age=0)], name="dispatch"
+)
+class UserNavView(TemplateView):
+    """Меню пользователя для страниц, общих для всех посетителей."""
+
+    template_name = "includes/user_nav.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # У общей страницы своего токена нет, а cookie csrftoken может
+        # не быть: токен для форм выдаёт этот личный ответ.
+        context["csrf"] = get_token(self.request)
+        user = self.request.user
+        author = self.request.GET.get("author")
+        if user.is_authenticated and author and author != user.username:
+            context["following"] = Follow.objects.filter(
+                user=user, author__username=author
+            ).exists()
+        post_ids = [
+            int(pk) for pk in self.request.GET.get("liked", "").split(",")
+            if pk.isdigit()
+        ][:MAX_LIKED_IDS]
+        if user.is_authenticated and post_ids:
+            # Одним запросом на всю страницу ленты.
+            context["liked"] = " ".join(
+                str(pk) for pk in Like.objects.filter(
+                    user=user, post_id__in=post_ids
+                ).values_list("post_id", flat=True)
+            )
+        return context
+
+
 class CustomLoginView(LoginView):
     """Страница входа в аккаунт."""
 
@@ -50,10 +50,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.compression.CompressionMiddleware",
+    "core.middleware.replicas.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ratelimit.RateLimitMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -86,11 +89,58 @@ WSGI_APPLICATION = "yatube.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "core.db.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        # Переиспользуем соединение между запросами вместо открытия нового.
+        "CONN_MAX_AGE": 60,
+        # PRAGMA соединения (WAL и др.) — DEFAULT_PRAGMAS бэкенда
+        # core.db.backends.sqlite3; отдельные значения можно
+        # переопределить в OPTIONS["pragmas"].
+        "OPTIONS": {"timeout": 5},
     }
 }
 
+# Чтение лент можно вынести на реплики. Локально реплика — копия
+# SQLite-файла, которую обновляет ``python manage.py sync_replicas``:
+#
+# DATABASES["replica"] = {
+#     **DATABASES["default"],
+#     "NAME": os.path.join(BASE_DIR, "db.replica.sqlite3"),
+#     "TEST": {"MIRROR": "default"},
+# }
+# DATABASE_REPLICAS = ["replica"]
+
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ["core.db.routers.ReplicaRouter"]
+
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+
+# Кеш. Версии областей кеша (posts.cache) меняют команды archive_posts,
+# rebuild_timeline, generate_data и все воркеры, поэтому при нескольких
+# процессах обязателен общий бэкенд, например Memcached:
+#
+# CACHES = {
+#     "default": {
+#         "BACKEND": "django.core.cache.backends.memcached.MemcachedCache",
+#         "LOCATION": "127.0.0.1:11211",
+#     }
+# }
+#
+# LocMemCache живёт в памяти одного процесса и чужих изменений не видит.
+# Чтобы и с ним ответы расходились с базой ограниченное время, версии и
+# значения по ним живут CACHE_VERSION_TIMEOUT секунд — столько же,
+# сколько CDN держит общие страницы.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+CACHE_VERSION_TIMEOUT = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -134,6 +184,40 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
 
+MEDIA_URL = "/media/"
+
+MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+# Загрузки называются по хешу содержимого (core.storage).
+
+DEFAULT_FILE_STORAGE = "core.storage.ContentHashStorage"
+
+# Сколько секунд браузеры и CDN хранят загруженные файлы и миниатюры.
+# На боевом сервере MEDIA_ROOT отдаёт веб-сервер с тем же заголовком.
+
+MEDIA_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Миниатюры строит пул процессов (core.thumbnails) после сохранения
+# поста; None — по числу процессоров.
+
+THUMBNAIL_PRESETS = {
+    "card": {"size": (960, 339), "crop": True},
+}
+
+THUMBNAIL_WORKERS = None
+
+# Карту сайта пишет команда update_sitemaps (posts.sitemaps). Файлы
+# sitemap*.xml* из SITEMAP_ROOT отдаёт из корня сайта веб-сервер.
+
+SITEMAP_ROOT = os.path.join(BASE_DIR, "sitemaps")
+
+SITEMAP_BASE_URL = "http://localhost:8000"
+
+# Не больше 50 000 URL в файле по протоколу sitemaps.org.
+
+SITEMAP_SHARD_SIZE = 50000
+
+
 # User authentication and authorisation
 
 LOGIN_URL = "users:login"
@@ -141,8 +225,128 @@ LOGIN_URL = "users:login"
 LOGIN_REDIRECT_URL = "posts:index"
 
 
-#  подключаем движок filebased.EmailBackend
+#  письма ставятся в очередь и уходят из фонового потока
+#  через filebased.EmailBackend (core.mail)
+
+EMAIL_BACKEND = "core.mail.backends.QueuedEmailBackend"
+
+EMAIL_QUEUE_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
-EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+EMAIL_QUEUE_BATCH_SIZE = 50
+
+EMAIL_QUEUE_LINGER = 0.05
+
+EMAIL_QUEUE_IDLE_TIMEOUT = 30
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# Посты старше этого срока команда archive_posts переносит в архив.
+
+POSTS_ARCHIVE_AFTER_DAYS = 90
+
+# Сколько самых новых постов хранит материализованная главная лента.
+
+TIMELINE_SIZE = 200
+
+# Посты авторов, у которых подписчиков не больше этого числа, кладутся
+# в ленты подписчиков при публикации; посты более популярных авторов
+# читаются при показе ленты подписок.
+
+FOLLOW_FANOUT_MAX_FOLLOWERS = 1000
+
+# Сколько последних постов автора попадает в ленту при подписке.
+
+FOLLOW_BACKFILL_POSTS = 50
+
+# На сколько строк делится счётчик лайков поста. Суммы переносит в Post
+# команда merge_like_counters, её стоит запускать раз в минуту.
+
+LIKE_COUNTER_SHARDS = 16
+
+# То же для просмотров; их переносит команда rank_trending.
+
+VIEW_COUNTER_SHARDS = 16
+
+# Просмотр одного посетителя (сессия или IP) засчитывается не чаще раза
+# за столько секунд.
+
+VIEW_DEDUPE_SECONDS = 1800
+
+# Популярное (posts.trending): команда rank_trending раз в несколько
+# минут оценивает посты за последние TRENDING_WINDOW_HOURS часов и
+# сохраняет TRENDING_SIZE лучших. Оценка — взвешенная сумма просмотров,
+# лайков и комментариев, делённая на (возраст в часах + 2) ** GRAVITY.
+
+TRENDING_WINDOW_HOURS = 72
+
+TRENDING_SIZE = 500
+
+TRENDING_WEIGHTS = {"views": 1.0, "likes": 5.0, "comments": 10.0}
+
+TRENDING_GRAVITY = 1.8
+
+# Похожие посты (posts.related): сколько показывать, минимальная
+# косинусная близость и доля постов сообщества, начиная с которой слово
+# считается слишком частым. Индекс собирает команда build_related.
+
+RELATED_POSTS = 5
+
+RELATED_MIN_SCORE = 0.1
+
+RELATED_MAX_DF = 0.5
+
+# Поиск почти одинаковых постов при публикации (posts.duplicates):
+# число хешей MinHash и полос LSH, окно индекса в днях. Пост со сходством
+# не ниже DUPLICATE_REJECT_SIMILARITY отклоняется, не ниже
+# DUPLICATE_REVIEW_SIMILARITY — уходит на проверку модератору.
+
+DUPLICATE_PERMUTATIONS = 64
+
+DUPLICATE_BANDS = 16
+
+DUPLICATE_WINDOW_DAYS = 7
+
+DUPLICATE_REJECT_SIMILARITY = 0.9
+
+DUPLICATE_REVIEW_SIMILARITY = 0.7
+
+
+# Ответы короче этого размера (в байтах) не сжимаются: выигрыш меньше,
+# чем затраты на сжатие.
+
+COMPRESSION_MIN_SIZE = 1024
+
+# Сколько секунд CDN и браузеры хранят общие страницы анонимов.
+
+SHARED_PAGE_MAX_AGE = 60
+
+# Промах кеша пересчитывает один воркер (core.singleflight): остальные
+# ждут его не дольше SINGLEFLIGHT_WAIT секунд, проверяя кеш каждые
+# SINGLEFLIGHT_POLL секунд. Блокировка в кеше снимается сама через
+# SINGLEFLIGHT_LOCK_TIMEOUT секунд, если воркер упал.
+
+SINGLEFLIGHT_WAIT = 2
+
+SINGLEFLIGHT_POLL = 0.05
+
+SINGLEFLIGHT_LOCK_TIMEOUT = 30
+
+
+# Ограничение частоты запросов по имени URL (core.middleware.ratelimit).
+# Для нескольких серверов хранилище — "core.ratelimit.RedisStore"
+# с RATELIMIT_STORE_OPTIONS = {"url": "redis://localhost:6379/0"}.
+
+RATELIMITS = {
+    "posts:post_create": {"rate": "10/m", "key": "user"},
+    "posts:post_edit": {"rate": "30/m", "key": "user"},
+    "posts:add_comment": {"rate": "20/m", "key": "user"},
+    "posts:post_like": {"rate": "60/m", "key": "user"},
+    "posts:post_view": {"rate": "30/m"},
+    "users:signup": {"rate": "5/h"},
+    "users:login": {"rate": "10/m"},
+    "users:password_reset": {"rate": "5/h"},
+}
+
+RATELIMIT_STORE = "core.ratelimit.MemoryStore"
+
+RATELIMIT_STORE_OPTIONS = {}
@@ -0,0 +1,28 @@
+"""Облегчённый профиль для воркеров, которые отдают только ленты.
+
+Без админки и django.contrib.messages, URLconf — yatube.urls_feed.
+Запуск: DJANGO_SETTINGS_MODULE=yatube.settings_feed и WSGI-приложение
+yatube.wsgi_feed. Замеры старта: manage.py profile_startup.
+"""
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+SKIPPED_APPS = ("django.contrib.admin", "django.contrib.messages")
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in SKIPPED_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware != "django.contrib.messages.middleware.MessageMiddleware"
+]
+
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]["OPTIONS"]["context_processors"].remove(
+    "django.contrib.messages.context_processors.messages"
+)
+
+ROOT_URLCONF = "yatube.urls_feed"
+
+WSGI_APPLICATION = "yatube.wsgi_feed.application"
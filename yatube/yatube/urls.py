@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import serve_media, serve_sitemap
 
 urlpatterns = [
     path("", include("posts.urls", namespace="posts")),
@@ -8,3 +11,9 @@ urlpatterns = [
     path("auth/", include("django.contrib.auth.urls")),
     path("about/", include("about.urls", namespace="about")),
 ]
+
+if settings.DEBUG:
+    urlpatterns += [
+        re_path(r"^media/(?P<path>.*)$", serve_media),
+        re_path(r"^(?P<path>sitemap[\w-]*\.xml(?:\.gz)?)$", serve_sitemap),
+    ]
@@ -0,0 +1,23 @@
+"""URLconf воркеров, которые обслуживают только ленты (settings_feed).
+
+Админки здесь нет. Страницы пользователей и «об авторе» подключены
+обычным include: шапка каждой страницы делает reverse() на них, так что
+отложенная загрузка их URLconf ничего не экономит.
+"""
+from django.conf import settings
+from django.urls import include, path, re_path
+
+from core.views import serve_media, serve_sitemap
+
+urlpatterns = [
+    path("", include("posts.urls", namespace="posts")),
+    path("auth/", include("users.urls", namespace="users")),
+    path("auth/", include("django.contrib.auth.urls")),
+    path("about/", include("about.urls", namespace="about")),
+]
+
+if settings.DEBUG:
+    urlpatterns += [
+        re_path(r"^media/(?P<path>.*)$", serve_media),
+        re_path(r"^(?P<path>sitemap[\w-]*\.xml(?:\.gz)?)$", serve_sitemap),
+    ]
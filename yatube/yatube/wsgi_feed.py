@@ -0,0 +1,11 @@
+"""
+WSGI config for feed-only workers (yatube.settings_feed).
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings_feed")
+
+application = get_wsgi_application()